@@ -0,0 +1,45 @@
+"""Add precomputed recommendations
+
+Revision ID: 3c9a1f7d2b64
+Revises: ee08e36b00de
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f7d2b64'
+down_revision: Union[str, None] = 'ee08e36b00de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('precomputed_recommendations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('plan_date', sa.String(length=10), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('request_key', sa.String(length=64), nullable=False),
+    sa.Column('catalog_version', sa.String(length=20), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_precomputed_recommendations_id'), 'precomputed_recommendations', ['id'], unique=False)
+    op.create_index(op.f('ix_precomputed_recommendations_user_id'), 'precomputed_recommendations', ['user_id'], unique=False)
+    op.create_index(op.f('ix_precomputed_recommendations_plan_date'), 'precomputed_recommendations', ['plan_date'], unique=False)
+    op.create_index(op.f('ix_precomputed_recommendations_request_key'), 'precomputed_recommendations', ['request_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_precomputed_recommendations_request_key'), table_name='precomputed_recommendations')
+    op.drop_index(op.f('ix_precomputed_recommendations_plan_date'), table_name='precomputed_recommendations')
+    op.drop_index(op.f('ix_precomputed_recommendations_user_id'), table_name='precomputed_recommendations')
+    op.drop_index(op.f('ix_precomputed_recommendations_id'), table_name='precomputed_recommendations')
+    op.drop_table('precomputed_recommendations')
@@ -0,0 +1,43 @@
+"""Add user preference vectors
+
+Revision ID: 8e4b2c6a91f3
+Revises: 3c9a1f7d2b64
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2c6a91f3'
+down_revision: Union[str, None] = '3c9a1f7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_preference_vectors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('meal_count', sa.Integer(), nullable=False),
+    sa.Column('token_counts', sa.Text(), nullable=False),
+    sa.Column('cuisine_counts', sa.Text(), nullable=False),
+    sa.Column('protein_total', sa.Float(), nullable=False),
+    sa.Column('carbs_total', sa.Float(), nullable=False),
+    sa.Column('fat_total', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_preference_vectors_id'), 'user_preference_vectors', ['id'], unique=False)
+    op.create_index(op.f('ix_user_preference_vectors_user_id'), 'user_preference_vectors', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_preference_vectors_user_id'), table_name='user_preference_vectors')
+    op.drop_index(op.f('ix_user_preference_vectors_id'), table_name='user_preference_vectors')
+    op.drop_table('user_preference_vectors')
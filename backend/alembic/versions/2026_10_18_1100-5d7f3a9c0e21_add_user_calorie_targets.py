@@ -0,0 +1,29 @@
+"""Add stored calorie targets to users
+
+Revision ID: 5d7f3a9c0e21
+Revises: 8e4b2c6a91f3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7f3a9c0e21'
+down_revision: Union[str, None] = '8e4b2c6a91f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('daily_calorie_target', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('calorie_targets', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('calorie_targets')
+        batch_op.drop_column('daily_calorie_target')
@@ -0,0 +1,38 @@
+"""Add barcode products cache
+
+Revision ID: a61c4e8d3f57
+Revises: 5d7f3a9c0e21
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61c4e8d3f57'
+down_revision: Union[str, None] = '5d7f3a9c0e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('barcode_products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('barcode', sa.String(length=32), nullable=False),
+    sa.Column('found', sa.Boolean(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_barcode_products_id'), 'barcode_products', ['id'], unique=False)
+    op.create_index(op.f('ix_barcode_products_barcode'), 'barcode_products', ['barcode'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_barcode_products_barcode'), table_name='barcode_products')
+    op.drop_index(op.f('ix_barcode_products_id'), table_name='barcode_products')
+    op.drop_table('barcode_products')
@@ -0,0 +1,39 @@
+"""Add translations cache
+
+Revision ID: c27d9e4b1a86
+Revises: a61c4e8d3f57
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27d9e4b1a86'
+down_revision: Union[str, None] = 'a61c4e8d3f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('translations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('target', sa.String(length=16), nullable=False),
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('translated_text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('target', 'text_hash', name='uq_translations_target_text_hash')
+    )
+    op.create_index(op.f('ix_translations_id'), 'translations', ['id'], unique=False)
+    op.create_index(op.f('ix_translations_target'), 'translations', ['target'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_translations_target'), table_name='translations')
+    op.drop_index(op.f('ix_translations_id'), table_name='translations')
+    op.drop_table('translations')
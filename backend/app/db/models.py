@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone, timedelta
 from app.db.base import Base
@@ -30,9 +30,19 @@ class User(Base):
     health_goal = Column(String(100), nullable=True)
     allergies = Column(Text, nullable=True)
     
+    # CalorieCalculator output for the profile above (JSON), refreshed when its inputs change
+    daily_calorie_target = Column(Integer, nullable=True)
+    calorie_targets = Column(Text, nullable=True)
+    
     # Relationships
     meals = relationship("Meal", back_populates="user", cascade="all, delete-orphan")
     sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
+    precomputed_recommendations = relationship(
+        "PrecomputedRecommendation", back_populates="user", cascade="all, delete-orphan"
+    )
+    preference_vector = relationship(
+        "UserPreferenceVector", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
 
 
 class Meal(Base):
@@ -65,3 +75,64 @@ class Session(Base):
     
     # Relationship
     user = relationship("User", back_populates="sessions")
+
+
+class PrecomputedRecommendation(Base):
+    """Thali/mood responses computed ahead of time by the nightly batch job"""
+    __tablename__ = "precomputed_recommendations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    plan_date = Column(String(10), nullable=False, index=True)  # YYYY-MM-DD (IST)
+    kind = Column(String(20), nullable=False)  # thali, mood
+    request_key = Column(String(64), unique=True, index=True, nullable=False)  # digest of the endpoint request key
+    catalog_version = Column(String(20), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON response body
+    created_at = Column(DateTime, default=get_ist_now)
+
+    # Relationship
+    user = relationship("User", back_populates="precomputed_recommendations")
+
+
+class UserPreferenceVector(Base):
+    """Running totals over a user's meal history, updated on every meal write"""
+    __tablename__ = "user_preference_vectors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True, nullable=False)
+    version = Column(Integer, nullable=False, default=0)  # bumped on every update
+    meal_count = Column(Integer, nullable=False, default=0)
+    token_counts = Column(Text, nullable=False, default="{}")  # JSON: dish-name token -> meals
+    cuisine_counts = Column(Text, nullable=False, default="{}")  # JSON: cuisine -> meals
+    protein_total = Column(Float, nullable=False, default=0.0)  # grams
+    carbs_total = Column(Float, nullable=False, default=0.0)
+    fat_total = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=get_ist_now, onupdate=get_ist_now)
+
+    # Relationship
+    user = relationship("User", back_populates="preference_vector")
+
+
+class BarcodeProduct(Base):
+    """Cached OpenFoodFacts answer for a barcode, including "not found" answers"""
+    __tablename__ = "barcode_products"
+
+    id = Column(Integer, primary_key=True, index=True)
+    barcode = Column(String(32), unique=True, index=True, nullable=False)
+    found = Column(Boolean, nullable=False)
+    payload = Column(Text, nullable=True)  # JSON food data when found
+    fetched_at = Column(DateTime, default=get_ist_now)
+    expires_at = Column(DateTime, nullable=False)  # served stale and refreshed after this
+
+
+class Translation(Base):
+    """Cached upstream translation of one source text into one target language"""
+    __tablename__ = "translations"
+    __table_args__ = (UniqueConstraint('target', 'text_hash', name='uq_translations_target_text_hash'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    target = Column(String(16), nullable=False, index=True)  # language code, e.g. hi
+    text_hash = Column(String(64), nullable=False)  # sha256 of the source text
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=get_ist_now)
@@ -1,10 +1,22 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 # SQLite database URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./nutrisathi.db")
 
+# Statements slower than this (milliseconds) are logged with their route
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# An identical statement run this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
@@ -23,3 +35,81 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class QueryStats:
+    """SQL statements executed while handling one request"""
+
+    def __init__(self, scope: Optional[Dict] = None):
+        self.scope = scope or {}
+        self.count = 0
+        self.seconds = 0.0
+        # Statement text -> executions; bound parameters are not part of the text,
+        # so a query repeated per row (N+1) shows up as one statement with a high count
+        self.statements: Dict[str, int] = {}
+
+    @property
+    def route(self) -> str:
+        """Matched route template, else the raw path"""
+        return getattr(self.scope.get("route"), "path", None) or self.scope.get("path", "-")
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first"""
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count >= threshold),
+            key=lambda item: -item[1]
+        )
+
+
+# Stats of the request being handled; the threadpool running sync endpoints
+# and dependencies copies the context, so their queries land here too
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(scope: Optional[Dict] = None) -> Iterator[QueryStats]:
+    """Collect the statements executed inside the block (one request)"""
+    stats = QueryStats(scope)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a statement that raises leaves nothing behind
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    _record(statement, context)
+
+
+@event.listens_for(engine, "handle_error")
+def _record_failed_query(exception_context):
+    # Failed statements count too; after_cursor_execute does not run for them
+    context = exception_context.execution_context
+    if context is not None and exception_context.statement is not None:
+        _record(exception_context.statement, context)
+
+
+def _record(statement: str, context) -> None:
+    started = getattr(context, "_query_start_time", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    context._query_start_time = None
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "(no request)"
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, ' '.join(statement.split()))
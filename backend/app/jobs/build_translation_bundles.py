@@ -0,0 +1,83 @@
+"""
+Translation Bundle Build for NutriSathi
+Translates the UI strings into each supported language and writes one bundle file per language
+
+Usage (from backend/):
+    python -m app.jobs.build_translation_bundles [--languages hi bn ...] [--source PATH] [--output-dir PATH]
+
+Run once per release (or whenever data/translations/en.json changes). Translations
+come from the translations cache; only strings not translated before go to Google.
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import engine
+from app.services.translation import GoogleTranslateBackend, TranslationService
+from app.services.translation_bundles import DEFAULT_BUNDLE_DIR, SOURCE_PATH, load_source, write_bundle
+
+# Languages offered by the landing page language picker
+DEFAULT_LANGUAGES = ('hi', 'bn', 'ta', 'te', 'mr', 'gu', 'ur', 'pa', 'od')
+
+
+def build_bundles(
+    languages: List[str],
+    service: TranslationService,
+    source: Dict[str, str],
+    output_dir: Path = DEFAULT_BUNDLE_DIR
+) -> Dict:
+    """
+    Build a bundle per language (plus the English source bundle).
+
+    A language that fails to translate keeps its previous bundle and is
+    reported in the stats; the others are still built.
+
+    Returns:
+        Build stats: language -> version, failed languages -> error, seconds
+    """
+    started = time.perf_counter()
+    versions = {'en': write_bundle(output_dir, 'en', source)}
+    failed = {}
+    for lang in languages:
+        try:
+            translations = asyncio.run(service.translate(source, lang))
+        except Exception as e:
+            print(f"Warning: Could not build the {lang} bundle: {e}")
+            failed[lang] = str(e)
+            continue
+        versions[lang] = write_bundle(output_dir, lang, translations)
+
+    return {
+        'versions': versions,
+        'failed': failed,
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build per-language UI translation bundles")
+    parser.add_argument('--languages', nargs='+', default=list(DEFAULT_LANGUAGES), help="Target language codes")
+    parser.add_argument('--source', type=Path, default=SOURCE_PATH, help="UI strings (key -> English text)")
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_BUNDLE_DIR, help="Bundle directory")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    service = TranslationService(GoogleTranslateBackend(), sessionmaker(bind=engine))
+    stats = build_bundles(args.languages, service, load_source(args.source), args.output_dir)
+    print(
+        f"Built {len(stats['versions'])} translation bundles into {args.output_dir} in {stats['seconds']}s "
+        f"({len(stats['failed'])} failed)"
+    )
+    for lang, version in stats['versions'].items():
+        print(f"  {lang}: {version}")
+    if stats['failed']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
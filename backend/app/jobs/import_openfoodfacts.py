@@ -0,0 +1,206 @@
+"""
+Offline OpenFoodFacts Import for NutriSathi
+Streams an OpenFoodFacts JSONL or CSV dump (optionally .gz) into the local product store
+
+Usage (from backend/):
+    python -m app.jobs.import_openfoodfacts DUMP [--output PATH] [--format jsonl|csv] [--batch-size N]
+
+Dumps: https://world.openfoodfacts.org/data (openfoodfacts-products.jsonl.gz or
+en.openfoodfacts.org.products.csv.gz). Records are read one at a time and written in
+fixed-size batches, so memory stays flat however large the dump is.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.openfoodfacts import NUTRIMENT_KEYS, parse_product
+from app.services.product_store import DEFAULT_STORE_PATH, PRODUCT_FIELDS, SCHEMA
+
+DEFAULT_BATCH_SIZE = 5000
+
+# SQLite page cache while building (KiB; negative means size, not pages)
+BUILD_CACHE_KIB = 65536
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    """Open a dump as text, decompressing .gz on the fly"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='')
+    return open(path, 'r', encoding='utf-8', errors='replace', newline='')
+
+
+def _detect_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != '.gz']
+    if suffixes and suffixes[-1] in ('.csv', '.tsv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict]:
+    """OpenFoodFacts product records from a JSON-lines dump"""
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def _iter_csv(path: Path) -> Iterator[Dict]:
+    """Product records (JSON-dump shape) from the tab- or comma-separated CSV export"""
+    # Ingredient and category columns can be very long
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with _open_text(path) as f:
+        header = f.readline()
+        delimiter = '\t' if '\t' in header else ','
+        fields = next(csv.reader([header], delimiter=delimiter))
+        for row in csv.DictReader(f, fieldnames=fields, delimiter=delimiter, quoting=csv.QUOTE_NONE if delimiter == '\t' else csv.QUOTE_MINIMAL):
+            yield {
+                'code': row.get('code'),
+                'product_name': row.get('product_name'),
+                'product_name_en': row.get('product_name_en'),
+                'brands': row.get('brands'),
+                'serving_size': row.get('serving_size'),
+                'nutriments': {key: row.get(key) for key in NUTRIMENT_KEYS}
+            }
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def product_row(record: Dict) -> Optional[Tuple]:
+    """
+    products row for one dump record, keeping only what get_food_by_barcode maps.
+
+    Returns None for records without a barcode or without any of the mapped
+    nutriments (those lookups fall through to OpenFoodFacts).
+    """
+    barcode = str(record.get('code') or '').strip()
+    if not barcode:
+        return None
+    nutriments = record.get('nutriments') or {}
+    if not isinstance(nutriments, dict):
+        return None
+    # Keep the mapped keys only, as numbers
+    kept = {key: _number(nutriments.get(key)) for key in NUTRIMENT_KEYS}
+    if all(value is None for value in kept.values()):
+        return None
+
+    food = parse_product({**record, 'nutriments': kept}, barcode)
+    food['name'] = str(food['name'] or 'Unknown Product')
+    food['brand'] = str(food['brand'] or '')
+    food['serving_size'] = str(food['serving_size'] or '100g')
+    return tuple(food[field] for field in PRODUCT_FIELDS)
+
+
+def import_dump(
+    dump_path: Path,
+    output_path: Optional[Path] = None,
+    dump_format: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict:
+    """
+    Build the local product store from a dump.
+
+    The store is written to a temporary file next to the output and moved
+    into place at the end, so lookups keep using the previous store during
+    the import and never see a partial one.
+
+    Returns:
+        Import stats (records read, products stored, records skipped, seconds)
+    """
+    started = time.perf_counter()
+    dump_path = Path(dump_path)
+    output_path = Path(output_path or DEFAULT_STORE_PATH)
+    dump_format = dump_format or _detect_format(dump_path)
+    records = _iter_csv(dump_path) if dump_format == 'csv' else _iter_jsonl(dump_path)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    building_path = output_path.with_name(output_path.name + '.importing')
+    if building_path.exists():
+        building_path.unlink()
+
+    read = skipped = 0
+    connection = sqlite3.connect(building_path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(f"PRAGMA cache_size = -{BUILD_CACHE_KIB}")
+        connection.executescript(SCHEMA)
+        insert = (
+            f"INSERT OR REPLACE INTO products ({', '.join(PRODUCT_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(PRODUCT_FIELDS))})"
+        )
+
+        batch: List[Tuple] = []
+        for record in records:
+            read += 1
+            row = product_row(record) if isinstance(record, dict) else None
+            if row is None:
+                skipped += 1
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.executemany(insert, batch)
+                connection.commit()
+                batch.clear()
+        if batch:
+            connection.executemany(insert, batch)
+
+        stored = connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [('source', dump_path.name), ('imported_at', time.strftime('%Y-%m-%dT%H:%M:%S')), ('products', str(stored))]
+        )
+        connection.commit()
+        connection.execute("VACUUM")
+    except BaseException:
+        connection.close()
+        building_path.unlink(missing_ok=True)
+        raise
+    connection.close()
+    os.replace(building_path, output_path)
+
+    return {
+        'read': read,
+        'stored': stored,
+        'skipped': skipped,
+        'output': str(output_path),
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import an OpenFoodFacts dump into the local product store")
+    parser.add_argument('dump', type=Path, help="JSONL or CSV dump, optionally gzipped")
+    parser.add_argument('--output', type=Path, default=None, help=f"Store file (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help="Dump format (default: from the file name)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per insert batch")
+    args = parser.parse_args(argv)
+
+    stats = import_dump(args.dump, args.output, args.format, args.batch_size)
+    print(
+        f"Imported {stats['stored']} products from {stats['read']} records "
+        f"({stats['skipped']} skipped) into {stats['output']} in {stats['seconds']}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
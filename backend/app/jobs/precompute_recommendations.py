@@ -0,0 +1,223 @@
+"""
+Nightly Recommendation Precomputation for NutriSathi
+Walks users in chunks and stores each user's thalis and mood suggestions for the day
+
+Usage (from backend/):
+    python -m app.jobs.precompute_recommendations [--date YYYY-MM-DD] [--workers N] [--chunk-size N]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.db import models
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.services.cache import stable_seed
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+from app.services.preference_vectors import PreferenceVectorService
+from app.services.recommendation_pool import init_worker, worker_state
+from app.services.recommendation_store import RecommendationStore
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _precompute_user(profile: Dict) -> List[Dict]:
+    """
+    Compute one user's rows for the day.
+
+    Mood suggestions are computed for everyone; thalis need weight, height,
+    age and gender for the per-meal calorie targets and are skipped otherwise.
+    """
+    state = worker_state()
+    version = state['version']
+    day = profile['day']
+    allergies = RecommendationStore.split_allergies(profile['allergies'])
+    rows = []
+
+    if all(profile[f] for f in ('weight', 'height', 'age', 'gender')):
+        # Stored on the user by profile writes; calculated here for users who have none yet
+        targets = json.loads(profile['calorie_targets']) if profile['calorie_targets'] else None
+        if targets is None:
+            try:
+                targets = state['calculator'].calculate_daily_calories(
+                    weight=profile['weight'],
+                    height=profile['height'],
+                    age=profile['age'],
+                    gender=profile['gender'],
+                    activity_level=profile['activity_level'] or 'moderately_active',
+                    health_goal=profile['health_goal'] or 'maintain_weight'
+                )
+            except ValueError:
+                targets = None
+
+        if targets:
+            for meal_type in RecommendationStore.THALI_MEAL_TYPES:
+                key = RecommendationStore.thali_key(
+                    profile['id'], day, meal_type, targets['meal_calories'][meal_type],
+                    profile['dietary_preference'], profile['health_goal'], allergies,
+                    RecommendationStore.DEFAULT_NUM_ALTERNATIVES
+                )
+                thali = state['thali'].recommend_thali(
+                    meal_type=meal_type,
+                    calorie_goal=targets['meal_calories'][meal_type],
+                    dietary_preference=profile['dietary_preference'] or None,
+                    health_goal=profile['health_goal'] or None,
+                    allergies=allergies,
+                    num_alternatives=RecommendationStore.DEFAULT_NUM_ALTERNATIVES,
+                    rng=random.Random(stable_seed(version, *key))
+                )
+                rows.append(RecommendationStore.build_row(key, version, thali))
+
+    preferences = profile['preferences']
+    for mood in MoodRecommender.MOOD_NUTRIENT_PROFILE:
+        key = RecommendationStore.mood_key(
+            profile['id'], day, mood, RecommendationStore.DEFAULT_CALORIE_RANGE,
+            profile['dietary_preference'], allergies,
+            RecommendationStore.DEFAULT_NUM_RECOMMENDATIONS,
+            preferences['version'] if preferences else None
+        )
+        suggestion = state['mood'].recommend_by_mood(
+            mood=mood,
+            calorie_range=RecommendationStore.DEFAULT_CALORIE_RANGE,
+            dietary_preference=profile['dietary_preference'] or None,
+            allergies=allergies,
+            num_recommendations=RecommendationStore.DEFAULT_NUM_RECOMMENDATIONS,
+            rng=random.Random(stable_seed(version, *key)),
+            preferences=preferences
+        )
+        rows.append(RecommendationStore.build_row(key, version, suggestion))
+
+    return rows
+
+
+def _iter_user_chunks(db, chunk_size: int):
+    """Yield lists of user profile dicts, walking the users table by id"""
+    last_id = 0
+    while True:
+        users = db.query(
+            models.User.id,
+            models.User.weight,
+            models.User.height,
+            models.User.age,
+            models.User.gender,
+            models.User.activity_level,
+            models.User.health_goal,
+            models.User.dietary_preference,
+            models.User.allergies,
+            models.User.calorie_targets
+        ).filter(models.User.id > last_id).order_by(models.User.id).limit(chunk_size).all()
+        if not users:
+            return
+        last_id = users[-1].id
+        yield [dict(user._mapping) for user in users]
+
+
+def _load_preferences(db, user_ids: List[int], cuisines: Dict[str, str]) -> Dict[int, Optional[Dict]]:
+    """Preference profiles for a chunk, building vectors for users who have history but none yet"""
+    vectors = {
+        vector.user_id: vector
+        for vector in db.query(models.UserPreferenceVector).filter(
+            models.UserPreferenceVector.user_id.in_(user_ids)
+        )
+    }
+    missing = [user_id for user_id in user_ids if user_id not in vectors]
+    if missing:
+        with_meals = db.query(models.Meal.user_id).filter(models.Meal.user_id.in_(missing)).distinct()
+        for (user_id,) in with_meals.all():
+            vectors[user_id] = PreferenceVectorService.rebuild(db, user_id, cuisines)
+        db.commit()
+    return {user_id: PreferenceVectorService.profile(vectors.get(user_id)) for user_id in user_ids}
+
+
+def run_precompute(
+    day: Optional[date] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session_factory: Optional[Callable] = None
+) -> Dict:
+    """
+    Precompute every user's recommendations for a day.
+
+    Args:
+        day: IST date to compute for (defaults to today in IST)
+        workers: Worker processes; defaults to the CPU count, 1 runs in-process
+        chunk_size: Users read, computed and written per batch
+        session_factory: Creates the database session (default SessionLocal)
+
+    Returns:
+        Run statistics (date, users, rows, purged, seconds)
+    """
+    started = time.perf_counter()
+    day_str = (day or datetime.now(IST).date()).isoformat()
+    workers = workers or os.cpu_count() or 1
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+    else:
+        init_worker()
+
+    cuisines = PreferenceVectorService.cuisine_index(load_dishes_from_csv())
+    db = (session_factory or SessionLocal)()
+    users = 0
+    rows_written = 0
+    try:
+        for chunk in _iter_user_chunks(db, chunk_size):
+            preferences = _load_preferences(db, [p['id'] for p in chunk], cuisines)
+            profiles = [
+                {**profile, 'day': day_str, 'preferences': preferences[profile['id']]}
+                for profile in chunk
+            ]
+            if pool:
+                results = pool.map(_precompute_user, profiles, chunksize=max(1, len(profiles) // (workers * 4)))
+            else:
+                results = map(_precompute_user, profiles)
+
+            rows = [row for user_rows in results for row in user_rows]
+            RecommendationStore.replace_rows(db, day_str, [p['id'] for p in chunk], rows)
+            users += len(chunk)
+            rows_written += len(rows)
+
+        purged = RecommendationStore.purge_before(db, day_str)
+    finally:
+        db.close()
+        if pool:
+            pool.shutdown()
+
+    return {
+        'date': day_str,
+        'users': users,
+        'rows': rows_written,
+        'purged': purged,
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute thali and mood recommendations for all users")
+    parser.add_argument('--date', help="IST date to compute for (YYYY-MM-DD, default: today)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Users per batch")
+    args = parser.parse_args(argv)
+
+    day = datetime.strptime(args.date, "%Y-%m-%d").date() if args.date else None
+
+    Base.metadata.create_all(bind=engine)
+    stats = run_precompute(day=day, workers=args.workers, chunk_size=args.chunk_size)
+    print(
+        f"Precomputed {stats['rows']} recommendations for {stats['users']} users "
+        f"on {stats['date']} in {stats['seconds']}s ({stats['purged']} old rows removed)"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,19 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional, Dict
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Dict
+from sqlalchemy.orm import Session, joinedload, sessionmaker
 from sqlalchemy import func
+import asyncio
 import json
 import os
 import secrets
-import csv
-import requests
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 import bcrypt
 
-# Optional Google Translate import - used by /translate endpoint
-try:
-    from google.cloud import translate_v2 as translate
-except Exception:
-    translate = None
-
 # IST timezone (UTC+5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
 
@@ -38,12 +31,62 @@ from app.services.thali_recommender import ThaliRecommender
 from app.services.calorie_calculator import CalorieCalculator
 from app.services.mood_recommender import MoodRecommender
 from app.services.calorie_alert_service import CalorieAlertService
+from app.services.dish_similarity import DishSimilarityIndex
+from app.services.calorie_targets import CalorieTargetService
+from app.services.barcode_lookup import BarcodeLookupService
+from app.services.http_client import UpstreamError, UpstreamHTTPClient, UpstreamTimeout
+from app.services.openfoodfacts import OpenFoodFactsClient
+from app.services.product_store import LocalProductStore
+from app.services.translation import GoogleTranslateBackend, TranslationService, TranslationUnavailable
+from app.services.translation_bundles import TranslationBundleStore
+from app.services.metrics import MetricsMiddleware, MetricsRegistry, QueryStatsMiddleware, pool_collector
+from app.services.dish_annotator import catalog_version
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.meal_planner import MealPlanner
+from app.services.cache import LRUCache, stable_seed
+from app.services.recommendation_store import RecommendationStore
+from app.services.recommendation_pool import RecommendationPool
+from app.services.preference_vectors import PreferenceVectorService
+from app.jobs.precompute_recommendations import run_precompute
 import traceback
 
 # Create tables on startup
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="NutriSathi API", version="0.1.0")
+# Nightly recommendation precompute time as "HH:MM" IST; unset disables it
+# (the job can also be run from cron: python -m app.jobs.precompute_recommendations)
+PRECOMPUTE_AT = os.getenv("PRECOMPUTE_AT")
+# Worker processes for the scheduled run; kept low so it does not compete with
+# the request pool (1 computes in a thread; the cron job can use more)
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "1"))
+
+async def precompute_scheduler(at: str):
+    """Run the recommendation batch job once a day at the given IST time"""
+    hour, minute = (int(part) for part in at.split(':'))
+    while True:
+        now = get_ist_now()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            stats = await asyncio.to_thread(run_precompute, next_run.date(), PRECOMPUTE_WORKERS)
+            print(f"Precomputed recommendations: {stats}")
+        except Exception as e:
+            print(f"Warning: Recommendation precompute failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    recommendation_pool.start()
+    await upstream_http.start()
+    scheduler = asyncio.create_task(precompute_scheduler(PRECOMPUTE_AT)) if PRECOMPUTE_AT else None
+    yield
+    if scheduler:
+        scheduler.cancel()
+    await upstream_http.aclose()
+    recommendation_pool.shutdown()
+
+app = FastAPI(title="NutriSathi API", version="0.1.0", lifespan=lifespan)
 
 # Global exception handler - TEMPORARILY DISABLED FOR DEBUGGING
 # @app.exception_handler(Exception)
@@ -64,51 +107,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counts; SQL_DEBUG=1 adds them as response headers
+app.add_middleware(QueryStatsMiddleware, debug_headers=os.getenv("SQL_DEBUG", "").lower() in ("1", "true", "yes"))
+# Per-route request metrics, exposed at /metrics (outermost, so it times everything)
+metrics = MetricsRegistry()
+metrics.register_collector(pool_collector(engine))
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
 security = HTTPBearer(auto_error=False)
 
 # Load dishes from CSV
-def load_dishes_from_csv():
-    """Load dishes from data/dishes.csv"""
-    dishes = []
-    csv_path = Path(__file__).parent.parent.parent / "data" / "dishes.csv"
-    
-    if csv_path.exists():
-        try:
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('name'):  # Skip empty rows
-                        dishes.append({
-                            "name": row['name'],
-                            "cuisine": row.get('cuisine', ''),
-                            "serving_size": float(row.get('serving_g', 100)),
-                            "unit": "g",
-                            "calories": float(row.get('calories_kcal', 0)),
-                            "protein": float(row.get('protein_g', 0)),
-                            "carbs": float(row.get('carbs_g', 0)),
-                            "fat": float(row.get('fat_g', 0))
-                        })
-        except Exception as e:
-            print(f"Warning: Could not load dishes.csv: {e}")
-    
-    # Fallback to sample dishes if CSV is empty or failed
-    if not dishes:
-        dishes = [
-            {"name": "Dal Tadka", "serving_size": 200, "unit": "g", "calories": 220, "protein": 12, "carbs": 26, "fat": 8},
-            {"name": "Roti (Whole Wheat)", "serving_size": 50, "unit": "g", "calories": 120, "protein": 4, "carbs": 22, "fat": 2},
-            {"name": "Chicken Curry", "serving_size": 200, "unit": "g", "calories": 320, "protein": 28, "carbs": 10, "fat": 18},
-            {"name": "Masala Dosa", "serving_size": 180, "unit": "g", "calories": 280, "protein": 7, "carbs": 45, "fat": 8},
-            {"name": "Idli", "serving_size": 70, "unit": "g", "calories": 60, "protein": 2, "carbs": 12, "fat": 0.5}
-        ]
-    
-    return dishes
-
 dishes_db = load_dishes_from_csv()
+# What /dishes returns: the catalog without the recommenders' internal tags
+DISH_FIELDS = ("name", "cuisine", "serving_size", "unit", "calories", "protein", "carbs", "fat")
+dish_listing = [{field: dish[field] for field in DISH_FIELDS if field in dish} for dish in dishes_db]
+# Fingerprint of the loaded catalog; the response caches below are dropped when it changes
+dishes_version = catalog_version(dishes_db)
+# Catalog cuisine per dish name, used to tag logged meals in preference vectors
+dish_cuisines = PreferenceVectorService.cuisine_index(dishes_db)
 
 # Initialize AI services
 thali_recommender = ThaliRecommender(dishes_db)
 calorie_calculator = CalorieCalculator()
 mood_recommender = MoodRecommender(dishes_db)
+# Nearest-neighbour search over the catalog, for lighter swap suggestions
+dish_similarity = DishSimilarityIndex(dishes_db)
+meal_planner = MealPlanner(thali_recommender, calorie_calculator)
+# Generated plans, keyed per user/profile inputs and start date
+meal_plan_cache = LRUCache(maxsize=1024)
+# Thali and mood responses, keyed per user, IST day and request inputs
+recommendation_cache = LRUCache(maxsize=2048)
+# Thali and mood computation runs in worker processes (RECOMMENDATION_WORKERS=0 runs it inline)
+recommendation_pool = RecommendationPool(
+    thali_recommender,
+    mood_recommender,
+    workers=int(os.getenv("RECOMMENDATION_WORKERS", "2")),
+    timeout=float(os.getenv("RECOMMENDATION_TIMEOUT_S", "5")),
+    max_concurrency=int(os.getenv("RECOMMENDATION_MAX_CONCURRENCY", "0")) or None
+)
+# Pooled keep-alive client for upstream APIs, opened and closed with the app
+upstream_http = UpstreamHTTPClient(
+    timeout=float(os.getenv("UPSTREAM_TIMEOUT_S", "10")),
+    retries=int(os.getenv("UPSTREAM_RETRIES", "2")),
+    headers={"User-Agent": "NutriSathi/0.1.0"}
+)
+openfoodfacts_client = OpenFoodFactsClient(upstream_http, os.getenv("OPENFOODFACTS_PRODUCT_URL"))
+# Offline OpenFoodFacts dump (python -m app.jobs.import_openfoodfacts); lookups skip it while absent
+product_store = LocalProductStore(os.getenv("OPENFOODFACTS_DB") or None)
+# Barcode scans: local store, then memory + barcode_products table in front of OpenFoodFacts (own sessions, not the request's)
+barcode_lookup = BarcodeLookupService(
+    openfoodfacts_client.fetch_product,
+    sessionmaker(bind=engine),
+    local_store=product_store
+)
+# UI translations: memory + translations table in front of one shared Google Translate client
+translation_service = TranslationService(GoogleTranslateBackend(), sessionmaker(bind=engine))
+# Prebuilt per-language bundles (python -m app.jobs.build_translation_bundles)
+translation_bundles = TranslationBundleStore(os.getenv("TRANSLATION_BUNDLE_DIR") or None)
+# Largest barcode list accepted by /foods/barcode/batch, and its upstream fetches in flight at once
+BARCODE_BATCH_LIMIT = int(os.getenv("BARCODE_BATCH_LIMIT", "200"))
+BARCODE_BATCH_CONCURRENCY = int(os.getenv("BARCODE_BATCH_CONCURRENCY", "8"))
+# Largest profile list accepted by /ai/calculate-calories/batch
+CALORIE_BATCH_LIMIT = int(os.getenv("CALORIE_BATCH_LIMIT", "100000"))
 # Note: CalorieAlertService will be initialized per-request with database session
 
 class Meal(BaseModel):
@@ -174,6 +234,7 @@ class ThaliRequest(BaseModel):
     dietary_preference: Optional[str] = None
     health_goal: Optional[str] = None
     allergies: Optional[str] = None
+    num_alternatives: Optional[int] = 2  # extra ranked thalis to return (max 5)
 
 class ThaliRecommendationItem(BaseModel):
     name: str
@@ -186,6 +247,14 @@ class ThaliRecommendationItem(BaseModel):
     category: str
     note: str
 
+class ThaliAlternative(BaseModel):
+    recommended_items: List[ThaliRecommendationItem]
+    total_calories: int
+    total_protein: int
+    total_carbs: int
+    total_fat: int
+    balance_score: int
+
 class ThaliRecommendationResponse(BaseModel):
     meal_type: str
     calorie_goal: int
@@ -197,6 +266,7 @@ class ThaliRecommendationResponse(BaseModel):
     balance_score: int
     thali_note: str
     health_tip: str
+    alternatives: List[ThaliAlternative] = []
 
 class CalorieCalculationRequest(BaseModel):
     weight: float  # in kg
@@ -206,6 +276,13 @@ class CalorieCalculationRequest(BaseModel):
     activity_level: Optional[str] = 'moderately_active'
     health_goal: Optional[str] = 'maintain_weight'
 
+class CalorieBatchRequest(BaseModel):
+    # Same fields as CalorieCalculationRequest; each profile is validated separately
+    profiles: List[Dict[str, Any]]
+
+class BarcodeBatchRequest(BaseModel):
+    barcodes: List[str]
+
 class MealCalories(BaseModel):
     breakfast: int
     lunch: int
@@ -263,7 +340,40 @@ class MoodRecommendationResponse(BaseModel):
     total_fat: float
     mood_insights: List[str]
     wellness_tip: str
-    estimated_weekly_change_kg: float
+    timestamp: str  # When this response was served (cached payloads carry none)
+
+class MealPlanRequest(BaseModel):
+    days: Optional[int] = 1  # 1 for a day plan, 7 for a week
+    start_date: Optional[str] = None  # YYYY-MM-DD, defaults to today (IST)
+    weight: Optional[float] = None  # in kg
+    height: Optional[float] = None  # in cm
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    activity_level: Optional[str] = None
+    health_goal: Optional[str] = None
+    dietary_preference: Optional[str] = None
+    allergies: Optional[str] = None
+
+class MealPlanDay(BaseModel):
+    date: str
+    meals: Dict[str, ThaliRecommendationResponse]
+    total_calories: int
+    total_protein: int
+    total_carbs: int
+    total_fat: int
+
+class MealPlanVariety(BaseModel):
+    unique_dishes: int
+    total_items: int
+
+class MealPlanResponse(BaseModel):
+    start_date: str
+    days: int
+    daily_calories: int
+    meal_calories: MealCalories
+    macros: MacroTargets
+    plan: List[MealPlanDay]
+    variety: MealPlanVariety
 
 class CalorieMetadata(BaseModel):
     formula_used: str
@@ -282,6 +392,25 @@ class CalorieCalculationResponse(BaseModel):
     insights: CalorieInsights
     metadata: CalorieMetadata
 
+class CalorieBatchResult(BaseModel):
+    # CalorieCalculationResponse without insights, or just index and error for an invalid profile
+    index: int
+    error: Optional[str] = None
+    daily_calories: Optional[int] = None
+    bmr: Optional[int] = None
+    tdee: Optional[int] = None
+    adjustment: Optional[int] = None
+    meal_calories: Optional[MealCalories] = None
+    meal_split_percentages: Optional[MealSplitPercentages] = None
+    macros: Optional[MacroTargets] = None
+    metadata: Optional[CalorieMetadata] = None
+
+class CalorieBatchResponse(BaseModel):
+    count: int
+    succeeded: int
+    failed: int
+    results: List[CalorieBatchResult]
+
 # Auth helper functions
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -364,6 +493,11 @@ def get_current_user(
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request latency/size histograms, status counts, in-flight requests and DB pool gauges (Prometheus text format)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 class TranslateRequest(BaseModel):
     target: str
@@ -376,10 +510,10 @@ async def translate_texts(req: TranslateRequest):
 
     Request body: { "target": "hi", "texts": { "home": "Home", "about": "About" } }
     Response: { "translations": { "home": "होम", "about": "के बारे में" } }
-    """
-    if translate is None:
-        raise HTTPException(status_code=503, detail="google-cloud-translate library is not available on the server. Please install it and set GOOGLE_APPLICATION_CREDENTIALS.")
 
+    Translations are cached per (language, text) in memory and in the
+    translations table; only texts never seen before go to Google.
+    """
     # Validate
     target = req.target or "en"
     texts = req.texts or {}
@@ -387,21 +521,10 @@ async def translate_texts(req: TranslateRequest):
         return {"translations": {}}
 
     try:
-        client = translate.Client()
-        values = list(texts.values())
-        # The client.translate can accept list and returns list of dicts
-        translated = client.translate(values, target_language=target)
-
-        # translated may be a list of dicts in the same order
-        result = {}
-        keys = list(texts.keys())
-        for i, item in enumerate(translated):
-            translated_text = item.get("translatedText") if isinstance(item, dict) else str(item)
-            # Map back to original key
-            result[keys[i]] = translated_text
-
-        return {"translations": result}
+        return {"translations": await translation_service.translate(texts, target)}
 
+    except TranslationUnavailable:
+        raise HTTPException(status_code=503, detail="google-cloud-translate library is not available on the server. Please install it and set GOOGLE_APPLICATION_CREDENTIALS.")
     except Exception as e:
         # Provide helpful error message for missing credentials
         msg = str(e)
@@ -409,13 +532,41 @@ async def translate_texts(req: TranslateRequest):
             raise HTTPException(status_code=502, detail="Translation failed: Google credentials not configured. Set GOOGLE_APPLICATION_CREDENTIALS environment variable to a service account JSON file.")
         raise HTTPException(status_code=500, detail=f"Translation failed: {msg}")
 
+@app.get("/translations/{lang}")
+async def get_translation_bundle(lang: str, request: Request):
+    """Prebuilt UI translations for a language.
+
+    Response: { "lang": "hi", "version": "…", "translations": { "nav_home": "होम", ... } }
+
+    Served with the version as ETag; clients send it back in If-None-Match
+    and get a 304 until the next bundle build. Languages without a bundle
+    return 404 (use POST /translate).
+    """
+    bundle = translation_bundles.get(lang)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f"No translation bundle for '{lang}'")
+
+    # Revalidate on every use; a new build changes the ETag
+    headers = {"ETag": bundle["etag"], "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or bundle["etag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=bundle["body"], media_type="application/json", headers=headers)
+
 @app.get("/calories/daily-summary")
-async def get_daily_calorie_summary(current_user: Optional[dict] = Depends(get_current_user)):
+async def get_daily_calorie_summary(
+    current_user: Optional[dict] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get daily calorie summary with warnings and recommendations"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    summary = calorie_alert_service.get_daily_summary(current_user["email"])
+    user = db.query(models.User).filter(models.User.id == current_user["id"]).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    summary = build_calorie_alert_service(db, user).get_daily_summary(current_user["email"])
     return summary
 
 @app.get("/")
@@ -447,6 +598,7 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
         health_goal=user_data.health_goal,
         allergies=user_data.allergies
     )
+    CalorieTargetService.refresh(db_user, calorie_calculator)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -548,6 +700,8 @@ async def update_profile(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    previous_inputs = CalorieTargetService.inputs(user)
+    
     # Update only provided fields
     if updates.name is not None:
         user.name = updates.name
@@ -568,6 +722,10 @@ async def update_profile(
     if updates.allergies is not None:
         user.allergies = updates.allergies
     
+    # Stored calorie targets only change with their inputs
+    if CalorieTargetService.inputs(user) != previous_inputs or user.calorie_targets is None:
+        CalorieTargetService.refresh(user, calorie_calculator)
+    
     db.commit()
     db.refresh(user)
     
@@ -628,6 +786,37 @@ async def get_user_profile(current_user: Optional[dict] = Depends(get_current_us
         allergies=user_data.get("allergies")
     )
 
+def build_calorie_alert_service(
+    db: Session,
+    user: models.User,
+    exclude_meal_id: Optional[int] = None
+) -> CalorieAlertService:
+    """CalorieAlertService over a user's logged meals and stored calorie targets"""
+    targets = CalorieTargetService.get(db, user, calorie_calculator)
+    
+    user_meals = db.query(
+        models.Meal.id, models.Meal.calories, models.Meal.meal_type, models.Meal.timestamp
+    ).filter(models.Meal.user_id == user.id).all()
+    meals_list = [
+        {
+            "calories": m.calories,
+            "meal_type": m.meal_type,
+            "timestamp": m.timestamp.isoformat(),
+            "user": user.email
+        }
+        for m in user_meals if m.calories and m.id != exclude_meal_id
+    ]
+    
+    users_dict = {
+        user.email: {
+            "dietary_preference": user.dietary_preference,
+            "allergies": [a.strip() for a in user.allergies.split(',')] if user.allergies else None,
+            "daily_calorie_target": user.daily_calorie_target,
+            "meal_calorie_targets": targets['meal_calories'] if targets else None
+        }
+    }
+    return CalorieAlertService(meals_list, users_dict, similarity_index=dish_similarity)
+
 @app.post("/meals")
 async def log_meal(
     meal: Meal,
@@ -651,6 +840,7 @@ async def log_meal(
         meal_type=meal.meal_type
     )
     db.add(db_meal)
+    PreferenceVectorService.record_meal(db, current_user["id"], db_meal, dish_cuisines)
     db.commit()
     db.refresh(db_meal)
     
@@ -672,44 +862,18 @@ async def log_meal(
     # Check for high calorie warning
     calorie_warning = None
     if meal.calories and meal.meal_type:
-        # Get user's meals for calorie calculation
-        user_meals = db.query(models.Meal).filter(
-            models.Meal.user_id == current_user["id"]
-        ).all()
-        
-        # Convert to list format for CalorieAlertService
-        meals_list = [
-            {
-                "calories": m.calories,
-                "meal_type": m.meal_type,
-                "timestamp": m.timestamp.isoformat(),
-                "user_email": current_user["email"]
-            }
-            for m in user_meals if m.calories
-        ]
-        
-        # Get user data
         user = db.query(models.User).filter(
             models.User.id == current_user["id"]
         ).first()
         
-        users_dict = {
-            current_user["email"]: {
-                "weight": user.weight,
-                "height": user.height,
-                "age": user.age,
-                "gender": user.gender,
-                "activity_level": user.activity_level,
-                "health_goal": user.health_goal
-            }
-        } if user else {}
-        
-        # Create service instance with current data
-        alert_service = CalorieAlertService(meals_list, users_dict)
+        # Create service instance with current data (earlier meals only; this one is checked below)
+        alert_service = build_calorie_alert_service(db, user, exclude_meal_id=db_meal.id)
         calorie_warning = alert_service.check_meal_calories(
             email=current_user["email"],
             meal_calories=meal.calories,
-            meal_type=meal.meal_type
+            meal_type=meal.meal_type,
+            meal_name=meal.name,
+            meal_macros={"protein": meal.protein, "carbs": meal.carbs, "fat": meal.fat}
         )
     
     # Return meal with optional warning
@@ -741,6 +905,7 @@ async def delete_meal(
     
     # Delete the meal
     db.delete(meal)
+    PreferenceVectorService.record_meal(db, current_user["id"], meal, dish_cuisines, sign=-1)
     db.commit()
     
     return {"message": "Meal deleted successfully", "id": meal_id}
@@ -778,65 +943,102 @@ async def get_meals(
 @app.get("/dishes")
 async def get_dishes():
     """Get available dishes for meal selection"""
-    return dishes_db
+    return dish_listing
+
+@app.get("/dishes/{name}/similar")
+async def get_similar_dishes(
+    name: str,
+    max_calories: Optional[float] = None,
+    limit: int = 5,
+    dietary_preference: Optional[str] = None,
+    allergies: Optional[str] = None
+):
+    """
+    Catalog dishes most similar to a dish (name tokens and macro split), e.g. lighter swaps.
+    Allergies are comma-separated, as in the recommendation requests.
+    """
+    dish = dish_similarity.get(name)
+    if dish is None:
+        raise HTTPException(status_code=404, detail="Dish not found")
+    return {
+        "dish": dish["name"],
+        "calories": dish.get("calories", 0),
+        "similar": dish_similarity.similar(
+            name,
+            max_calories=max_calories,
+            limit=min(max(limit, 1), 20),
+            dietary_preference=dietary_preference,
+            allergies=[a.strip() for a in allergies.split(',')] if allergies else None
+        )
+    }
 
 @app.get("/foods/barcode/{barcode}")
 async def get_food_by_barcode(barcode: str):
     """
     Look up food information by barcode using OpenFoodFacts API.
     Returns nutrition data including calories, protein, carbs, and fat.
+    
+    Answers (including "not found") are cached in memory and in the
+    barcode_products table; expired entries are served while they refresh.
     """
     print(f"🔍 Looking up barcode: {barcode}")
     
     try:
-        # Query OpenFoodFacts API
-        url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-        print(f"📡 Fetching from OpenFoodFacts: {url}")
-        
-        response = requests.get(url, timeout=10)
-        print(f"📥 OpenFoodFacts response status: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"❌ OpenFoodFacts returned status {response.status_code}")
-            raise HTTPException(status_code=404, detail="Barcode not found in database")
-        
-        data = response.json()
-        print(f"📦 OpenFoodFacts data status: {data.get('status')}")
-        
-        # Check if product exists
-        if data.get("status") != 1:
-            print(f"❌ Product not found in OpenFoodFacts database")
-            raise HTTPException(status_code=404, detail="Product not found for this barcode")
-        
-        product = data.get("product", {})
-        nutriments = product.get("nutriments", {})
-        
-        # Extract nutrition data (per 100g)
-        food_data = {
-            "name": product.get("product_name") or product.get("product_name_en") or "Unknown Product",
-            "brand": product.get("brands", ""),
-            "serving_size": product.get("serving_size", "100g"),
-            "calories": nutriments.get("energy-kcal_100g") or nutriments.get("energy-kcal") or 0,
-            "protein": nutriments.get("proteins_100g") or nutriments.get("proteins") or 0,
-            "carbs": nutriments.get("carbohydrates_100g") or nutriments.get("carbohydrates") or 0,
-            "fat": nutriments.get("fat_100g") or nutriments.get("fat") or 0,
-            "barcode": barcode
-        }
-        
-        print(f"✅ Successfully fetched food data: {food_data['name']}")
-        return food_data
-    
-    except HTTPException:
-        raise
-    except requests.exceptions.Timeout:
+        food_data = await barcode_lookup.lookup(barcode)
+    except UpstreamTimeout:
         print(f"⏱️ Request timeout for barcode {barcode}")
         raise HTTPException(status_code=504, detail="Request timeout - please try again")
-    except requests.exceptions.RequestException as e:
+    except UpstreamError as e:
         print(f"❌ Request exception: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch food data: {str(e)}")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch food data: {str(e)}")
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    
+    if food_data is None:
+        print(f"❌ Product not found in OpenFoodFacts database")
+        raise HTTPException(status_code=404, detail="Product not found for this barcode")
+    
+    print(f"✅ Found food data: {food_data['name']}")
+    return food_data
+
+@app.post("/foods/barcode/batch")
+async def get_foods_by_barcodes(request: BarcodeBatchRequest):
+    """
+    Look up many barcodes in one call (receipt scanning, pantry imports).
+    
+    Cached barcodes are read in bulk and only the misses go to OpenFoodFacts,
+    a few at a time. Returns one result per requested barcode, in order:
+    status "found" with the food data, "not_found", or "error" with a detail
+    (one failed barcode does not fail the batch).
+    """
+    if len(request.barcodes) > BARCODE_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many barcodes: {len(request.barcodes)} (limit {BARCODE_BATCH_LIMIT})"
+        )
+    
+    print(f"🔍 Looking up {len(request.barcodes)} barcodes")
+    found = await barcode_lookup.lookup_many(request.barcodes, concurrency=BARCODE_BATCH_CONCURRENCY)
+    
+    results = []
+    for barcode in request.barcodes:
+        barcode = barcode.strip()
+        food_data = found.get(barcode)
+        if not barcode:
+            results.append({"barcode": barcode, "status": "error", "detail": "Empty barcode"})
+        elif isinstance(food_data, UpstreamTimeout):
+            results.append({"barcode": barcode, "status": "error", "detail": "Request timeout - please try again"})
+        elif isinstance(food_data, UpstreamError):
+            results.append({"barcode": barcode, "status": "error", "detail": f"Failed to fetch food data: {food_data}"})
+        elif food_data is None:
+            results.append({"barcode": barcode, "status": "not_found"})
+        else:
+            results.append({"barcode": barcode, "status": "found", "food": food_data})
+    
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("found", "not_found", "error")}
+    print(f"✅ Barcode batch: {counts['found']} found, {counts['not_found']} not found, {counts['error']} errors")
+    return {"count": len(results), **counts, "results": results}
 
 @app.get("/gamification/stats")
 async def get_gamification_stats(
@@ -945,33 +1147,59 @@ async def recommend_thali(
     - Allergies
     
     Returns a balanced thali with multiple items that match the criteria.
+    Results are seeded per user, day and inputs. Repeat requests are served from
+    cache, and signed-in users get the nightly precomputed result when it matches.
     """
     try:
         # Get user preferences if authenticated
         dietary_pref = request.dietary_preference
         health_goal = request.health_goal
         allergies_list = None
+        user_id = None
         
         if user:
             user_data = db.query(models.User).filter(models.User.email == user['email']).first()
             if user_data:
+                user_id = user_data.id
                 dietary_pref = dietary_pref or user_data.dietary_preference
                 health_goal = health_goal or user_data.health_goal
                 allergies_str = request.allergies or user_data.allergies
                 if allergies_str:
                     allergies_list = [a.strip() for a in allergies_str.split(',')]
         
+        num_alternatives = max(0, min(request.num_alternatives or 0, 5))
+        cache_key = RecommendationStore.thali_key(
+            user_id, get_ist_now().date().isoformat(), request.meal_type, request.calorie_goal,
+            dietary_pref, health_goal, allergies_list, num_alternatives
+        )
+        recommendation_cache.ensure_version(dishes_version)
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Serve the nightly batch result when this exact request was precomputed
+        if user_id:
+            precomputed = RecommendationStore.get(db, cache_key, dishes_version)
+            if precomputed is not None:
+                recommendation_cache.set(cache_key, precomputed)
+                return precomputed
+        
         # Generate recommendation using AI engine
-        recommendation = thali_recommender.recommend_thali(
+        recommendation = await recommendation_pool.recommend_thali(
             meal_type=request.meal_type,
             calorie_goal=request.calorie_goal,
             dietary_preference=dietary_pref,
             health_goal=health_goal,
-            allergies=allergies_list
+            allergies=allergies_list,
+            num_alternatives=num_alternatives,
+            seed=stable_seed(dishes_version, *cache_key)
         )
         
+        recommendation_cache.set(cache_key, recommendation)
         return recommendation
     
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Recommendation timed out, please try again")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
 
@@ -989,11 +1217,12 @@ async def get_thali_info():
             "Health goal alignment (weight loss, muscle building, maintenance)",
             "Allergy awareness",
             "Balanced macronutrient distribution",
-            "Traditional Indian thali composition"
+            "Traditional Indian thali composition",
+            "Ranked alternative thalis"
         ],
         "meal_types": ["breakfast", "lunch", "evening_snack", "dinner"],
         "available_dishes": len(dishes_db),
-        "balance_algorithm": "Rule-based AI with nutritional optimization"
+        "balance_algorithm": "Beam search over thali slots against the calorie split and macro targets"
     }
 
 @app.post("/ai/recommend-mood", response_model=MoodRecommendationResponse)
@@ -1010,6 +1239,7 @@ async def recommend_by_mood(
     - Ayurvedic principles (Sattvic/Rajasic classifications)
     - Macro percentage scoring
     - Keyword-based classification
+    - The signed-in user's meal history (dish tokens, cuisines, macro profile)
     
     Supported moods:
     - Happy: Light, energizing foods (complex carbs, B-vitamins)
@@ -1019,6 +1249,8 @@ async def recommend_by_mood(
     - Sick: Light, digestible, immune-supporting foods
     
     Returns balanced recommendations with mood benefits and wellness tips.
+    Results are seeded per user, day and inputs. Repeat requests are served from
+    cache, and signed-in users get the nightly precomputed result when it matches.
     """
     try:
         print(f"DEBUG: Received mood request: {request}")
@@ -1028,10 +1260,17 @@ async def recommend_by_mood(
         # Get user preferences if authenticated
         dietary_pref = request.dietary_preference
         allergies_list = None
+        user_id = None
+        preferences = None
         
         if user:
-            user_data = db.query(models.User).filter(models.User.email == user['email']).first()
+            # Preference vector comes with the user row; no meal history scan
+            user_data = db.query(models.User).options(
+                joinedload(models.User.preference_vector)
+            ).filter(models.User.email == user['email']).first()
             if user_data:
+                user_id = user_data.id
+                preferences = PreferenceVectorService.profile(user_data.preference_vector)
                 dietary_pref = dietary_pref or user_data.dietary_preference
                 allergies_str = request.allergies or user_data.allergies
                 if allergies_str:
@@ -1045,20 +1284,45 @@ async def recommend_by_mood(
         
         # Convert calorie_range from list to tuple if provided
         calorie_range = tuple(request.calorie_range) if request.calorie_range else (200, 800)
+        num_recommendations = request.num_recommendations or 4
+        
+        cache_key = RecommendationStore.mood_key(
+            user_id, get_ist_now().date().isoformat(), request.mood, calorie_range,
+            dietary_pref, allergies_list, num_recommendations,
+            preferences['version'] if preferences else None
+        )
+        recommendation_cache.ensure_version(dishes_version)
+        # Payloads are shared through the cache and the batch job; stamp each response as it is served
+        served_at = get_ist_now().isoformat()
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, 'timestamp': served_at}
+        
+        # Serve the nightly batch result when this exact request was precomputed
+        if user_id:
+            precomputed = RecommendationStore.get(db, cache_key, dishes_version)
+            if precomputed is not None:
+                recommendation_cache.set(cache_key, precomputed)
+                return {**precomputed, 'timestamp': served_at}
         
         # Generate mood-based recommendation
-        recommendation = mood_recommender.recommend_by_mood(
+        recommendation = await recommendation_pool.recommend_by_mood(
             mood=request.mood,
             calorie_range=calorie_range,
             dietary_preference=dietary_pref,
             allergies=allergies_list,
-            num_recommendations=request.num_recommendations or 4
+            num_recommendations=num_recommendations,
+            preferences=preferences,
+            seed=stable_seed(dishes_version, *cache_key)
         )
         
         print(f"DEBUG: Got recommendation with {len(recommendation['recommended_dishes'])} dishes")
         
-        return recommendation
+        recommendation_cache.set(cache_key, recommendation)
+        return {**recommendation, 'timestamp': served_at}
     
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Mood recommendation timed out, please try again")
     except ValueError as e:
         print(f"DEBUG: ValueError: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -1110,6 +1374,11 @@ async def calculate_daily_calories(
                     detail=f"Profile incomplete. Missing: {', '.join(missing_fields)}. Please save your profile first."
                 )
             
+            # Targets are stored on the profile and refreshed when it changes
+            stored_targets = CalorieTargetService.get(db, user, calorie_calculator)
+            if stored_targets:
+                return stored_targets
+            
             weight = user.weight
             height = user.height
             age = user.age
@@ -1149,6 +1418,129 @@ async def calculate_daily_calories(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calculation failed: {str(e)}")
 
+@app.post("/ai/calculate-calories/batch", responses={200: {"model": CalorieBatchResponse}})
+async def calculate_daily_calories_batch(request: CalorieBatchRequest):
+    """
+    Calculate calorie targets for many profiles at once (wellness and clinic partners).
+    
+    Returns one result per profile, in order, with its index: the same
+    fields as /ai/calculate-calories except insights, or an error for a
+    profile with missing or invalid fields.
+    """
+    if len(request.profiles) > CALORIE_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many profiles: {len(request.profiles)} (limit {CALORIE_BATCH_LIMIT})"
+        )
+    
+    results = calorie_calculator.calculate_daily_calories_batch(request.profiles)
+    failed = sum(1 for result in results if 'error' in result)
+    # Plain JSON response: the results are already JSON-ready, and encoding them
+    # through CalorieBatchResponse would dominate the time for large batches
+    return JSONResponse(content={
+        "count": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    })
+
+@app.post("/ai/meal-plan", response_model=MealPlanResponse)
+async def generate_meal_plan(
+    request: Optional[MealPlanRequest] = None,
+    current_user: Optional[dict] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate a full-day or 7-day meal plan in one call.
+    
+    Per-meal calorie targets come from the calorie calculator; every meal is
+    composed from the shared thali index, and dishes are not repeated within
+    a day or on consecutive days. Plans are cached per user, inputs and day.
+    
+    If authenticated, profile data fills any fields missing from the request.
+    """
+    request = request or MealPlanRequest()
+    days = request.days or 1
+    if days not in (1, 7):
+        raise HTTPException(status_code=400, detail="days must be 1 (day plan) or 7 (weekly plan)")
+    
+    try:
+        start_date = (
+            datetime.strptime(request.start_date, "%Y-%m-%d").date()
+            if request.start_date else get_ist_now().date()
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_date must be in YYYY-MM-DD format")
+    
+    profile = {
+        'weight': request.weight,
+        'height': request.height,
+        'age': request.age,
+        'gender': request.gender,
+        'activity_level': request.activity_level,
+        'health_goal': request.health_goal,
+        'dietary_preference': request.dietary_preference,
+        'allergies': request.allergies
+    }
+    user_id = None
+    user = None
+    if current_user:
+        user = db.query(models.User).filter(
+            models.User.id == current_user['id']
+        ).first()
+        if user:
+            user_id = user.id
+            for field in profile:
+                if profile[field] is None:
+                    profile[field] = getattr(user, field)
+    
+    missing_fields = [f for f in ('weight', 'height', 'age', 'gender') if not profile[f]]
+    if missing_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing: {', '.join(missing_fields)}. Save your profile or include them in the request."
+        )
+    
+    profile['activity_level'] = profile['activity_level'] or 'moderately_active'
+    profile['health_goal'] = profile['health_goal'] or 'maintain_weight'
+    
+    cache_key = (user_id, tuple(sorted(profile.items())), start_date.isoformat(), days)
+    meal_plan_cache.ensure_version(dishes_version)
+    cached_plan = meal_plan_cache.get(cache_key)
+    if cached_plan is not None:
+        return cached_plan
+    
+    allergies_list = None
+    if profile['allergies']:
+        allergies_list = [a.strip() for a in profile['allergies'].split(',')]
+    
+    # Use the profile's stored targets unless the request overrides their inputs
+    targets = None
+    if user and CalorieTargetService.inputs(profile) == CalorieTargetService.inputs(user):
+        targets = CalorieTargetService.get(db, user, calorie_calculator)
+    
+    try:
+        plan = meal_planner.generate_plan(
+            weight=profile['weight'],
+            height=profile['height'],
+            age=profile['age'],
+            gender=profile['gender'],
+            activity_level=profile['activity_level'],
+            health_goal=profile['health_goal'],
+            dietary_preference=profile['dietary_preference'],
+            allergies=allergies_list,
+            days=days,
+            start_date=start_date,
+            targets=targets
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Meal plan generation failed: {str(e)}")
+    
+    meal_plan_cache.set(cache_key, plan)
+    return plan
+
 @app.get("/ai/calorie-info")
 async def get_calorie_calculator_info():
     """Get information about the calorie calculation system"""
@@ -0,0 +1,246 @@
+"""
+Cached Barcode Lookup for NutriSathi
+Serves barcode scans from an in-memory LRU and the barcode_products table, refreshing from OpenFoodFacts
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Union
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db import models
+from app.db.models import get_ist_now
+from app.services.cache import LRUCache, SingleFlight
+from app.services.http_client import UpstreamError
+from app.services.product_store import LocalProductStore
+
+
+class BarcodeLookupService:
+    """
+    Two-level cache in front of the upstream product lookup.
+
+    Found products are kept for POSITIVE_TTL and unknown barcodes for
+    NEGATIVE_TTL. An expired entry is still returned at once while a
+    background task refreshes it (stale-while-revalidate); if the refresh
+    fails the stale entry stays, so known products keep scanning through
+    upstream outages. Only barcodes seen for the first time wait on upstream.
+
+    Concurrent misses and refreshes for one barcode share a single upstream
+    fetch (single-flight), so a product scanned by many users at once costs
+    one OpenFoodFacts call.
+
+    With a local product store (an imported OpenFoodFacts dump) barcodes it
+    holds are answered from it before any cache or upstream call.
+    """
+
+    POSITIVE_TTL = timedelta(days=30)
+    NEGATIVE_TTL = timedelta(hours=6)
+    # After a failed refresh, wait this long before trying upstream again
+    REFRESH_RETRY = timedelta(minutes=5)
+    # Upstream fetches in flight at once for one lookup_many call
+    BATCH_CONCURRENCY = 8
+    # Bound parameters per IN (...) query
+    MAX_QUERY_BATCH = 500
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[Dict]]],
+        session_factory: Callable,
+        cache_size: int = 4096,
+        local_store: Optional[LocalProductStore] = None
+    ):
+        """
+        Args:
+            fetch: Async upstream lookup returning food data, or None for an
+                unknown barcode; raises UpstreamError on failure
+            session_factory: Creates independent database sessions (a sessionmaker)
+            cache_size: Entries kept in memory
+            local_store: Imported OpenFoodFacts dump consulted first
+        """
+        self.fetch = fetch
+        self.session_factory = session_factory
+        self.cache = LRUCache(maxsize=cache_size)
+        self.local_store = local_store
+        self._flights = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def lookup(self, barcode: str) -> Optional[Dict]:
+        """
+        Food data for a barcode.
+
+        Returns:
+            Food data, or None when the product is unknown
+
+        Raises:
+            UpstreamError: Nothing cached and the upstream lookup failed
+        """
+        barcode = barcode.strip()
+        if self.local_store is not None:
+            # sqlite3 query and reopen check: keep them off the event loop
+            data = await asyncio.to_thread(self.local_store.get, barcode)
+            if data is not None:
+                return data
+
+        entry = await self._read(barcode)
+        if entry is None:
+            entry = await self._fetch_and_store(barcode)
+        elif entry['expires_at'] <= get_ist_now():
+            self._schedule_refresh(barcode)
+        return entry['data'] if entry['found'] else None
+
+    async def lookup_many(
+        self,
+        barcodes: Iterable[str],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Union[Dict, None, UpstreamError]]:
+        """
+        Food data for many barcodes in one pass.
+
+        The local store and the table are read with one query each for the
+        whole batch; only barcodes found nowhere go upstream, at most
+        `concurrency` at a time (each still through single-flight).
+
+        Args:
+            barcodes: Barcodes to resolve (duplicates are looked up once)
+            concurrency: Upstream fetches in flight at once (default BATCH_CONCURRENCY)
+
+        Returns:
+            Food data, None (unknown product) or the UpstreamError raised
+            while fetching it, keyed by stripped barcode
+        """
+        pending = [barcode for barcode in dict.fromkeys(b.strip() for b in barcodes) if barcode]
+        results: Dict[str, Union[Dict, None, UpstreamError]] = {}
+
+        if self.local_store is not None:
+            results.update(await asyncio.to_thread(self.local_store.get_many, pending))
+            pending = [barcode for barcode in pending if barcode not in results]
+
+        now = get_ist_now()
+        entries = await self._read_many(pending)
+        misses = []
+        for barcode in pending:
+            entry = entries.get(barcode)
+            if entry is None:
+                misses.append(barcode)
+                continue
+            if entry['expires_at'] <= now:
+                self._schedule_refresh(barcode)
+            results[barcode] = entry['data'] if entry['found'] else None
+
+        semaphore = asyncio.Semaphore(concurrency or self.BATCH_CONCURRENCY)
+
+        async def fetch(barcode: str) -> None:
+            async with semaphore:
+                try:
+                    entry = await self._fetch_and_store(barcode)
+                except UpstreamError as e:
+                    results[barcode] = e
+                    return
+            results[barcode] = entry['data'] if entry['found'] else None
+
+        await asyncio.gather(*(fetch(barcode) for barcode in misses))
+        return results
+
+    async def _read(self, barcode: str) -> Optional[Dict]:
+        """Cached entry from memory, falling back to the table"""
+        entry = self.cache.get(barcode)
+        if entry is not None:
+            return entry
+        # Concurrent misses share one table read, so they also reach the
+        # upstream fetch together and join a single flight
+        entries = await self._flights.do(('read', barcode), lambda: self._read_many([barcode]))
+        return entries.get(barcode)
+
+    async def _read_many(self, barcodes: Iterable[str]) -> Dict[str, Dict]:
+        """Cached entries from memory, reading the rest from the table in bulk"""
+        entries: Dict[str, Dict] = {}
+        missing = []
+        for barcode in barcodes:
+            entry = self.cache.get(barcode)
+            if entry is not None:
+                entries[barcode] = entry
+            else:
+                missing.append(barcode)
+        if missing:
+            # Blocking database I/O runs in a worker thread, off the event loop
+            entries.update(await asyncio.to_thread(self._load, missing))
+        return entries
+
+    def _load(self, barcodes: List[str]) -> Dict[str, Dict]:
+        """Read entries from the table in bulk and cache them (runs in a worker thread)"""
+        entries: Dict[str, Dict] = {}
+        db = self.session_factory()
+        try:
+            for start in range(0, len(barcodes), self.MAX_QUERY_BATCH):
+                rows = db.query(models.BarcodeProduct).filter(
+                    models.BarcodeProduct.barcode.in_(barcodes[start:start + self.MAX_QUERY_BATCH])
+                ).all()
+                for row in rows:
+                    entry = self._entry(row.found, json.loads(row.payload) if row.payload else None, row.expires_at)
+                    self.cache.set(row.barcode, entry)
+                    entries[row.barcode] = entry
+        finally:
+            db.close()
+        return entries
+
+    async def _fetch_and_store(self, barcode: str) -> Dict:
+        """Fetch and store a barcode, joining the fetch already in flight for it"""
+        async def fetch_and_store() -> Dict:
+            return await self._store(barcode, await self.fetch(barcode))
+        return await self._flights.do(barcode, fetch_and_store)
+
+    async def _store(self, barcode: str, data: Optional[Dict]) -> Dict:
+        """Save an upstream answer (None: not found) to the table and memory"""
+        now = get_ist_now()
+        found = data is not None
+        expires_at = now + (self.POSITIVE_TTL if found else self.NEGATIVE_TTL)
+        values = {
+            'found': found,
+            'payload': json.dumps(data) if found else None,
+            'fetched_at': now,
+            'expires_at': expires_at
+        }
+        await asyncio.to_thread(self._save, barcode, values)
+
+        entry = self._entry(found, data, expires_at)
+        self.cache.set(barcode, entry)
+        return entry
+
+    def _save(self, barcode: str, values: Dict) -> None:
+        """Upsert one barcode_products row (runs in a worker thread)"""
+        db = self.session_factory()
+        try:
+            updated = db.query(models.BarcodeProduct).filter(
+                models.BarcodeProduct.barcode == barcode
+            ).update(values, synchronize_session=False)
+            if not updated:
+                db.add(models.BarcodeProduct(barcode=barcode, **values))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another request stored it first; theirs is as fresh as ours
+                db.rollback()
+        finally:
+            db.close()
+
+    def _schedule_refresh(self, barcode: str) -> None:
+        """Start one background refresh per expired barcode"""
+        if self._flights.in_flight(barcode):
+            return
+        task = asyncio.create_task(self._refresh(barcode))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, barcode: str) -> None:
+        try:
+            await self._fetch_and_store(barcode)
+        except UpstreamError as e:
+            print(f"Warning: Barcode refresh failed for {barcode}, serving cached entry: {e}")
+            entry = self.cache.get(barcode)
+            if entry is not None:
+                self.cache.set(barcode, {**entry, 'expires_at': get_ist_now() + self.REFRESH_RETRY})
+
+    @staticmethod
+    def _entry(found: bool, data: Optional[Dict], expires_at: datetime) -> Dict:
+        return {'found': found, 'data': data, 'expires_at': expires_at}
@@ -0,0 +1,101 @@
+"""
+In-memory caching helpers for NutriSathi
+Bounded LRU used to serve repeat recommendation and plan requests without recomputing,
+and single-flight coalescing of concurrent identical upstream calls
+"""
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+def stable_seed(*parts: Any) -> int:
+    """
+    Derive a 64-bit seed from request parts (user, date, inputs).
+
+    Unlike hash(), the result is the same across processes and restarts, so
+    identical requests always draw the same random choices.
+    """
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache.
+
+    Entries can be tied to a data version (e.g. the dish catalog version);
+    ensure_version() drops everything cached against an older one.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version: Optional[Hashable] = None
+        self.hits = 0
+        self.misses = 0
+
+    def ensure_version(self, version: Hashable) -> None:
+        """Clear the cache if it was filled against a different version"""
+        with self._lock:
+            if self.version != version:
+                self._data.clear()
+                self.version = version
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value (marking it recently used) or default"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls for the same key into one in-flight call.
+
+    The first caller for a key starts the call; callers arriving before it
+    finishes await the same task and get its result or exception. Waiters
+    are shielded, so one cancelled request does not cancel the shared call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run call() for key, or join the call already in flight for it"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
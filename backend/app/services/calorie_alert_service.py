@@ -6,31 +6,45 @@ Detects when meals exceed target calories and suggests corrections
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from app.db.models import get_ist_now
+
 
 class CalorieAlertService:
     """
     Service to detect high calorie meals and provide intelligent suggestions
     """
     
-    def __init__(self, meals_db: List[dict], users_db: Dict[str, dict]):
+    # Catalog swaps offered for the next meal
+    MAX_SWAPS = 3
+
+    def __init__(self, meals_db: List[dict], users_db: Dict[str, dict], similarity_index=None):
         self.meals_db = meals_db
         self.users_db = users_db
+        # DishSimilarityIndex over the dish catalog; without it only generic suggestions are given
+        self.similarity_index = similarity_index
     
     def _get_user_daily_target(self, email: str) -> int:
-        """Get user's daily calorie target (default: 2000 kcal)"""
+        """Get user's stored daily calorie target (default: 2000 kcal)"""
         user = self.users_db.get(email, {})
-        return user.get('daily_calorie_target', 2000)
+        return user.get('daily_calorie_target') or 2000
     
-    def _get_meal_type_target(self, daily_target: int, meal_type: str) -> int:
+    def _get_meal_type_target(self, daily_target: int, meal_type: str, email: Optional[str] = None) -> int:
         """
         Calculate target calories for specific meal type
         
-        Typical distribution:
+        Uses the user's stored per-meal targets when there are any
+        ('snack' is their evening_snack), otherwise the typical distribution:
         - Breakfast: 25% (500 kcal for 2000 kcal/day)
         - Lunch: 35% (700 kcal)
         - Dinner: 30% (600 kcal)
         - Snack: 10% (200 kcal)
         """
+        stored = self.users_db.get(email, {}).get('meal_calorie_targets') if email else None
+        if stored:
+            stored_key = 'evening_snack' if meal_type.lower() == 'snack' else meal_type.lower()
+            if stored_key in stored:
+                return int(stored[stored_key])
+        
         distribution = {
             'breakfast': 0.25,
             'lunch': 0.35,
@@ -44,8 +58,8 @@ class CalorieAlertService:
         return int(daily_target * percentage)
     
     def _get_today_meals(self, email: str) -> List[dict]:
-        """Get all meals logged today by user"""
-        today = datetime.now().date()
+        """Get all meals logged today (IST, like meal timestamps) by user"""
+        today = get_ist_now().date()
         user_meals = [m for m in self.meals_db if m.get('user') == email]
         
         today_meals = []
@@ -108,6 +122,35 @@ class CalorieAlertService:
         }
         
         return recommendations.get(meal_type.lower(), recommendations['dinner'])
+
+    def _get_lighter_swaps(
+        self,
+        email: str,
+        meal_name: Optional[str],
+        meal_macros: Optional[Dict],
+        target_calories: int
+    ) -> List[Dict]:
+        """
+        Catalog dishes similar to the meal that fit within the next meal's target.
+
+        Empty (so the generic suggestions are used) when no dish is similar
+        enough to clear the index's similarity floor.
+        """
+        if self.similarity_index is None or not meal_name:
+            return []
+
+        macros = meal_macros or {}
+        user = self.users_db.get(email, {})
+        return self.similarity_index.similar(
+            meal_name,
+            max_calories=target_calories,
+            limit=self.MAX_SWAPS,
+            dietary_preference=user.get('dietary_preference'),
+            allergies=user.get('allergies'),
+            protein=macros.get('protein'),
+            carbs=macros.get('carbs'),
+            fat=macros.get('fat')
+        )
     
     def _suggest_next_meal_type(self, current_meal_type: str) -> str:
         """Determine which meal comes next"""
@@ -125,7 +168,9 @@ class CalorieAlertService:
         self, 
         email: str, 
         meal_calories: float, 
-        meal_type: str
+        meal_type: str,
+        meal_name: Optional[str] = None,
+        meal_macros: Optional[Dict] = None
     ) -> Optional[Dict]:
         """
         Check if meal exceeds target and return warning with suggestions
@@ -134,12 +179,14 @@ class CalorieAlertService:
             email: User's email
             meal_calories: Calories in the current meal
             meal_type: Type of meal (breakfast/lunch/dinner/snack)
+            meal_name: Name of the meal, used to find similar lighter dishes
+            meal_macros: protein/carbs/fat grams of the meal, for names outside the catalog
         
         Returns:
             Warning dict if meal exceeds target, None otherwise
         """
         daily_target = self._get_user_daily_target(email)
-        meal_target = self._get_meal_type_target(daily_target, meal_type)
+        meal_target = self._get_meal_type_target(daily_target, meal_type, email)
         
         # Check if meal exceeds its target
         if meal_calories <= meal_target:
@@ -152,10 +199,17 @@ class CalorieAlertService:
         
         # Determine next meal type
         next_meal_type = self._suggest_next_meal_type(meal_type)
-        next_meal_target = self._get_meal_type_target(daily_target, next_meal_type)
+        next_meal_target = self._get_meal_type_target(daily_target, next_meal_type, email)
         
-        # Get lighter recommendations
-        recommendations = self._get_lighter_recommendations(next_meal_type, next_meal_target)
+        # Get lighter recommendations: similar catalog dishes first, generic ideas otherwise
+        swaps = self._get_lighter_swaps(email, meal_name, meal_macros, next_meal_target)
+        if swaps:
+            recommendations = [
+                f"Swap for {swap['name']} ({swap['serving_size']:g}{swap['unit']}, ~{int(swap['calories'])} kcal)"
+                for swap in swaps
+            ]
+        else:
+            recommendations = self._get_lighter_recommendations(next_meal_type, next_meal_target)
         
         # Build warning message
         warning = {
@@ -176,7 +230,8 @@ class CalorieAlertService:
                 'next_meal_type': next_meal_type,
                 'next_meal_target': next_meal_target,
                 'question': f"Would you like a lighter {next_meal_type} recommendation?",
-                'recommendations': recommendations
+                'recommendations': recommendations,
+                'swaps': swaps
             }
         }
         
@@ -2,9 +2,11 @@
 AI-Driven Daily Calorie Calculator for NutriSathi
 Uses Mifflin-St Jeor equation (scientifically proven formula used by nutritionists)
 """
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 class CalorieCalculator:
     """
@@ -60,6 +62,14 @@ class CalorieCalculator:
         }
     }
     
+    # Mifflin-St Jeor gender constants; other values use the average (-78)
+    GENDER_OFFSETS = {
+        'male': 5, 'm': 5, 'man': 5,
+        'female': -161, 'f': -161, 'woman': -161
+    }
+    
+    MEAL_TYPES = ['breakfast', 'lunch', 'evening_snack', 'dinner']
+    
     def __init__(self):
         """Initialize the calorie calculator"""
         pass
@@ -237,18 +247,7 @@ class CalorieCalculator:
         - Muscle Gain: High protein (30%), High carbs (45%), Moderate fat (25%)
         - Maintain: Balanced (25% protein, 45% carbs, 30% fat)
         """
-        if 'weight_loss' in health_goal.lower():
-            protein_percent = 0.30
-            carbs_percent = 0.40
-            fat_percent = 0.30
-        elif 'muscle' in health_goal.lower() or 'bulk' in health_goal.lower():
-            protein_percent = 0.30
-            carbs_percent = 0.45
-            fat_percent = 0.25
-        else:
-            protein_percent = 0.25
-            carbs_percent = 0.45
-            fat_percent = 0.30
+        protein_percent, carbs_percent, fat_percent = self._macro_split(health_goal)
         
         # Calculate grams (protein = 4 cal/g, carbs = 4 cal/g, fat = 9 cal/g)
         protein_grams = round((daily_calories * protein_percent) / 4)
@@ -273,6 +272,174 @@ class CalorieCalculator:
             }
         }
     
+    @staticmethod
+    def _macro_split(health_goal: str) -> Tuple[float, float, float]:
+        """(protein, carbs, fat) calorie shares for a health goal"""
+        if 'weight_loss' in health_goal.lower():
+            return 0.30, 0.40, 0.30
+        if 'muscle' in health_goal.lower() or 'bulk' in health_goal.lower():
+            return 0.30, 0.45, 0.25
+        return 0.25, 0.45, 0.30
+    
+    def calculate_daily_calories_batch(self, profiles: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Vectorized calculate_daily_calories over many profiles.
+        
+        BMR, TDEE, goal adjustment, meal split and macro grams are computed
+        as NumPy array operations; only the per-profile parsing and the
+        result dicts are Python loops. Results have the same fields as
+        calculate_daily_calories except insights, which are not generated.
+        
+        Args:
+            profiles: Dicts with weight, height, age, gender and optional
+                activity_level / health_goal (same fields as the single endpoint)
+        
+        Returns:
+            One dict per profile, in input order: 'index' plus the calorie
+            targets, or {'index', 'error'} for a profile that could not be calculated
+        """
+        errors: Dict[int, str] = {}
+        
+        weight = self._numeric_column(profiles, 'weight', errors)
+        height = self._numeric_column(profiles, 'height', errors)
+        age = self._numeric_column(profiles, 'age', errors)
+        
+        # Categorical fields: look each distinct value up once, then gather per profile
+        gender_index, genders = self._categorical_column(profiles, 'gender')
+        for i in np.flatnonzero(np.array([not gender for gender in genders], dtype=bool)[gender_index]).tolist():
+            errors.setdefault(i, "Missing required parameters for BMR calculation")
+        gender_offset = np.array(
+            [self.GENDER_OFFSETS.get(str(gender or '').lower(), -78) for gender in genders], dtype=np.float64
+        )[gender_index]
+        
+        activity_index, activity_levels = self._categorical_column(profiles, 'activity_level')
+        multiplier = np.array(
+            [self.ACTIVITY_MULTIPLIERS.get(str(level or 'moderately_active').lower(), 1.55) for level in activity_levels],
+            dtype=np.float64
+        )[activity_index]
+        
+        goal_index, raw_goals = self._categorical_column(profiles, 'health_goal')
+        goals = [str(goal or 'maintain_weight').lower() for goal in raw_goals]
+        adjustment = np.array([self.HEALTH_GOAL_ADJUSTMENTS.get(goal, 0) for goal in goals], dtype=np.float64)
+        splits = np.array(
+            [[self.GOAL_BASED_MEAL_SPLITS.get(goal, self.DEFAULT_MEAL_SPLIT)[meal] for meal in self.MEAL_TYPES] for goal in goals],
+            dtype=np.float64
+        ).reshape(len(goals), len(self.MEAL_TYPES))
+        macro_shares = np.array([self._macro_split(goal) for goal in goals], dtype=np.float64).reshape(len(goals), 3)
+        # Percentages depend only on the goal; each distinct goal's dicts are shared by its profiles
+        split_percentages = [
+            {meal: round(share * 100) for meal, share in zip(self.MEAL_TYPES, row)} for row in splits.tolist()
+        ]
+        macro_percentages = [[round(share * 100) for share in row] for row in macro_shares.tolist()]
+        adjustment = adjustment[goal_index]
+        split = splits[goal_index]
+        macro_share = macro_shares[goal_index]
+        
+        bmr = self._round_tenths(10 * weight + 6.25 * height - 5 * age + gender_offset)
+        tdee = self._round_tenths(bmr * multiplier)
+        # Never below the minimum safe intake (BMR * 1.2)
+        daily = np.rint(np.maximum(tdee + adjustment, bmr * 1.2))
+        
+        meals = np.rint(daily[:, None] * split)
+        # Rounding remainder goes to lunch, as in calculate_daily_calories
+        meals[:, 1] += daily - meals.sum(axis=1)
+        # Grams at 4 kcal/g protein and carbs, 9 kcal/g fat
+        macros = np.rint(daily[:, None] * macro_share / np.array([4.0, 4.0, 9.0]))
+        
+        calculated_at = datetime.now().isoformat()
+        # One int column per output field; zip builds each result without per-row arrays
+        columns = np.column_stack([
+            daily, np.rint(bmr), np.rint(tdee), adjustment, meals, macros, goal_index, activity_index
+        ]).astype(np.int64)
+        results = []
+        for i, (daily_calories, bmr_i, tdee_i, adjustment_i, breakfast, lunch, snack, dinner,
+                protein, carbs, fat, goal_i, activity_i) in enumerate(zip(*columns.T.tolist())):
+            if i in errors:
+                results.append({'index': i, 'error': errors[i]})
+                continue
+            protein_percent, carbs_percent, fat_percent = macro_percentages[goal_i]
+            results.append({
+                'index': i,
+                'daily_calories': daily_calories,
+                'bmr': bmr_i,
+                'tdee': tdee_i,
+                'adjustment': adjustment_i,
+                'meal_calories': {'breakfast': breakfast, 'lunch': lunch, 'evening_snack': snack, 'dinner': dinner},
+                'meal_split_percentages': split_percentages[goal_i],
+                'macros': {
+                    'protein': {'grams': protein, 'calories': protein * 4, 'percentage': protein_percent},
+                    'carbs': {'grams': carbs, 'calories': carbs * 4, 'percentage': carbs_percent},
+                    'fat': {'grams': fat, 'calories': fat * 9, 'percentage': fat_percent}
+                },
+                'metadata': {
+                    'formula_used': 'Mifflin-St Jeor',
+                    'activity_level': str(activity_levels[activity_i] or 'moderately_active'),
+                    'health_goal': str(raw_goals[goal_i] or 'maintain_weight'),
+                    'calculated_at': calculated_at
+                }
+            })
+        return results
+    
+    @staticmethod
+    def _categorical_column(profiles: List[Dict[str, Any]], field: str) -> Tuple[np.ndarray, List[Any]]:
+        """Per-profile codes for a field's values, and the distinct values they index"""
+        values = [profile.get(field) for profile in profiles]
+        try:
+            distinct = list(dict.fromkeys(values))
+        except TypeError:
+            # An unhashable value (list, dict); compare those by their text
+            values = [value if isinstance(value, (str, type(None))) else str(value) for value in values]
+            distinct = list(dict.fromkeys(values))
+        codes = {value: i for i, value in enumerate(distinct)}
+        return np.fromiter(map(codes.__getitem__, values), dtype=np.int64, count=len(values)), distinct
+    
+    @staticmethod
+    def _round_tenths(values: np.ndarray) -> np.ndarray:
+        """
+        round(value, 1) element-wise, matching Python's rounding exactly.
+        
+        np.round scales by 10 first, which can land on the other side of a
+        .x5 tie than Python's correctly rounded result; the few values near a
+        tie are rounded with Python instead.
+        """
+        scaled = values * 10
+        rounded = np.rint(scaled) / 10
+        near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        if near_tie.size:
+            rounded[near_tie] = [round(value, 1) for value in values[near_tie].tolist()]
+        return rounded
+    
+    @staticmethod
+    def _numeric_column(profiles: List[Dict[str, Any]], field: str, errors: Dict[int, str]) -> np.ndarray:
+        """
+        Float array of one profile field, recording profiles without a positive number.
+        
+        Invalid entries are set to 0 so the vectorized math still runs; their
+        results are replaced by the recorded error.
+        """
+        values = [profile.get(field) for profile in profiles]
+        try:
+            column = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Some value is not numeric; convert one by one
+            column = np.empty(len(values))
+            for i, value in enumerate(values):
+                try:
+                    column[i] = float(value) if value is not None else np.nan
+                except (TypeError, ValueError):
+                    column[i] = np.nan
+        
+        invalid = ~(np.isfinite(column) & (column > 0))
+        for i in np.flatnonzero(invalid).tolist():
+            if i in errors:
+                continue
+            if values[i] in (None, '', 0):
+                errors[i] = "Missing required parameters for BMR calculation"
+            else:
+                errors[i] = f"Invalid {field}: {values[i]!r}"
+        column[invalid] = 0
+        return column
+    
     def _generate_insights(
         self, 
         daily_calories: int,
@@ -0,0 +1,83 @@
+"""
+Stored Calorie Targets for NutriSathi
+Keeps each user's CalorieCalculator output on their row, recomputed only when its inputs change
+"""
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.calorie_calculator import CalorieCalculator
+
+
+class CalorieTargetService:
+    """
+    Reads and refreshes users.calorie_targets.
+
+    Signup and profile updates refresh the stored targets when the calculator
+    inputs change; everything else (alerts, summaries, meal plans, the nightly
+    job) reads them instead of recalculating. Users created before targets
+    were stored get theirs on first read.
+    """
+
+    INPUT_FIELDS = ('weight', 'height', 'age', 'gender', 'activity_level', 'health_goal')
+    REQUIRED_FIELDS = ('weight', 'height', 'age', 'gender')
+
+    @classmethod
+    def inputs(cls, source: Any) -> Tuple:
+        """Calculator inputs of a user row or profile dict, with the calculator's defaults applied"""
+        get = source.get if isinstance(source, dict) else lambda field: getattr(source, field, None)
+        values = {field: get(field) for field in cls.INPUT_FIELDS}
+        values['activity_level'] = values['activity_level'] or 'moderately_active'
+        values['health_goal'] = values['health_goal'] or 'maintain_weight'
+        return tuple(values[field] for field in cls.INPUT_FIELDS)
+
+    @classmethod
+    def is_complete(cls, source: Any) -> bool:
+        """Whether a user row or profile dict has everything the calculator needs"""
+        get = source.get if isinstance(source, dict) else lambda field: getattr(source, field, None)
+        return all(get(field) for field in cls.REQUIRED_FIELDS)
+
+    @classmethod
+    def refresh(cls, user: models.User, calculator: CalorieCalculator) -> Optional[Dict]:
+        """
+        Recompute and store a user's targets (call before commit).
+
+        Incomplete profiles have their stored targets cleared.
+
+        Returns:
+            The new targets, or None for an incomplete profile
+        """
+        targets = None
+        if cls.is_complete(user):
+            weight, height, age, gender, activity_level, health_goal = cls.inputs(user)
+            try:
+                targets = calculator.calculate_daily_calories(
+                    weight=weight,
+                    height=height,
+                    age=age,
+                    gender=gender,
+                    activity_level=activity_level,
+                    health_goal=health_goal
+                )
+            except ValueError:
+                targets = None
+
+        user.calorie_targets = json.dumps(targets) if targets else None
+        user.daily_calorie_target = targets['daily_calories'] if targets else None
+        return targets
+
+    @staticmethod
+    def stored(user: models.User) -> Optional[Dict]:
+        """The user's stored targets, if any"""
+        return json.loads(user.calorie_targets) if user.calorie_targets else None
+
+    @classmethod
+    def get(cls, db: Session, user: models.User, calculator: CalorieCalculator) -> Optional[Dict]:
+        """Stored targets, computing and saving them once for users who have none yet"""
+        targets = cls.stored(user)
+        if targets is None and cls.is_complete(user):
+            targets = cls.refresh(user, calculator)
+            db.commit()
+        return targets
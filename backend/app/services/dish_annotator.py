@@ -0,0 +1,288 @@
+"""
+Dish Catalog Annotation for NutriSathi
+Classifies every dish once at catalog load so recommenders can read tags instead of rescanning names
+"""
+import hashlib
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.services.keyword_matcher import KeywordMatcher
+
+
+class DishAnnotator:
+    """
+    Attaches normalized tag sets to catalog dishes.
+
+    Each annotated dish gets a ``tags`` dict with:
+    - diet: 'vegan', 'vegetarian' or 'non_vegetarian'
+    - allergens: allergen classes detected in the dish (dairy, gluten, nuts...)
+    - categories: ThaliRecommender.FOOD_CATEGORIES memberships
+    - properties: MoodRecommender.FOOD_KEYWORDS properties (light, heavy, warming...)
+    - keywords: every classification keyword found in the dish name
+    """
+
+    DIET_VEGAN = 'vegan'
+    DIET_VEGETARIAN = 'vegetarian'
+    DIET_NON_VEGETARIAN = 'non_vegetarian'
+
+    # Keywords that make a dish non-vegetarian
+    NON_VEG_KEYWORDS = [
+        'chicken', 'fish', 'meat', 'egg', 'prawn', 'mutton', 'lamb',
+        'keema', 'beef', 'pork', 'salmon', 'tuna', 'shrimp', 'crab'
+    ]
+
+    # Keywords that make a vegetarian dish non-vegan
+    DAIRY_KEYWORDS = ['paneer', 'cheese', 'butter', 'ghee', 'curd', 'milk', 'cream']
+
+    # Allergen classes and the dish-name keywords that indicate them
+    ALLERGEN_KEYWORDS = {
+        'dairy': DAIRY_KEYWORDS + ['lassi', 'raita', 'yogurt', 'kheer', 'malai', 'khoa'],
+        'gluten': ['roti', 'chapati', 'naan', 'paratha', 'kulcha', 'wheat', 'maida', 'pav', 'bread', 'samosa', 'puri', 'bhatura'],
+        'nuts': ['nuts', 'almond', 'cashew', 'walnut', 'pistachio', 'kaju', 'badam'],
+        'peanut': ['peanut', 'groundnut'],
+        'egg': ['egg', 'omelette'],
+        'fish': ['fish', 'salmon', 'tuna'],
+        'shellfish': ['prawn', 'shrimp', 'crab', 'lobster'],
+        'soy': ['soya', 'soy', 'tofu'],
+        'sesame': ['sesame']
+    }
+
+    # User-entered allergy names mapped to allergen classes
+    ALLERGEN_ALIASES = {
+        'dairy': 'dairy', 'milk': 'dairy', 'lactose': 'dairy',
+        'gluten': 'gluten', 'wheat': 'gluten',
+        'nut': 'nuts', 'nuts': 'nuts', 'tree nut': 'nuts', 'tree nuts': 'nuts',
+        'peanut': 'peanut', 'peanuts': 'peanut', 'groundnut': 'peanut',
+        'egg': 'egg', 'eggs': 'egg',
+        'fish': 'fish',
+        'shellfish': 'shellfish', 'prawn': 'shellfish', 'prawns': 'shellfish', 'shrimp': 'shellfish',
+        'soy': 'soy', 'soya': 'soy',
+        'sesame': 'sesame'
+    }
+
+    # Optional dishes.csv column values mapped to diet classes
+    DIET_ALIASES = {
+        'vegan': DIET_VEGAN,
+        'veg': DIET_VEGETARIAN,
+        'vegetarian': DIET_VEGETARIAN,
+        'non_veg': DIET_NON_VEGETARIAN,
+        'nonveg': DIET_NON_VEGETARIAN,
+        'non_vegetarian': DIET_NON_VEGETARIAN
+    }
+
+    def __init__(self):
+        """Build the keyword vocabulary from every classification table"""
+        # Imported here because the recommenders annotate raw dishes through this module
+        from app.services.thali_recommender import ThaliRecommender
+        from app.services.mood_recommender import MoodRecommender
+
+        self.categories = {
+            category: [keyword.lower() for keyword in keywords]
+            for category, keywords in ThaliRecommender.FOOD_CATEGORIES.items()
+        }
+        self.properties = {
+            prop: [keyword.lower() for keyword in keywords]
+            for prop, keywords in MoodRecommender.FOOD_KEYWORDS.items()
+        }
+
+        # Invert every table into keyword -> labels so a dish's tags come straight from its hits
+        self.keyword_categories: Dict[str, set] = {}
+        self.keyword_properties: Dict[str, set] = {}
+        self.keyword_allergens: Dict[str, set] = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(keyword, set()).add(category)
+        for prop, keywords in self.properties.items():
+            for keyword in keywords:
+                self.keyword_properties.setdefault(keyword, set()).add(prop)
+        for allergen, keywords in self.ALLERGEN_KEYWORDS.items():
+            for keyword in keywords:
+                self.keyword_allergens.setdefault(keyword, set()).add(allergen)
+        self.non_veg_keywords = frozenset(self.NON_VEG_KEYWORDS)
+
+        vocabulary = set(self.NON_VEG_KEYWORDS) | set(self.DAIRY_KEYWORDS)
+        vocabulary.update(self.keyword_categories)
+        vocabulary.update(self.keyword_properties)
+        vocabulary.update(self.keyword_allergens)
+        vocabulary.update(MoodRecommender.keyword_vocabulary())
+
+        self.vocabulary = sorted(vocabulary)
+        self.matcher = KeywordMatcher(self.vocabulary)
+
+    def annotate(self, dish: Dict, row: Optional[Dict] = None) -> Dict:
+        """
+        Attach tags to a single dish.
+
+        Args:
+            dish: Dish dict with at least a 'name'
+            row: Optional raw CSV row; 'diet', 'allergens', 'categories' and 'tags'
+                 columns (separated by ';' or '|') override or extend the heuristics
+
+        Returns:
+            The same dish dict, with a 'tags' entry
+        """
+        keywords = self.matcher.find_all(dish['name'])
+
+        categories = set()
+        properties = set()
+        allergens = set()
+        for keyword in keywords:
+            categories.update(self.keyword_categories.get(keyword, ()))
+            properties.update(self.keyword_properties.get(keyword, ()))
+            allergens.update(self.keyword_allergens.get(keyword, ()))
+
+        if row:
+            allergens.update(
+                self.ALLERGEN_ALIASES.get(value, value)
+                for value in self._split_column(row.get('allergens'))
+            )
+            categories.update(self._split_column(row.get('categories')))
+            properties.update(self._split_column(row.get('tags')))
+
+        if not keywords.isdisjoint(self.non_veg_keywords):
+            diet = self.DIET_NON_VEGETARIAN
+        elif 'dairy' in allergens:
+            diet = self.DIET_VEGETARIAN
+        else:
+            diet = self.DIET_VEGAN
+
+        if row and row.get('diet'):
+            diet = self.DIET_ALIASES.get(self._normalize(row['diet']), diet)
+
+        dish['tags'] = {
+            'diet': diet,
+            'allergens': frozenset(allergens),
+            'categories': frozenset(categories),
+            'properties': frozenset(properties),
+            'keywords': keywords
+        }
+        return dish
+
+    def annotate_all(self, dishes: List[Dict]) -> List[Dict]:
+        """Annotate every dish that has not been annotated yet"""
+        for dish in dishes:
+            if 'tags' not in dish:
+                self.annotate(dish)
+        return dishes
+
+    @staticmethod
+    def allowed_diets(dietary_preference: Optional[str]) -> Optional[FrozenSet[str]]:
+        """
+        Map a user's dietary preference to the diet classes they can eat.
+
+        Returns None when every dish is allowed.
+        """
+        if not dietary_preference:
+            return None
+
+        pref = DishAnnotator._normalize(dietary_preference)
+        if 'vegan' in pref:
+            return frozenset([DishAnnotator.DIET_VEGAN])
+        if pref.startswith('non') or 'non_veg' in pref:
+            return None
+        if 'veg' in pref:
+            return frozenset([DishAnnotator.DIET_VEGAN, DishAnnotator.DIET_VEGETARIAN])
+        return None
+
+    @classmethod
+    def parse_allergies(cls, allergies: Optional[Iterable[str]]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+        """
+        Split user allergies into known allergen classes and free-text terms.
+
+        Known classes are matched against precomputed tags; free-text terms
+        (e.g. 'mushroom') still fall back to a dish-name check.
+        """
+        classes = set()
+        terms = []
+        for allergen in allergies or []:
+            allergen_lower = allergen.strip().lower()
+            if not allergen_lower:
+                continue
+            allergen_class = cls.ALLERGEN_ALIASES.get(allergen_lower)
+            if allergen_class:
+                classes.add(allergen_class)
+            else:
+                terms.append(allergen_lower)
+        return frozenset(classes), tuple(terms)
+
+    @classmethod
+    def filter_dishes(
+        cls,
+        dishes: List[Dict],
+        dietary_preference: Optional[str] = None,
+        allergies: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Filter annotated dishes by dietary preference and allergies"""
+        diets = cls.allowed_diets(dietary_preference)
+        allergen_classes, terms = cls.parse_allergies(allergies)
+
+        if diets is None and not allergen_classes and not terms:
+            return list(dishes)
+
+        return [
+            dish for dish in dishes
+            if cls.is_allowed(dish, diets, allergen_classes, terms)
+        ]
+
+    @staticmethod
+    def is_allowed(
+        dish: Dict,
+        diets: Optional[FrozenSet[str]],
+        allergen_classes: FrozenSet[str],
+        terms: Tuple[str, ...]
+    ) -> bool:
+        """Check one annotated dish against parsed diet and allergy filters"""
+        tags = dish['tags']
+        if diets is not None and tags['diet'] not in diets:
+            return False
+        if allergen_classes and not allergen_classes.isdisjoint(tags['allergens']):
+            return False
+        if terms:
+            name_lower = dish['name'].lower()
+            if any(term in name_lower for term in terms):
+                return False
+        return True
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        return value.strip().lower().replace(' ', '_').replace('-', '_')
+
+    @staticmethod
+    def _split_column(value: Optional[str]) -> List[str]:
+        if not value:
+            return []
+        parts = value.replace('|', ';').split(';')
+        return [DishAnnotator._normalize(part) for part in parts if part.strip()]
+
+
+_default_annotator: Optional[DishAnnotator] = None
+
+
+def annotate_dishes(dishes: List[Dict]) -> List[Dict]:
+    """Annotate a catalog with the shared annotator (no-op for already-tagged dishes)"""
+    global _default_annotator
+    if _default_annotator is None:
+        _default_annotator = DishAnnotator()
+    return _default_annotator.annotate_all(dishes)
+
+
+def catalog_version(dishes: List[Dict]) -> str:
+    """
+    Fingerprint a catalog's names, nutrition values and diet tags.
+
+    Any change to the dishes a recommender sees gives a new version, which is
+    what response caches key on.
+    """
+    digest = hashlib.sha1()
+    for dish in dishes:
+        tags = dish.get('tags') or {}
+        digest.update(repr((
+            dish.get('name'),
+            dish.get('serving_size'),
+            dish.get('calories'),
+            dish.get('protein'),
+            dish.get('carbs'),
+            dish.get('fat'),
+            tags.get('diet'),
+            sorted(tags.get('allergens', ()))
+        )).encode('utf-8'))
+    return digest.hexdigest()[:12]
@@ -0,0 +1,51 @@
+"""
+Dish Catalog Loading for NutriSathi
+Reads data/dishes.csv into annotated dish dicts for the API and the batch jobs
+"""
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.dish_annotator import DishAnnotator
+
+
+DEFAULT_CSV_PATH = Path(__file__).resolve().parents[3] / "data" / "dishes.csv"
+
+
+def load_dishes_from_csv(csv_path: Optional[Path] = None) -> List[Dict]:
+    """Load dishes from data/dishes.csv and tag them once for the recommenders"""
+    dishes = []
+    annotator = DishAnnotator()
+    csv_path = csv_path or DEFAULT_CSV_PATH
+    
+    if csv_path.exists():
+        try:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    if row.get('name'):  # Skip empty rows
+                        dishes.append(annotator.annotate({
+                            "name": row['name'],
+                            "cuisine": row.get('cuisine', ''),
+                            "serving_size": float(row.get('serving_g', 100)),
+                            "unit": "g",
+                            "calories": float(row.get('calories_kcal', 0)),
+                            "protein": float(row.get('protein_g', 0)),
+                            "carbs": float(row.get('carbs_g', 0)),
+                            "fat": float(row.get('fat_g', 0))
+                        }, row))
+        except Exception as e:
+            print(f"Warning: Could not load dishes.csv: {e}")
+    
+    # Fallback to sample dishes if CSV is empty or failed
+    if not dishes:
+        dishes = [
+            {"name": "Dal Tadka", "serving_size": 200, "unit": "g", "calories": 220, "protein": 12, "carbs": 26, "fat": 8},
+            {"name": "Roti (Whole Wheat)", "serving_size": 50, "unit": "g", "calories": 120, "protein": 4, "carbs": 22, "fat": 2},
+            {"name": "Chicken Curry", "serving_size": 200, "unit": "g", "calories": 320, "protein": 28, "carbs": 10, "fat": 18},
+            {"name": "Masala Dosa", "serving_size": 180, "unit": "g", "calories": 280, "protein": 7, "carbs": 45, "fat": 8},
+            {"name": "Idli", "serving_size": 70, "unit": "g", "calories": 60, "protein": 2, "carbs": 12, "fat": 0.5}
+        ]
+        annotator.annotate_all(dishes)
+    
+    return dishes
@@ -0,0 +1,160 @@
+"""
+Dish Similarity Index for NutriSathi
+Nearest-neighbor search over name tokens and macro ratios for catalog-backed swap suggestions
+"""
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.dish_annotator import DishAnnotator, annotate_dishes
+from app.services.preference_vectors import PreferenceVectorService
+
+
+class DishSimilarityIndex:
+    """
+    Vectorized cosine-similarity search over the dish catalog.
+
+    A dish's features are its IDF-weighted name tokens (kept as an inverted
+    index, so the token part never materializes an n x vocabulary matrix) and
+    its unit (protein, carbs, fat) calorie vector. Similarity blends the two
+    cosines; filtering and top-k run as NumPy array operations.
+    """
+
+    TOKEN_WEIGHT = 0.6
+    MACRO_WEIGHT = 0.4
+    # Matches must share a name token and score at least this; a dish that
+    # merely has a similar macro split (Raita for Butter Chicken) is no swap
+    MIN_SIMILARITY = 0.3
+
+    def __init__(self, dishes: List[Dict]):
+        """Build the token postings and feature arrays for a catalog"""
+        self.dishes = annotate_dishes(dishes)
+        self.name_index = {dish['name'].strip().lower(): i for i, dish in enumerate(dishes)}
+        self.calories = np.array([dish.get('calories', 0) for dish in dishes], dtype=np.float64)
+        self.diets = np.array([dish['tags']['diet'] for dish in dishes], dtype=object)
+        self.macros = np.array(
+            [
+                PreferenceVectorService.unit_macros(dish.get('protein', 0), dish.get('carbs', 0), dish.get('fat', 0))
+                for dish in dishes
+            ],
+            dtype=np.float64
+        ).reshape(len(dishes), 3)
+
+        postings: Dict[str, List[int]] = {}
+        self.dish_tokens = []
+        for i, dish in enumerate(dishes):
+            tokens = PreferenceVectorService.tokenize(dish['name'])
+            self.dish_tokens.append(tokens)
+            for token in tokens:
+                postings.setdefault(token, []).append(i)
+
+        count = max(len(dishes), 1)
+        self.idf = {token: math.log((1 + count) / (1 + len(ids))) + 1 for token, ids in postings.items()}
+        self.postings = {token: np.array(ids, dtype=np.int64) for token, ids in postings.items()}
+        self.token_norms = np.array(
+            [math.sqrt(sum(self.idf[token] ** 2 for token in tokens)) for tokens in self.dish_tokens],
+            dtype=np.float64
+        )
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Catalog dish with this name (case-insensitive), if any"""
+        index = self.name_index.get(name.strip().lower())
+        return self.dishes[index] if index is not None else None
+
+    def similar(
+        self,
+        name: str,
+        max_calories: Optional[float] = None,
+        limit: int = 5,
+        dietary_preference: Optional[str] = None,
+        allergies: Optional[List[str]] = None,
+        protein: Optional[float] = None,
+        carbs: Optional[float] = None,
+        fat: Optional[float] = None,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Find the catalog dishes most similar to a dish.
+
+        Args:
+            name: Catalog dish name, or any meal name (its tokens are used)
+            max_calories: Only return dishes at or under this many calories
+            limit: Number of dishes to return
+            dietary_preference: Only return dishes this diet allows
+            allergies: Leave out dishes with these allergens (tags or, for
+                free-text terms, the dish name)
+            protein, carbs, fat: Macros for a name that is not in the catalog
+            min_similarity: Drop dishes scoring below this (default MIN_SIMILARITY);
+                dishes sharing no name token are always dropped
+
+        Returns:
+            Dish dicts with a 'similarity' score (0-1), most similar first;
+            empty when no dish clears the floor
+        """
+        if not self.dishes or limit <= 0:
+            return []
+
+        index = self.name_index.get(name.strip().lower())
+        if index is not None:
+            tokens = self.dish_tokens[index]
+            query_macros = self.macros[index]
+        else:
+            tokens = PreferenceVectorService.tokenize(name)
+            query_macros = np.array(PreferenceVectorService.unit_macros(protein or 0, carbs or 0, fat or 0))
+
+        # Token cosine: accumulate IDF^2 over the postings of the query's tokens
+        token_scores = np.zeros(len(self.dishes))
+        query_norm = 0.0
+        for token in tokens:
+            weight = self.idf.get(token)
+            if weight is None:
+                continue
+            token_scores[self.postings[token]] += weight * weight
+            query_norm += weight * weight
+        if query_norm > 0:
+            norms = self.token_norms * math.sqrt(query_norm)
+            np.divide(token_scores, norms, out=token_scores, where=norms > 0)
+
+        if query_macros.any():
+            scores = self.TOKEN_WEIGHT * token_scores + self.MACRO_WEIGHT * (self.macros @ query_macros)
+        else:
+            # No macros to compare (a name outside the catalog given alone)
+            scores = token_scores
+
+        floor = self.MIN_SIMILARITY if min_similarity is None else min_similarity
+        mask = (token_scores > 0) & (scores >= floor)
+        if index is not None:
+            mask[index] = False
+        if max_calories is not None:
+            mask &= self.calories <= max_calories
+        diets = DishAnnotator.allowed_diets(dietary_preference)
+        if diets is not None:
+            mask &= np.isin(self.diets, list(diets))
+
+        candidates = np.flatnonzero(mask)
+        allergen_classes, terms = DishAnnotator.parse_allergies(allergies)
+        if candidates.size and (allergen_classes or terms):
+            keep = [DishAnnotator.is_allowed(self.dishes[i], None, allergen_classes, terms) for i in candidates]
+            candidates = candidates[np.array(keep, dtype=bool)]
+        if candidates.size == 0:
+            return []
+        if candidates.size > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        # Best first; ties go to the lighter dish
+        candidates = candidates[np.lexsort((self.calories[candidates], -scores[candidates]))]
+
+        return [
+            {
+                'name': self.dishes[i]['name'],
+                'serving_size': self.dishes[i].get('serving_size', 100),
+                'unit': self.dishes[i].get('unit', 'g'),
+                'calories': self.dishes[i].get('calories', 0),
+                'protein': self.dishes[i].get('protein', 0),
+                'carbs': self.dishes[i].get('carbs', 0),
+                'fat': self.dishes[i].get('fat', 0),
+                'similarity': round(float(scores[i]), 3)
+            }
+            for i in candidates
+        ]
@@ -0,0 +1,123 @@
+"""
+Shared Upstream HTTP Client for NutriSathi
+One pooled, keep-alive httpx.AsyncClient for outbound calls, with per-host limits and retry with backoff
+"""
+import asyncio
+import random
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class UpstreamError(Exception):
+    """An upstream service could not be reached or answered with an error"""
+
+
+class UpstreamTimeout(UpstreamError):
+    """An upstream service did not answer in time"""
+
+
+class UpstreamHTTPClient:
+    """
+    Pooled async HTTP client shared by all upstream lookups.
+
+    The app's lifespan starts and closes it, so connections (and their TLS
+    sessions) are reused across requests instead of opened per call. Each
+    host gets at most `per_host_limit` requests in flight. Timeouts,
+    connection errors and RETRY_STATUSES are retried with exponential
+    backoff plus jitter.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 10,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_backoff: float = 2.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            timeout: Seconds per attempt (read/write/pool)
+            connect_timeout: Seconds to establish a connection
+            max_connections, max_keepalive_connections, keepalive_expiry: Pool limits
+            per_host_limit: Concurrent requests per host
+            retries: Extra attempts after the first
+            backoff: Base delay; attempt n waits backoff * 2**n plus jitter
+            max_backoff: Cap on a single delay
+            headers: Default headers (e.g. User-Agent)
+        """
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = headers or {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self) -> None:
+        """Open the connection pool (called from the app lifespan)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, headers=self.headers)
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_slots.clear()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET with retries.
+
+        Returns:
+            The response; a retryable status is returned once attempts run out
+
+        Raises:
+            UpstreamTimeout: Every attempt timed out
+            UpstreamError: The last attempt failed to connect or send
+        """
+        if self._client is None:
+            # Used outside the lifespan (scripts, tests)
+            await self.start()
+
+        host = urlsplit(url).netloc
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with slots:
+                    response = await self._client.get(url, **kwargs)
+            except httpx.TimeoutException as e:
+                if last_attempt:
+                    raise UpstreamTimeout(f"Timed out fetching {url}") from e
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise UpstreamError(f"Failed to fetch {url}: {e}") from e
+            else:
+                if response.status_code not in self.RETRY_STATUSES or last_attempt:
+                    return response
+            await asyncio.sleep(self._delay(attempt))
+
+    def _delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, capped at max_backoff"""
+        delay = self.backoff * (2 ** attempt)
+        return min(self.max_backoff, delay + random.uniform(0, self.backoff))
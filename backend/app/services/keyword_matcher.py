@@ -0,0 +1,70 @@
+"""
+Multi-pattern keyword matching for NutriSathi
+Aho-Corasick automaton that finds every classification keyword in a dish name in one pass
+"""
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+
+class KeywordMatcher:
+    """
+    Compiled Aho-Corasick matcher over a fixed keyword set.
+
+    Matching is case-insensitive and uses substring semantics, the same as
+    the ``keyword in name.lower()`` checks it replaces, but the cost is one
+    walk over the text regardless of how many keywords are registered.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """Compile the automaton for the given keywords"""
+        # Node 0 is the root; each node has goto edges, a failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+
+        outputs: List[set] = [set()]
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                node = next_node
+            outputs[node].add(keyword)
+
+        # Breadth-first pass to set failure links and merge suffix outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                outputs[child] |= outputs[self._fail[child]]
+
+        self._output: List[FrozenSet[str]] = [frozenset(found) for found in outputs]
+
+    def find_all(self, text: str) -> FrozenSet[str]:
+        """Return every registered keyword that occurs in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        node = 0
+        found = set()
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+        return frozenset(found)
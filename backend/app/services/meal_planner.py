@@ -0,0 +1,175 @@
+"""
+Full-Day and Weekly Meal Planning for NutriSathi
+Builds every meal of a day (or a 7-day week) in one pass with cross-meal variety rules
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.calorie_calculator import CalorieCalculator
+
+
+class MealPlanner:
+    """
+    Plans breakfast, lunch, evening snack and dinner for one or more days.
+
+    Per-meal calorie targets come from CalorieCalculator.calculate_daily_calories.
+    All meals share one dietary/allergy filter and the ThaliRecommender's
+    calorie index, and dishes are excluded across meals to keep the plan varied.
+    When the variety rules leave a meal with an empty required slot or well
+    under its calorie target, they are relaxed step by step down to same-day
+    uniqueness.
+    """
+
+    MEAL_ORDER = ['breakfast', 'lunch', 'evening_snack', 'dinner']
+
+    # Variety rules
+    MAX_USES_PER_PLAN = 2      # a dish appears at most twice in a weekly plan
+    REPEAT_GAP_DAYS = 2        # and never on consecutive days
+
+    def __init__(self, thali_recommender, calorie_calculator: CalorieCalculator):
+        self.thali_recommender = thali_recommender
+        self.calorie_calculator = calorie_calculator
+
+    def generate_plan(
+        self,
+        weight: float,
+        height: float,
+        age: int,
+        gender: str,
+        activity_level: str = 'moderately_active',
+        health_goal: str = 'maintain_weight',
+        dietary_preference: Optional[str] = None,
+        allergies: Optional[List[str]] = None,
+        days: int = 1,
+        start_date: Optional[date] = None,
+        targets: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Generate a meal plan.
+
+        Args:
+            weight, height, age, gender, activity_level, health_goal: Profile inputs
+                for the calorie targets
+            dietary_preference: 'Vegetarian', 'Vegan', 'Non-Vegetarian', etc.
+            allergies: List of ingredients to avoid
+            days: 1 for a day plan, 7 for a week
+            start_date: First day of the plan (defaults to today)
+            targets: Stored calculate_daily_calories output for these profile
+                inputs; calculated when not given
+
+        Returns:
+            Dictionary with calorie targets and one entry per day
+        """
+        if targets is None:
+            targets = self.calorie_calculator.calculate_daily_calories(
+                weight=weight,
+                height=height,
+                age=age,
+                gender=gender,
+                activity_level=activity_level,
+                health_goal=health_goal
+            )
+        meal_calories = targets['meal_calories']
+        start_date = start_date or date.today()
+
+        # One filter for the whole plan; results are memoized per dish across meals
+        base_filter = self.thali_recommender._build_filter(dietary_preference, allergies)
+        allowed_memo: Dict[int, bool] = {}
+
+        def allowed(dish: Dict) -> bool:
+            key = id(dish)
+            if key not in allowed_memo:
+                allowed_memo[key] = base_filter(dish)
+            return allowed_memo[key]
+
+        uses: Dict[str, int] = {}
+        last_day_used: Dict[str, int] = {}
+        plan_days = []
+
+        for day_index in range(days):
+            day_dishes: Set[str] = set()
+            meals = {}
+
+            for meal_type in self.MEAL_ORDER:
+                calorie_goal = meal_calories[meal_type]
+                overused = {name for name, count in uses.items() if count >= self.MAX_USES_PER_PLAN}
+                recent = {name for name, day in last_day_used.items() if day_index - day < self.REPEAT_GAP_DAYS}
+                # Cross-day rules first, then without the repeat gap, then same-day uniqueness only,
+                # until a thali fills every required slot near the calorie goal
+                best = None
+                for exclude in (day_dishes | overused | recent, day_dishes | overused, day_dishes):
+                    thali = self._compose(meal_type, calorie_goal, allowed, health_goal, exclude)
+                    if thali is None:
+                        continue
+                    shortfall = self._shortfall(meal_type, thali)
+                    if best is None or shortfall < best[0]:
+                        best = (shortfall, thali)
+                    if shortfall == (0, 0):
+                        break
+                if best is not None:
+                    thali = best[1]
+                else:
+                    thali = self.thali_recommender._get_fallback_recommendation(calorie_goal, meal_type)
+
+                for item in thali['recommended_items']:
+                    name = item['name']
+                    day_dishes.add(name)
+                    uses[name] = uses.get(name, 0) + 1
+                    last_day_used[name] = day_index
+
+                meals[meal_type] = thali
+
+            plan_days.append({
+                'date': (start_date + timedelta(days=day_index)).isoformat(),
+                'meals': meals,
+                'total_calories': sum(m['total_calories'] for m in meals.values()),
+                'total_protein': sum(m['total_protein'] for m in meals.values()),
+                'total_carbs': sum(m['total_carbs'] for m in meals.values()),
+                'total_fat': sum(m['total_fat'] for m in meals.values())
+            })
+
+        total_items = sum(uses.values())
+        return {
+            'start_date': start_date.isoformat(),
+            'days': days,
+            'daily_calories': targets['daily_calories'],
+            'meal_calories': meal_calories,
+            'macros': targets['macros'],
+            'plan': plan_days,
+            'variety': {
+                'unique_dishes': len(uses),
+                'total_items': total_items
+            }
+        }
+
+    def _compose(
+        self,
+        meal_type: str,
+        calorie_goal: int,
+        allowed,
+        health_goal: Optional[str],
+        exclude: Set[str]
+    ) -> Optional[Dict]:
+        thalis = self.thali_recommender.composer.compose(
+            meal_type,
+            calorie_goal,
+            allowed,
+            health_goal=health_goal,
+            top_n=1,
+            exclude=exclude
+        )
+        return thalis[0] if thalis else None
+
+    def _shortfall(self, meal_type: str, thali: Dict) -> Tuple[int, float]:
+        """
+        How far a thali falls short of a complete meal: (missing required slots,
+        calories below the goal beyond the composer's tolerance). (0, 0) is complete.
+        """
+        composer = self.thali_recommender.composer
+        filled = {item['category'] for item in thali['recommended_items']}
+        missing = sum(
+            1 for slot in composer.MEAL_LAYOUTS[meal_type]['slots']
+            if not slot.get('optional') and slot['category'] not in filled
+        )
+        goal = thali['calorie_goal']
+        return missing, max(0.0, goal * (1 - composer.CALORIE_TOLERANCE) - thali['total_calories'])
@@ -0,0 +1,232 @@
+"""
+Request Metrics for NutriSathi
+Per-route latency and response-size histograms, status counts and in-flight requests,
+rendered in the Prometheus text format for /metrics, and per-request SQL statement tracking
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.db.session import N_PLUS_ONE_THRESHOLD, track_queries
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests that matched no route (404s for arbitrary paths)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers serialize access (MetricsRegistry's lock)"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; counts are per bucket, summed when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        return list(self.counts), self.total, self.count
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics.
+
+    Requests are labelled by method and route template (e.g.
+    /foods/barcode/{barcode}), never the raw path, so the number of series
+    stays bounded. Recording is a bisect and a few increments under a lock.
+    """
+
+    # Seconds (the Prometheus client defaults)
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    # Bytes
+    SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], Histogram] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        """Record one finished request"""
+        key = (method, route)
+        with self._lock:
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = Histogram(self.LATENCY_BUCKETS)
+                self._sizes[key] = Histogram(self.SIZE_BUCKETS)
+            latency.observe(seconds)
+            self._sizes[key].observe(size)
+            status_key = (method, route, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def register_collector(self, collect: Callable[[], Iterable[str]]) -> None:
+        """Add a callable returning extra exposition lines (gauges read at scrape time)"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            latency = {key: histogram.snapshot() for key, histogram in self._latency.items()}
+            sizes = {key: histogram.snapshot() for key, histogram in self._sizes.items()}
+            statuses = dict(self._statuses)
+            in_flight = self.in_flight
+
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {in_flight}",
+            "# HELP http_requests_total Finished requests by route and status code",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+        lines += _histogram_lines(
+            "http_request_duration_seconds", "Request latency by route", self.LATENCY_BUCKETS, latency
+        )
+        lines += _histogram_lines(
+            "http_response_size_bytes", "Response body size by route", self.SIZE_BUCKETS, sizes
+        )
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording every HTTP request in a MetricsRegistry.
+
+    Plain ASGI (not BaseHTTPMiddleware), so it adds no task or body copy per
+    request; response size is counted from the body chunks as they are sent.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_and_record(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry = self.registry
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight -= 1
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            registry.observe(scope["method"], route, status, elapsed, size)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware counting the SQL statements each request runs.
+
+    Likely N+1 patterns (one statement repeated N_PLUS_ONE_THRESHOLD or more
+    times) are logged with the route. With debug_headers the count and total
+    query time are added to the response as X-DB-Query-Count and
+    X-DB-Query-Time-Ms (statements run after the response starts are not
+    in the headers, only in the log).
+    """
+
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(scope) as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-query-count", str(stats.count).encode()))
+                    headers.append((b"x-db-query-time-ms", f"{stats.seconds * 1000:.1f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers if self.debug_headers else send)
+
+        for statement, count in stats.repeated(N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "Possible N+1 on %s %s: %dx %s", scope['method'], stats.route, count, ' '.join(statement.split())
+            )
+
+
+def pool_collector(engine) -> Callable[[], List[str]]:
+    """Collector reporting an SQLAlchemy engine's connection pool gauges"""
+    def collect() -> List[str]:
+        pool = engine.pool
+        gauges = (
+            ("db_pool_size", "Connections the pool keeps open", "size"),
+            ("db_pool_checked_out", "Connections currently in use", "checkedout"),
+            ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+            ("db_pool_overflow", "Connections open beyond the pool size", "overflow"),
+        )
+        lines = []
+        for name, help_text, attribute in gauges:
+            # Not every pool class (e.g. SQLite's in-memory pools) reports every figure
+            read = getattr(pool, attribute, None)
+            if read is None:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return lines
+    return collect
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{_escape(method)}",route="{_escape(route)}"'
+
+
+def _histogram_lines(
+    name: str,
+    help_text: str,
+    buckets: Tuple[float, ...],
+    series: Dict[Tuple[str, str], Tuple[List[int], float, int]]
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), (counts, total, count) in sorted(series.items()):
+        labels = _labels(method, route)
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f'{name}_sum{{{labels}}} {total}')
+        lines.append(f'{name}_count{{{labels}}} {count}')
+    return lines
@@ -3,8 +3,12 @@ AI-Based Mood-Based Meal Recommendation System for NutriSathi
 Recommends foods based on user's emotional state and nutritional science
 """
 import random
-from typing import List, Dict, Optional
-from datetime import datetime
+import zlib
+from itertools import islice
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
+
+from app.services.dish_annotator import DishAnnotator, annotate_dishes
+from app.services.preference_vectors import PreferenceVectorService
 
 
 class MoodRecommender:
@@ -102,37 +106,85 @@ class MoodRecommender:
         'digestive': ['ginger', 'ajwain', 'jeera', 'curd', 'buttermilk', 'khichdi']
     }
     
+    # Diversity selection (MMR): a candidate's value is its mood score minus
+    # DIVERSITY_PENALTY times its similarity to the closest dish already picked
+    DIVERSITY_PENALTY = 0.3
+    # Candidate pool per recommendation slot
+    DIVERSITY_POOL_FACTOR = 8
+    # Weight of the user's history affinity (0-1) added to a dish's mood score
+    PERSONALIZATION_WEIGHT = 0.2
+    
     def __init__(self, dishes_data: List[Dict]):
         """Initialize with available dishes from database"""
-        self.dishes = dishes_data
+        self.dishes = annotate_dishes(dishes_data)
+        self.mood_keyword_weights = self._build_mood_keyword_weights()
+        # Per mood: score of every dish (aligned with self.dishes), dish indices best-first,
+        # and how many of those are preferred or moderate (score >= 0.4)
+        self.mood_scores: Dict[str, List[float]] = {}
+        self.mood_rankings: Dict[str, List[int]] = {}
+        self.mood_candidate_counts: Dict[str, int] = {}
         self.categorized_dishes = self._categorize_by_mood()
     
-    def _categorize_by_mood(self) -> Dict[str, Dict[str, List[Dict]]]:
-        """Pre-categorize dishes for efficient mood-based filtering"""
-        mood_dishes = {mood: {'preferred': [], 'moderate': [], 'avoid': []} for mood in self.MOOD_NUTRIENT_PROFILE.keys()}
+    @classmethod
+    def keyword_vocabulary(cls) -> List[str]:
+        """Mood-specific words (avoid lists, food categories) matched against dish names"""
+        words = set()
+        for profile in cls.MOOD_NUTRIENT_PROFILE.values():
+            words.update(avoid.replace('_', ' ') for avoid in profile.get('avoid', []))
+        for food_cats in cls.MOOD_FOOD_CATEGORIES.values():
+            for category_words in food_cats.values():
+                words.update(word.lower() for word in category_words)
+        return sorted(words)
+    
+    def _build_mood_keyword_weights(self) -> Dict[str, Dict[str, float]]:
+        """
+        Flatten each mood's keyword rules into keyword -> score delta.
         
-        for dish in self.dishes:
-            name_lower = dish['name'].lower()
+        Scoring then walks the keyword hits already found on a dish instead of
+        every property, avoid word and food category of the mood.
+        """
+        mood_weights = {}
+        for mood, profile in self.MOOD_NUTRIENT_PROFILE.items():
+            weights: Dict[str, float] = {}
             
-            # Calculate macros percentages
-            total_cals = dish.get('calories', 0)
-            if total_cals > 0:
-                protein_pct = (dish.get('protein', 0) * 4) / total_cals
-                carbs_pct = (dish.get('carbs', 0) * 4) / total_cals
-                fat_pct = (dish.get('fat', 0) * 9) / total_cals
-            else:
-                protein_pct = carbs_pct = fat_pct = 0
+            def add(keyword: str, delta: float):
+                weights[keyword] = weights.get(keyword, 0) + delta
             
-            dish['macro_percentages'] = {
-                'protein': protein_pct,
-                'carbs': carbs_pct,
-                'fat': fat_pct
-            }
+            for keyword_category in profile.get('properties', []):
+                for keyword in self.FOOD_KEYWORDS.get(keyword_category, []):
+                    add(keyword, 0.1)
+            for avoid_keyword in profile.get('avoid', []):
+                add(avoid_keyword.replace('_', ' '), -0.3)
+            
+            food_cats = self.MOOD_FOOD_CATEGORIES.get(mood, {})
+            for pref_cat in food_cats.get('preferred', []):
+                add(pref_cat.lower(), 0.2)
+            for avoid_cat in food_cats.get('avoid', []):
+                add(avoid_cat.lower(), -0.4)
+            
+            mood_weights[mood] = weights
+        return mood_weights
+    
+    def _categorize_by_mood(self) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Score every dish for every mood once and pre-categorize them.
+        
+        Fills mood_scores, mood_rankings (ties keep catalog order) and
+        mood_candidate_counts; the catalog dishes themselves are left untouched.
+        """
+        mood_dishes = {mood: {'preferred': [], 'moderate': [], 'avoid': []} for mood in self.MOOD_NUTRIENT_PROFILE.keys()}
+        macro_pcts = [self._macro_percentages(dish) for dish in self.dishes]
+        
+        for mood, profile in self.MOOD_NUTRIENT_PROFILE.items():
+            scores = [
+                self._score_dish_for_mood(dish, mood, profile, macro_pct)
+                for dish, macro_pct in zip(self.dishes, macro_pcts)
+            ]
+            self.mood_scores[mood] = scores
+            self.mood_rankings[mood] = sorted(range(len(scores)), key=lambda i: -scores[i])
+            self.mood_candidate_counts[mood] = sum(1 for score in scores if score >= 0.4)
             
-            # Categorize for each mood
-            for mood, profile in self.MOOD_NUTRIENT_PROFILE.items():
-                category_score = self._score_dish_for_mood(dish, name_lower, mood, profile)
-                
+            for dish, category_score in zip(self.dishes, scores):
                 if category_score >= 0.7:
                     mood_dishes[mood]['preferred'].append(dish)
                 elif category_score >= 0.4:
@@ -142,7 +194,25 @@ class MoodRecommender:
         
         return mood_dishes
     
-    def _score_dish_for_mood(self, dish: Dict, name_lower: str, mood: str, profile: Dict) -> float:
+    @staticmethod
+    def _macro_percentages(dish: Dict) -> Dict[str, float]:
+        """Share of the dish's calories from protein, carbs and fat"""
+        total_cals = dish.get('calories', 0)
+        if total_cals > 0:
+            return {
+                'protein': (dish.get('protein', 0) * 4) / total_cals,
+                'carbs': (dish.get('carbs', 0) * 4) / total_cals,
+                'fat': (dish.get('fat', 0) * 9) / total_cals
+            }
+        return {'protein': 0, 'carbs': 0, 'fat': 0}
+    
+    def _score_dish_for_mood(
+        self,
+        dish: Dict,
+        mood: str,
+        profile: Dict,
+        macro_pct: Optional[Dict[str, float]] = None
+    ) -> float:
         """Score how well a dish matches a mood profile (0-1)"""
         score = 0.5  # Start neutral
         
@@ -151,7 +221,8 @@ class MoodRecommender:
         carbs_range = profile['macros']['carbs']
         fat_range = profile['macros']['fat']
         
-        macro_pct = dish['macro_percentages']
+        if macro_pct is None:
+            macro_pct = self._macro_percentages(dish)
         
         # Reward if macros are within ideal range
         if protein_range[0] <= macro_pct['protein'] <= protein_range[1]:
@@ -161,27 +232,13 @@ class MoodRecommender:
         if fat_range[0] <= macro_pct['fat'] <= fat_range[1]:
             score += 0.1
         
-        # Check keyword matches
-        for keyword_category in profile.get('properties', []):
-            if keyword_category in self.FOOD_KEYWORDS:
-                for keyword in self.FOOD_KEYWORDS[keyword_category]:
-                    if keyword in name_lower:
-                        score += 0.1
-        
-        # Check avoid keywords (penalize)
-        for avoid_keyword in profile.get('avoid', []):
-            if avoid_keyword.replace('_', ' ') in name_lower:
-                score -= 0.3
+        # Keyword rules (properties, avoid words, food categories) via precomputed hits
+        weights = self.mood_keyword_weights[mood]
+        for keyword in dish['tags']['keywords']:
+            score += weights.get(keyword, 0)
         
-        # Check food category preferences
-        food_cats = self.MOOD_FOOD_CATEGORIES.get(mood, {})
-        for pref_cat in food_cats.get('preferred', []):
-            if pref_cat.lower() in name_lower:
-                score += 0.2
-        
-        for avoid_cat in food_cats.get('avoid', []):
-            if avoid_cat.lower() in name_lower:
-                score -= 0.4
+        # Round away float noise so equal rule hits always land in the same bucket
+        score = round(score, 6)
         
         return max(0, min(1, score))  # Clamp between 0-1
     
@@ -191,7 +248,9 @@ class MoodRecommender:
         calorie_range: tuple = (200, 800),
         dietary_preference: Optional[str] = None,
         allergies: Optional[List[str]] = None,
-        num_recommendations: int = 4
+        num_recommendations: int = 4,
+        rng: Optional[random.Random] = None,
+        preferences: Optional[Dict] = None
     ) -> Dict:
         """
         Generate mood-based meal recommendations
@@ -202,6 +261,10 @@ class MoodRecommender:
             dietary_preference: 'Vegetarian', 'Vegan', 'Non-Vegetarian'
             allergies: List of ingredients to avoid
             num_recommendations: Number of dishes to recommend
+            rng: Seeded generator for the benefit text; without one the text is
+                 fixed per dish, so identical requests give identical results
+            preferences: User history profile from PreferenceVectorService.profile;
+                 blended into the ranking of the selection pool
         
         Returns:
             Dictionary with recommended dishes and mood insights
@@ -213,47 +276,29 @@ class MoodRecommender:
         
         mood_profile = self.MOOD_NUTRIENT_PROFILE[mood_normalized]
         
-        # Get pre-categorized dishes for this mood
-        mood_specific = self.categorized_dishes.get(mood_normalized, {})
-        candidate_pool = mood_specific.get('preferred', []) + mood_specific.get('moderate', [])
+        # Walk the precomputed ranking lazily; only the request filters run per request,
+        # and only until the selector's candidate pool is full.
+        # Preferred and moderate dishes lead the ranking and are tried first, as before
+        scores = self.mood_scores[mood_normalized]
+        ranking = self.mood_rankings[mood_normalized]
+        candidate_count = self.mood_candidate_counts[mood_normalized]
+        allowed = self._build_filter(calorie_range, dietary_preference, allergies)
         
-        # Apply filters
-        filtered_candidates = self._apply_filters(
-            candidate_pool,
-            calorie_range,
-            dietary_preference,
-            allergies
+        # Select top recommendations with variety
+        recommendations = self._select_diverse_dishes(
+            ((scores[i], self.dishes[i]) for i in islice(ranking, candidate_count) if allowed(self.dishes[i])),
+            num_recommendations,
+            preferences
         )
         
-        if not filtered_candidates:
+        if not recommendations:
             # Fallback to all dishes if filters too restrictive
-            filtered_candidates = self._apply_filters(
-                self.dishes,
-                calorie_range,
-                dietary_preference,
-                allergies
+            recommendations = self._select_diverse_dishes(
+                ((scores[i], self.dishes[i]) for i in ranking if allowed(self.dishes[i])),
+                num_recommendations,
+                preferences
             )
         
-        # Score and rank candidates
-        scored_dishes = []
-        for dish in filtered_candidates:
-            score = self._score_dish_for_mood(
-                dish,
-                dish['name'].lower(),
-                mood_normalized,
-                mood_profile
-            )
-            scored_dishes.append((score, dish))
-        
-        # Sort by score (descending)
-        scored_dishes.sort(key=lambda x: x[0], reverse=True)
-        
-        # Select top recommendations with variety
-        recommendations = self._select_diverse_dishes(
-            scored_dishes,
-            num_recommendations
-        )
-        
         # Calculate totals
         total_calories = sum(d.get('calories', 0) for d in recommendations)
         total_protein = sum(d.get('protein', 0) for d in recommendations)
@@ -281,7 +326,7 @@ class MoodRecommender:
                     'protein': dish.get('protein', 0),
                     'carbs': dish.get('carbs', 0),
                     'fat': dish.get('fat', 0),
-                    'mood_benefit': self._get_dish_mood_benefit(dish, mood_normalized),
+                    'mood_benefit': self._get_dish_mood_benefit(dish, mood_normalized, rng),
                     'cuisine': dish.get('cuisine', 'Indian')
                 }
                 for dish in recommendations
@@ -291,90 +336,106 @@ class MoodRecommender:
             'total_carbs': round(total_carbs, 1),
             'total_fat': round(total_fat, 1),
             'mood_insights': mood_insights,
-            'wellness_tip': self._get_wellness_tip(mood_normalized),
-            'timestamp': datetime.now().isoformat()
+            'wellness_tip': self._get_wellness_tip(mood_normalized)
         }
     
-    def _apply_filters(
+    def _build_filter(
         self,
-        dishes: List[Dict],
         calorie_range: tuple,
         dietary_preference: Optional[str],
         allergies: Optional[List[str]]
-    ) -> List[Dict]:
-        """Apply dietary and allergen filters"""
-        filtered = dishes
-        
-        # Calorie filter
+    ) -> Callable[[Dict], bool]:
+        """Build a dish predicate for the calorie range, dietary preference and allergies"""
         min_cal, max_cal = calorie_range
-        filtered = [d for d in filtered if min_cal <= d.get('calories', 0) <= max_cal]
+        # Dietary preference and allergy filters use the precomputed dish tags
+        diets = DishAnnotator.allowed_diets(dietary_preference)
+        allergen_classes, terms = DishAnnotator.parse_allergies(allergies)
         
-        # Dietary preference filter
-        if dietary_preference:
-            pref_lower = dietary_preference.lower()
-            non_veg_keywords = ['chicken', 'fish', 'meat', 'egg', 'prawn', 'mutton', 'lamb']
-            dairy_keywords = ['paneer', 'cheese', 'butter', 'ghee', 'curd', 'milk', 'cream']
-            
-            if 'veg' in pref_lower:
-                # Exclude non-veg
-                filtered = [
-                    d for d in filtered
-                    if not any(keyword in d['name'].lower() for keyword in non_veg_keywords)
-                ]
-            
-            if 'vegan' in pref_lower:
-                # Exclude dairy and non-veg
-                filtered = [
-                    d for d in filtered
-                    if not any(keyword in d['name'].lower() for keyword in non_veg_keywords + dairy_keywords)
-                ]
-        
-        # Allergy filter
-        if allergies:
-            for allergen in allergies:
-                allergen_lower = allergen.lower()
-                filtered = [
-                    d for d in filtered
-                    if allergen_lower not in d['name'].lower()
-                ]
-        
-        return filtered
+        if diets is None and not allergen_classes and not terms:
+            return lambda dish: min_cal <= dish.get('calories', 0) <= max_cal
+        
+        return lambda dish: (
+            min_cal <= dish.get('calories', 0) <= max_cal
+            and DishAnnotator.is_allowed(dish, diets, allergen_classes, terms)
+        )
     
     def _select_diverse_dishes(
         self,
-        scored_dishes: List[tuple],
-        num_recommendations: int
+        scored_dishes: Iterable[Tuple[float, Dict]],
+        num_recommendations: int,
+        preferences: Optional[Dict] = None
     ) -> List[Dict]:
-        """Select diverse dishes to avoid repetition"""
-        selected = []
-        used_categories = set()
+        """
+        Select high-scoring dishes that differ from each other (maximal marginal relevance)
+        
+        scored_dishes must be ranked best-first. It is consumed lazily, only
+        until the candidate pool holds num_recommendations * DIVERSITY_POOL_FACTOR
+        dishes with at most num_recommendations per name category, so picking
+        costs O(k^2) on top of the walk however large the candidate list is.
+        Similarity combines the name category and the macro split. With
+        preferences, each pooled dish's history affinity is added to its score.
+        """
+        if num_recommendations <= 0:
+            return []
+        
+        pool_size = num_recommendations * self.DIVERSITY_POOL_FACTOR
+        pool = []  # (relevance, dish, category, unit macro vector)
+        pooled_ids = set()
+        per_category: Dict[str, int] = {}
         
         for score, dish in scored_dishes:
-            if len(selected) >= num_recommendations:
-                break
-            
+            if id(dish) in pooled_ids:
+                continue
             # Extract category from name (simple heuristic)
             name_words = dish['name'].lower().split()
             category = name_words[0] if name_words else ''
+            if per_category.get(category, 0) >= num_recommendations:
+                continue
+            pooled_ids.add(id(dish))
+            per_category[category] = per_category.get(category, 0) + 1
+            vector = self._macro_vector(dish)
+            if preferences:
+                score += self.PERSONALIZATION_WEIGHT * PreferenceVectorService.affinity(preferences, dish, vector)
+            pool.append((score, dish, category, vector))
+            if len(pool) >= pool_size:
+                break
+        
+        selected = []
+        selected_indices = set()
+        closest = [0.0] * len(pool)  # similarity to the closest selected dish
+        
+        while len(selected) < min(num_recommendations, len(pool)):
+            best_index = None
+            best_value = None
+            for i, (relevance, _, _, _) in enumerate(pool):
+                if i in selected_indices:
+                    continue
+                value = relevance - self.DIVERSITY_PENALTY * closest[i]
+                # Strict comparison keeps the better-ranked dish on ties
+                if best_value is None or value > best_value:
+                    best_index, best_value = i, value
             
-            # Prefer variety
-            if category not in used_categories or len(selected) < num_recommendations // 2:
-                selected.append(dish)
-                used_categories.add(category)
-        
-        # If not enough variety, add remaining
-        while len(selected) < num_recommendations and len(selected) < len(scored_dishes):
-            for score, dish in scored_dishes:
-                if dish not in selected:
-                    selected.append(dish)
-                    break
+            selected_indices.add(best_index)
+            _, dish, category, vector = pool[best_index]
+            selected.append(dish)
+            
+            for i, (_, _, other_category, other_vector) in enumerate(pool):
+                if i not in selected_indices:
+                    similarity = 0.5 * (category == other_category) + 0.5 * sum(
+                        a * b for a, b in zip(vector, other_vector)
+                    )
+                    if similarity > closest[i]:
+                        closest[i] = similarity
         
         return selected
     
-    def _get_dish_mood_benefit(self, dish: Dict, mood: str) -> str:
+    @staticmethod
+    def _macro_vector(dish: Dict) -> Tuple[float, float, float]:
+        """Unit-length (protein, carbs, fat) calorie vector; zeros if the dish has no macros"""
+        return PreferenceVectorService.unit_macros(dish.get('protein', 0), dish.get('carbs', 0), dish.get('fat', 0))
+    
+    def _get_dish_mood_benefit(self, dish: Dict, mood: str, rng: Optional[random.Random] = None) -> str:
         """Generate a benefit description for why this dish helps the mood"""
-        name_lower = dish['name'].lower()
-        
         benefits = {
             'happy': [
                 "Provides sustained energy to keep spirits high",
@@ -403,9 +464,11 @@ class MoodRecommender:
             ]
         }
         
-        # Choose random benefit from mood category
+        # Vary the benefit per request when seeded, otherwise per dish (crc32 is stable across runs)
         mood_benefits = benefits.get(mood, ["Nutritionally balanced for your wellbeing"])
-        return random.choice(mood_benefits)
+        if rng is not None:
+            return rng.choice(mood_benefits)
+        return mood_benefits[zlib.crc32(dish['name'].encode('utf-8')) % len(mood_benefits)]
     
     def _generate_mood_insights(
         self,
@@ -0,0 +1,75 @@
+"""
+OpenFoodFacts Client for NutriSathi
+Fetches a product by barcode and extracts per-100g nutrition
+"""
+from typing import Dict, Optional
+
+from app.services.http_client import UpstreamError, UpstreamHTTPClient
+
+
+# Nutriment keys parse_product reads (per-100g first, then the unsuffixed fallback)
+NUTRIMENT_KEYS = (
+    "energy-kcal_100g", "energy-kcal",
+    "proteins_100g", "proteins",
+    "carbohydrates_100g", "carbohydrates",
+    "fat_100g", "fat"
+)
+
+
+def parse_product(product: Dict, barcode: str) -> Dict:
+    """Food data (per 100g) from an OpenFoodFacts product record"""
+    nutriments = product.get("nutriments", {})
+    return {
+        "name": product.get("product_name") or product.get("product_name_en") or "Unknown Product",
+        "brand": product.get("brands", ""),
+        "serving_size": product.get("serving_size", "100g"),
+        "calories": nutriments.get("energy-kcal_100g") or nutriments.get("energy-kcal") or 0,
+        "protein": nutriments.get("proteins_100g") or nutriments.get("proteins") or 0,
+        "carbs": nutriments.get("carbohydrates_100g") or nutriments.get("carbohydrates") or 0,
+        "fat": nutriments.get("fat_100g") or nutriments.get("fat") or 0,
+        "barcode": barcode
+    }
+
+
+class OpenFoodFactsClient:
+    """Product lookups over the shared upstream HTTP client"""
+
+    PRODUCT_URL = "https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
+
+    def __init__(self, http: UpstreamHTTPClient, product_url: Optional[str] = None):
+        """
+        Args:
+            http: Shared pooled client
+            product_url: URL template with {barcode}, overriding PRODUCT_URL (a mirror or a test stub)
+        """
+        self.http = http
+        self.product_url = product_url or self.PRODUCT_URL
+
+    async def fetch_product(self, barcode: str) -> Optional[Dict]:
+        """
+        Look a barcode up on OpenFoodFacts.
+
+        Returns:
+            Food data, or None when OpenFoodFacts does not know the product
+
+        Raises:
+            UpstreamTimeout: No answer within the client's timeout (after retries)
+            UpstreamError: Connection failure or an error status
+        """
+        url = self.product_url.format(barcode=barcode)
+        print(f"📡 Fetching from OpenFoodFacts: {url}")
+
+        response = await self.http.get(url)
+        print(f"📥 OpenFoodFacts response status: {response.status_code}")
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise UpstreamError(f"OpenFoodFacts returned status {response.status_code}")
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise UpstreamError(f"OpenFoodFacts returned invalid JSON: {e}") from e
+        if data.get("status") != 1:
+            return None
+        return parse_product(data.get("product", {}), barcode)
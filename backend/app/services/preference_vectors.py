@@ -0,0 +1,197 @@
+"""
+User Preference Vectors for NutriSathi
+Keeps per-user dish-token, cuisine and macro totals in step with meal writes for personalized ranking
+"""
+import json
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+class PreferenceVectorService:
+    """
+    Maintains user_preference_vectors rows and turns them into ranking profiles.
+
+    Each meal write adds (or, on delete, subtracts) the meal's name tokens,
+    catalog cuisine and macro grams to the user's running totals, so reading
+    preferences never scans meal history. A user without a row gets one built
+    from their history on their next meal write.
+    """
+
+    TOKEN_PATTERN = re.compile(r'[a-z]+')
+    MIN_TOKEN_LENGTH = 3
+    STOP_TOKENS = {'and', 'with', 'the', 'fried', 'style'}
+
+    # Strongest tokens kept in a ranking profile
+    PROFILE_TOKENS = 50
+
+    # Affinity weights for name tokens, cuisine and macro split (sum to 1)
+    TOKEN_WEIGHT = 0.5
+    CUISINE_WEIGHT = 0.25
+    MACRO_WEIGHT = 0.25
+
+    @staticmethod
+    def cuisine_index(dishes: List[Dict]) -> Dict[str, str]:
+        """Lowercase catalog dish name -> cuisine, for tagging logged meals"""
+        return {dish['name'].strip().lower(): dish['cuisine'] for dish in dishes if dish.get('cuisine')}
+
+    @classmethod
+    def tokenize(cls, name: str) -> List[str]:
+        """Distinct lowercase word tokens of a dish or meal name"""
+        tokens = []
+        for token in cls.TOKEN_PATTERN.findall(name.lower()):
+            if len(token) >= cls.MIN_TOKEN_LENGTH and token not in cls.STOP_TOKENS and token not in tokens:
+                tokens.append(token)
+        return tokens
+
+    @classmethod
+    def record_meal(
+        cls,
+        db: Session,
+        user_id: int,
+        meal: models.Meal,
+        cuisines: Dict[str, str],
+        sign: int = 1
+    ) -> models.UserPreferenceVector:
+        """
+        Apply one meal write to the user's vector (call before commit).
+
+        Args:
+            db: Session holding the meal add/delete
+            user_id: Owner of the meal
+            meal: The meal being logged (sign=1) or deleted (sign=-1)
+            cuisines: Lowercase catalog dish name -> cuisine
+            sign: 1 for a new meal, -1 for a deleted one
+
+        Returns:
+            The updated vector row
+        """
+        vector = db.query(models.UserPreferenceVector).filter(
+            models.UserPreferenceVector.user_id == user_id
+        ).first()
+        if vector is None:
+            # First write since personalization shipped: build from the history once
+            db.flush()
+            return cls.rebuild(db, user_id, cuisines)
+
+        cls._apply(vector, meal, cuisines, sign)
+        return vector
+
+    @classmethod
+    def rebuild(cls, db: Session, user_id: int, cuisines: Dict[str, str]) -> models.UserPreferenceVector:
+        """Recompute a user's vector from their full meal history"""
+        vector = db.query(models.UserPreferenceVector).filter(
+            models.UserPreferenceVector.user_id == user_id
+        ).first()
+        if vector is None:
+            vector = models.UserPreferenceVector(user_id=user_id, version=0)
+            db.add(vector)
+        vector.meal_count = 0
+        vector.token_counts = "{}"
+        vector.cuisine_counts = "{}"
+        vector.protein_total = vector.carbs_total = vector.fat_total = 0.0
+
+        meals = db.query(models.Meal).filter(models.Meal.user_id == user_id).all()
+        token_counts: Dict[str, int] = {}
+        cuisine_counts: Dict[str, int] = {}
+        for meal in meals:
+            cls._count(token_counts, cuisine_counts, meal, cuisines, 1)
+            vector.protein_total += meal.protein or 0
+            vector.carbs_total += meal.carbs or 0
+            vector.fat_total += meal.fat or 0
+        vector.meal_count = len(meals)
+        vector.token_counts = json.dumps(token_counts)
+        vector.cuisine_counts = json.dumps(cuisine_counts)
+        vector.version = (vector.version or 0) + 1
+        return vector
+
+    @classmethod
+    def _apply(
+        cls,
+        vector: models.UserPreferenceVector,
+        meal: models.Meal,
+        cuisines: Dict[str, str],
+        sign: int
+    ) -> None:
+        token_counts = json.loads(vector.token_counts or "{}")
+        cuisine_counts = json.loads(vector.cuisine_counts or "{}")
+        cls._count(token_counts, cuisine_counts, meal, cuisines, sign)
+
+        vector.meal_count = max(0, (vector.meal_count or 0) + sign)
+        vector.protein_total = max(0.0, (vector.protein_total or 0) + sign * (meal.protein or 0))
+        vector.carbs_total = max(0.0, (vector.carbs_total or 0) + sign * (meal.carbs or 0))
+        vector.fat_total = max(0.0, (vector.fat_total or 0) + sign * (meal.fat or 0))
+        vector.token_counts = json.dumps(token_counts)
+        vector.cuisine_counts = json.dumps(cuisine_counts)
+        vector.version = (vector.version or 0) + 1
+
+    @classmethod
+    def _count(
+        cls,
+        token_counts: Dict[str, int],
+        cuisine_counts: Dict[str, int],
+        meal: models.Meal,
+        cuisines: Dict[str, str],
+        sign: int
+    ) -> None:
+        """Add or remove one meal's tokens and cuisine, dropping counts that reach zero"""
+        keys = [(token_counts, token) for token in cls.tokenize(meal.name)]
+        cuisine = cuisines.get(meal.name.strip().lower())
+        if cuisine:
+            keys.append((cuisine_counts, cuisine.lower()))
+        for counts, key in keys:
+            count = counts.get(key, 0) + sign
+            if count > 0:
+                counts[key] = count
+            else:
+                counts.pop(key, None)
+
+    @classmethod
+    def profile(cls, vector: Optional[models.UserPreferenceVector]) -> Optional[Dict]:
+        """
+        Compact ranking profile for a vector row, or None without history.
+
+        Token weights are scaled to the user's most frequent token, cuisine
+        weights are shares of meals, and macros are a unit (protein, carbs, fat)
+        calorie vector, so affinity() stays within 0-1.
+        """
+        if vector is None or not vector.meal_count:
+            return None
+
+        token_counts = json.loads(vector.token_counts or "{}")
+        cuisine_counts = json.loads(vector.cuisine_counts or "{}")
+        top_tokens = sorted(token_counts.items(), key=lambda item: (-item[1], item[0]))[:cls.PROFILE_TOKENS]
+        max_count = top_tokens[0][1] if top_tokens else 1
+
+        return {
+            'version': vector.version,
+            'tokens': {token: count / max_count for token, count in top_tokens},
+            'cuisines': {cuisine: count / vector.meal_count for cuisine, count in cuisine_counts.items()},
+            'macros': cls.unit_macros(vector.protein_total, vector.carbs_total, vector.fat_total)
+        }
+
+    @staticmethod
+    def unit_macros(protein: float, carbs: float, fat: float) -> Tuple[float, float, float]:
+        """Unit-length (protein, carbs, fat) calorie vector; zeros when there are no macros"""
+        vector = ((protein or 0) * 4, (carbs or 0) * 4, (fat or 0) * 9)
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return (0.0, 0.0, 0.0)
+        return tuple(v / norm for v in vector)
+
+    @classmethod
+    def affinity(cls, profile: Dict, dish: Dict, macro_vector: Tuple[float, float, float]) -> float:
+        """Dot product of a user profile with a dish's token, cuisine and macro features (0-1)"""
+        tokens = cls.tokenize(dish['name'])
+        token_score = sum(profile['tokens'].get(token, 0) for token in tokens) / len(tokens) if tokens else 0
+        cuisine_score = profile['cuisines'].get((dish.get('cuisine') or '').lower(), 0)
+        macro_score = sum(a * b for a, b in zip(profile['macros'], macro_vector))
+        return (
+            cls.TOKEN_WEIGHT * token_score
+            + cls.CUISINE_WEIGHT * cuisine_score
+            + cls.MACRO_WEIGHT * macro_score
+        )
@@ -0,0 +1,110 @@
+"""
+Local Product Store for NutriSathi
+Read side of the offline OpenFoodFacts import: per-barcode nutrition from a compact SQLite file
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parents[3] / "data" / "openfoodfacts.sqlite"
+
+# Columns of the products table, in food-data order
+PRODUCT_FIELDS = ('barcode', 'name', 'brand', 'serving_size', 'calories', 'protein', 'carbs', 'fat')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    barcode TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    serving_size TEXT NOT NULL,
+    calories REAL NOT NULL,
+    protein REAL NOT NULL,
+    carbs REAL NOT NULL,
+    fat REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class LocalProductStore:
+    """
+    Read-only barcode lookups in the imported OpenFoodFacts store.
+
+    The file is opened lazily and reopened when an import replaces it, so a
+    fresh dump can be swapped in while the app runs. Without a file every
+    lookup is simply a miss.
+    """
+
+    # Bound parameters per IN (...) query
+    MAX_BATCH = 500
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or DEFAULT_STORE_PATH)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._identity: Optional[Tuple[int, float]] = None
+
+    def get(self, barcode: str) -> Optional[Dict]:
+        """Food data for a barcode, or None if the store does not have it"""
+        return self.get_many([barcode]).get(barcode)
+
+    def get_many(self, barcodes: Iterable[str]) -> Dict[str, Dict]:
+        """Food data for every barcode the store has, keyed by barcode"""
+        barcodes = list(dict.fromkeys(barcodes))
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return found
+            for start in range(0, len(barcodes), self.MAX_BATCH):
+                batch = barcodes[start:start + self.MAX_BATCH]
+                rows = connection.execute(
+                    f"SELECT {', '.join(PRODUCT_FIELDS)} FROM products "
+                    f"WHERE barcode IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = self._food_data(row)
+        return found
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open (or reopen after a re-import) the store; None if there is no store"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._close()
+            return None
+
+        identity = (stat.st_ino, stat.st_mtime)
+        if self._connection is None or identity != self._identity:
+            self._close()
+            self._connection = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            self._identity = identity
+        return self._connection
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            self._identity = None
+
+    @staticmethod
+    def _food_data(row: Tuple) -> Dict:
+        """A products row in the shape get_food_by_barcode returns"""
+        barcode, name, brand, serving_size, calories, protein, carbs, fat = row
+        return {
+            "name": name,
+            "brand": brand,
+            "serving_size": serving_size,
+            "calories": calories,
+            "protein": protein,
+            "carbs": carbs,
+            "fat": fat,
+            "barcode": barcode
+        }
+
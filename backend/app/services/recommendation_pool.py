@@ -0,0 +1,158 @@
+"""
+Process-Pool Recommendation Execution for NutriSathi
+Runs CPU-bound thali and mood recommendations in worker processes so the event loop stays free
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from app.services.calorie_calculator import CalorieCalculator
+from app.services.dish_annotator import catalog_version
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+from app.services.thali_recommender import ThaliRecommender
+
+
+# Per-process recommender state, built once by init_worker
+_state: Dict = {}
+
+
+def init_worker(dishes: Optional[List[Dict]] = None) -> None:
+    """Build the catalog indexes once per worker process"""
+    if dishes is None:
+        dishes = load_dishes_from_csv()
+    _state['version'] = catalog_version(dishes)
+    _state['thali'] = ThaliRecommender(dishes)
+    _state['mood'] = MoodRecommender(dishes)
+    _state['calculator'] = CalorieCalculator()
+
+
+def worker_state() -> Dict:
+    """Recommenders for the current process (loads the catalog on first use)"""
+    if not _state:
+        init_worker()
+    return _state
+
+
+def _rng(seed: Optional[int]) -> Optional[random.Random]:
+    return random.Random(seed) if seed is not None else None
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    """Skip a job whose caller already gave up while it sat in the queue"""
+    if deadline is not None and time.time() > deadline:
+        raise TimeoutError("Recommendation job expired before it started")
+
+
+def _recommend_thali(kwargs: Dict, seed: Optional[int], deadline: Optional[float] = None) -> Dict:
+    _check_deadline(deadline)
+    return worker_state()['thali'].recommend_thali(**kwargs, rng=_rng(seed))
+
+
+def _recommend_mood(kwargs: Dict, seed: Optional[int], deadline: Optional[float] = None) -> Dict:
+    _check_deadline(deadline)
+    return worker_state()['mood'].recommend_by_mood(**kwargs, rng=_rng(seed))
+
+
+class RecommendationPool:
+    """
+    Bounded process pool for the recommendation endpoints.
+
+    Each child receives the API's catalog once through the pool initializer
+    and builds its own indexes. At most max_concurrency jobs are in the pool
+    at once; the rest wait, and every request (waiting included) is bounded by
+    timeout. A job keeps its slot until the worker is done with it, not until
+    its caller times out, so timed-out jobs cannot pile up in the executor;
+    jobs still queued past their deadline are skipped. With workers=0, or
+    before start(), calls run inline on the API's own recommenders.
+    """
+
+    def __init__(
+        self,
+        thali_recommender: ThaliRecommender,
+        mood_recommender: MoodRecommender,
+        workers: int = 2,
+        timeout: float = 5.0,
+        max_concurrency: Optional[int] = None
+    ):
+        self.thali_recommender = thali_recommender
+        self.mood_recommender = mood_recommender
+        self.workers = workers
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency or max(workers, 1) * 4
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Jobs submitted to the executor and not finished yet (at most max_concurrency)
+        self.jobs_in_flight = 0
+
+    def start(self) -> None:
+        """Start the worker processes (call from the app lifespan)"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._start_executor()
+
+    def _start_executor(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.thali_recommender.dishes,)
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def recommend_thali(self, seed: Optional[int] = None, **kwargs) -> Dict:
+        """ThaliRecommender.recommend_thali in a worker; raises asyncio.TimeoutError past the timeout"""
+        if self._executor is None:
+            return self.thali_recommender.recommend_thali(**kwargs, rng=_rng(seed))
+        return await self._submit(_recommend_thali, kwargs, seed)
+
+    async def recommend_by_mood(self, seed: Optional[int] = None, **kwargs) -> Dict:
+        """MoodRecommender.recommend_by_mood in a worker; raises asyncio.TimeoutError past the timeout"""
+        if self._executor is None:
+            return self.mood_recommender.recommend_by_mood(**kwargs, rng=_rng(seed))
+        return await self._submit(_recommend_mood, kwargs, seed)
+
+    async def _submit(self, func, kwargs: Dict, seed: Optional[int]) -> Dict:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+
+        try:
+            future = self._executor.submit(func, kwargs, seed, time.time() + max(deadline - loop.time(), 0))
+        except BrokenProcessPool:
+            self._semaphore.release()
+            self._restart()
+            raise RuntimeError("Recommendation worker crashed")
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self.jobs_in_flight += 1
+        future.add_done_callback(lambda _: self._release_from_worker_thread(loop))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(deadline - loop.time(), 0))
+        except BrokenProcessPool:
+            self._restart()
+            raise RuntimeError("Recommendation worker crashed")
+
+    def _release_from_worker_thread(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Free a job's slot once the executor is done with it (called from the executor's thread)"""
+        def release():
+            self.jobs_in_flight -= 1
+            self._semaphore.release()
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # Loop already closed (shutdown); nothing is waiting for the slot
+            pass
+
+    def _restart(self) -> None:
+        """A worker died; replace the pool so later requests recover"""
+        self.shutdown()
+        self._start_executor()
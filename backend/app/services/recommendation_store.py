@@ -0,0 +1,129 @@
+"""
+Precomputed Recommendation Store for NutriSathi
+Request keys shared by the live endpoints and the nightly batch job, and reads/writes of precomputed rows
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+class RecommendationStore:
+    """
+    Keys and storage for precomputed thali and mood responses.
+
+    The endpoints and the batch job build request keys with the same helpers
+    and seed their generators from them, so a precomputed row is exactly the
+    response live computation would have produced for that request.
+    """
+
+    KIND_THALI = 'thali'
+    KIND_MOOD = 'mood'
+
+    # Defaults the frontend sends; the batch job precomputes these requests
+    THALI_MEAL_TYPES = ['breakfast', 'lunch', 'evening_snack', 'dinner']
+    DEFAULT_NUM_ALTERNATIVES = 2
+    DEFAULT_CALORIE_RANGE = (200, 800)
+    DEFAULT_NUM_RECOMMENDATIONS = 4
+
+    @staticmethod
+    def split_allergies(allergies: Optional[str]) -> Optional[List[str]]:
+        """Parse a comma-separated allergy string the way the endpoints do"""
+        if not allergies:
+            return None
+        return [a.strip() for a in allergies.split(',')]
+
+    @classmethod
+    def thali_key(
+        cls,
+        user_id: Optional[int],
+        day: str,
+        meal_type: str,
+        calorie_goal: int,
+        dietary_preference: Optional[str],
+        health_goal: Optional[str],
+        allergies: Optional[Iterable[str]],
+        num_alternatives: int
+    ) -> Tuple:
+        """Cache/seed key for a /ai/recommend-thali request"""
+        return (
+            cls.KIND_THALI, user_id, day, meal_type.lower(), calorie_goal,
+            dietary_preference or None, health_goal or None,
+            tuple(allergies or ()), num_alternatives
+        )
+
+    @classmethod
+    def mood_key(
+        cls,
+        user_id: Optional[int],
+        day: str,
+        mood: str,
+        calorie_range: Tuple[int, int],
+        dietary_preference: Optional[str],
+        allergies: Optional[Iterable[str]],
+        num_recommendations: int,
+        preference_version: Optional[int] = None
+    ) -> Tuple:
+        """Cache/seed key for a /ai/recommend-mood request (preference_version: user's history vector)"""
+        return (
+            cls.KIND_MOOD, user_id, day, mood.lower(), tuple(calorie_range),
+            dietary_preference or None, tuple(allergies or ()), num_recommendations,
+            preference_version
+        )
+
+    @staticmethod
+    def digest(key: Tuple) -> str:
+        """Stable digest of a request key, used as the row's unique lookup key"""
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get(cls, db: Session, key: Tuple, catalog_version: str) -> Optional[Dict]:
+        """
+        Return the precomputed response for a request key.
+
+        Rows computed against another catalog version are ignored so the
+        caller falls back to live computation.
+        """
+        row = db.query(models.PrecomputedRecommendation).filter(
+            models.PrecomputedRecommendation.request_key == cls.digest(key)
+        ).first()
+        if row is None or row.catalog_version != catalog_version:
+            return None
+        return json.loads(row.payload)
+
+    @classmethod
+    def build_row(cls, key: Tuple, catalog_version: str, payload: Dict) -> Dict:
+        """Shape a computed response as a precomputed_recommendations row"""
+        return {
+            'user_id': key[1],
+            'plan_date': key[2],
+            'kind': key[0],
+            'request_key': cls.digest(key),
+            'catalog_version': catalog_version,
+            # Dish tag sets are stored as sorted lists
+            'payload': json.dumps(payload, default=sorted)
+        }
+
+    @staticmethod
+    def replace_rows(db: Session, day: str, user_ids: List[int], rows: List[Dict[str, Any]]) -> None:
+        """Swap in a chunk's rows for the day, dropping whatever was stored for those users before"""
+        if user_ids:
+            db.query(models.PrecomputedRecommendation).filter(
+                models.PrecomputedRecommendation.plan_date == day,
+                models.PrecomputedRecommendation.user_id.in_(user_ids)
+            ).delete(synchronize_session=False)
+        if rows:
+            db.bulk_insert_mappings(models.PrecomputedRecommendation, rows)
+        db.commit()
+
+    @staticmethod
+    def purge_before(db: Session, day: str) -> int:
+        """Delete rows for days before the given one; returns the number removed"""
+        removed = db.query(models.PrecomputedRecommendation).filter(
+            models.PrecomputedRecommendation.plan_date < day
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removed
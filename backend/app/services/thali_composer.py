@@ -0,0 +1,307 @@
+"""
+Thali Composition Engine for NutriSathi
+Searches slot combinations against the THALI_RULES calorie split and macro targets
+"""
+import random
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+
+class ThaliComposer:
+    """
+    Beam search over thali slots.
+
+    Every slot takes its nearest-calorie candidates from the recommender's
+    calorie index. Partial thalis are scored on slot calorie error and macro
+    balance, and only the best BEAM_WIDTH partials are extended to the next
+    slot. If the latency budget runs out, the beam narrows to greedy for the
+    remaining slots so a thali is always returned.
+    """
+
+    # Slot layouts per meal. Slot shares come from ThaliRecommender.THALI_RULES;
+    # minor rule entries (beverage, fruit, light bites) share one side slot
+    MEAL_LAYOUTS = {
+        'breakfast': {
+            'label': 'Breakfast',
+            'tip_key': 'breakfast',
+            'note': 'Traditional Indian breakfast thali - {count} items',
+            'slots': [
+                {'rules': ['main_carb'], 'category': 'Main Dish', 'note': 'Primary energy source for the morning',
+                 'preferred': ['breakfast_items', 'grains']},
+                {'rules': ['protein'], 'category': 'Protein', 'note': 'Keeps you full and energized',
+                 'min_protein': 10},
+                {'rules': ['healthy_fat', 'beverage', 'fruit'], 'category': 'Side', 'note': 'Adds flavor and nutrition',
+                 'optional': True}
+            ]
+        },
+        'lunch': {
+            'label': 'Lunch',
+            'tip_key': 'lunch',
+            'note': 'Complete Indian thali - {count} items for balanced nutrition',
+            'slots': [
+                {'rules': ['grain'], 'category': 'Grain (Staple)', 'note': 'Foundation of the thali',
+                 'preferred': ['grains']},
+                {'rules': ['dal_protein'], 'category': 'Dal (Lentils)', 'note': 'Plant-based protein powerhouse',
+                 'keywords': ['dal', 'rajma']},
+                {'rules': ['vegetable'], 'category': 'Sabzi (Vegetable)', 'note': 'Rich in vitamins and fiber',
+                 'preferred': ['vegetables', 'curries']},
+                {'rules': ['side_protein'], 'category': 'Protein Side', 'note': 'Additional protein for satiety',
+                 'min_protein': 8},
+                {'rules': ['accompaniment'], 'category': 'Accompaniment', 'note': 'Cooling side that aids digestion',
+                 'preferred': ['light_items'], 'optional': True}
+            ]
+        },
+        'evening_snack': {
+            'label': 'Evening Snack',
+            'tip_key': 'snack',
+            'note': 'Evening snack - keep it light',
+            'slots': [
+                {'rules': ['main_item'], 'category': 'Snack', 'note': 'Light bite to curb evening hunger',
+                 'preferred': ['snacks', 'breakfast_items']},
+                {'rules': ['beverage', 'light_bite'], 'category': 'Beverage / Light Bite',
+                 'note': 'Rounds off the snack without overloading', 'preferred': ['beverages', 'light_items'],
+                 'optional': True}
+            ]
+        },
+        'dinner': {
+            'label': 'Dinner',
+            'tip_key': 'dinner',
+            'note': 'Light dinner thali - {count} items for good sleep',
+            'slots': [
+                {'rules': ['grain'], 'category': 'Grain', 'note': 'Light grain for easy digestion',
+                 'preferred': ['grains']},
+                {'rules': ['protein_curry'], 'category': 'Protein Curry', 'note': 'Protein for overnight muscle repair',
+                 'preferred': ['proteins', 'curries'], 'min_protein': 10},
+                {'rules': ['vegetable'], 'category': 'Vegetable', 'note': 'Fiber-rich for digestion',
+                 'preferred': ['vegetables']},
+                {'rules': ['soup_light', 'accompaniment'], 'category': 'Soup / Light Side',
+                 'note': 'Easy on the stomach before bed', 'preferred': ['light_items'], 'optional': True}
+            ]
+        },
+        'generic': {
+            'label': None,
+            'tip_key': None,
+            'note': 'Suggested meal combination',
+            'slots': [
+                {'share': 1 / 3, 'category': 'Suggested Item', 'note': 'Balanced choice for your goal'}
+                for _ in range(3)
+            ]
+        }
+    }
+
+    # Target macro split (share of calories) per health goal, as in CalorieCalculator._calculate_macros
+    MACRO_TARGETS = {
+        'weight_loss': {'protein': 0.30, 'carbs': 0.40, 'fat': 0.30},
+        'muscle': {'protein': 0.30, 'carbs': 0.45, 'fat': 0.25},
+        'default': {'protein': 0.25, 'carbs': 0.45, 'fat': 0.30}
+    }
+
+    CANDIDATES_PER_SLOT = 8
+    BEAM_WIDTH = 24
+    DEFAULT_TIME_BUDGET_MS = 20
+
+    # Thalis within this share of the calorie goal are ranked by balance score first
+    CALORIE_TOLERANCE = 0.20
+
+    def __init__(self, recommender):
+        """Compose thalis from a ThaliRecommender's catalog and calorie index"""
+        self.recommender = recommender
+
+    def compose(
+        self,
+        meal_type: str,
+        calorie_goal: int,
+        allowed: Callable[[Dict], bool],
+        health_goal: Optional[str] = None,
+        top_n: int = 3,
+        time_budget_ms: Optional[float] = None,
+        exclude: Optional[Set[str]] = None,
+        rng: Optional[random.Random] = None
+    ) -> List[Dict]:
+        """
+        Search for the thalis that best fit the calorie goal and macro targets.
+
+        Args:
+            meal_type: 'breakfast', 'lunch', 'evening_snack' (or 'snack'), 'dinner'; anything else gets a generic layout
+            calorie_goal: Target calories for this meal
+            allowed: Dietary/allergy predicate for this request
+            health_goal: Health goal used for the macro targets and tips
+            top_n: Number of thalis to return
+            time_budget_ms: Search budget; defaults to DEFAULT_TIME_BUDGET_MS
+            exclude: Dish names that must not appear (e.g. already planned today)
+            rng: Seeded generator used to pick the lead thali among equally ranked ones
+
+        Returns:
+            Up to top_n thali dicts, best balance score first
+        """
+        meal_key = meal_type.lower().replace(' ', '_').replace('-', '_')
+        if meal_key == 'snack':
+            meal_key = 'evening_snack'
+        layout = self.MEAL_LAYOUTS.get(meal_key, self.MEAL_LAYOUTS['generic'])
+        rules = self.recommender.THALI_RULES.get(meal_key, {})
+        macro_target = self._macro_target(health_goal)
+        budget = self.DEFAULT_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms
+        deadline = time.perf_counter() + budget / 1000
+        goal = max(calorie_goal, 1)
+
+        # Beam entries: (objective, items, names, calories, protein, carbs, fat, slot_error, filled_target)
+        beam = [(0.0, (), frozenset(), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)]
+        beam_width = self.BEAM_WIDTH
+        slot_count = len(layout['slots'])
+
+        for slot in layout['slots']:
+            if 'share' in slot:
+                share = slot['share']
+            else:
+                share = sum(rules.get(rule, 0) for rule in slot['rules'])
+            slot_target = calorie_goal * share
+
+            candidates = self.recommender._find_candidates(
+                allowed,
+                slot_target,
+                self.CANDIDATES_PER_SLOT + slot_count,
+                preferred_categories=slot.get('preferred'),
+                exclude=exclude,
+                min_protein=slot.get('min_protein'),
+                keywords=slot.get('keywords')
+            )
+            if not candidates:
+                continue
+
+            if time.perf_counter() > deadline:
+                # Out of budget: finish the remaining slots greedily
+                beam_width = 1
+
+            expanded = []
+            for _, items, names, cal, protein, carbs, fat, slot_error, filled in beam:
+                if slot.get('optional'):
+                    # Optional sides may be left off when nothing small enough fits
+                    objective = self._objective(
+                        cal, protein, carbs, fat, slot_error + slot_target, filled + slot_target, goal, macro_target
+                    )
+                    expanded.append((
+                        objective, items, names, cal, protein, carbs, fat,
+                        slot_error + slot_target, filled + slot_target
+                    ))
+
+                used = 0
+                for dish in candidates:
+                    if dish['name'] in names:
+                        continue
+                    new_cal = cal + dish.get('calories', 0)
+                    new_protein = protein + dish.get('protein', 0)
+                    new_carbs = carbs + dish.get('carbs', 0)
+                    new_fat = fat + dish.get('fat', 0)
+                    new_slot_error = slot_error + abs(dish.get('calories', 0) - slot_target)
+                    new_filled = filled + slot_target
+                    objective = self._objective(
+                        new_cal, new_protein, new_carbs, new_fat,
+                        new_slot_error, new_filled, goal, macro_target
+                    )
+                    expanded.append((
+                        objective, items + ((dish, slot),), names | {dish['name']},
+                        new_cal, new_protein, new_carbs, new_fat, new_slot_error, new_filled
+                    ))
+                    used += 1
+                    if used >= self.CANDIDATES_PER_SLOT:
+                        break
+
+            if not expanded:
+                continue
+
+            expanded.sort(key=lambda state: state[0])
+            beam = []
+            seen = set()
+            for state in expanded:
+                # The same dishes in a different slot order add nothing new
+                if state[2] in seen:
+                    continue
+                seen.add(state[2])
+                beam.append(state)
+                if len(beam) >= beam_width:
+                    break
+
+        thalis = []
+        for state in beam:
+            if not state[1]:
+                continue
+            items = [
+                {**dish, 'category': slot['category'], 'note': slot['note']}
+                for dish, slot in state[1]
+            ]
+            # Rank thalis that hit the calorie goal by balance score; the rest by objective
+            within_goal = abs(state[3] - calorie_goal) <= calorie_goal * self.CALORIE_TOLERANCE
+            thalis.append((
+                0 if within_goal else 1,
+                -self.recommender._calculate_balance_score(items) if within_goal else 0,
+                state[0],
+                items
+            ))
+        thalis.sort(key=lambda entry: entry[:3])
+
+        if rng is not None and len(thalis) > 1:
+            # Same tier and balance score: let the request seed decide which one leads
+            tied = [i for i, entry in enumerate(thalis) if entry[:2] == thalis[0][:2]]
+            thalis.insert(0, thalis.pop(rng.choice(tied)))
+
+        return [
+            self._build_thali(layout, meal_type, calorie_goal, health_goal, entry[3])
+            for entry in thalis[:max(top_n, 1)]
+        ]
+
+    def _objective(
+        self,
+        calories: float,
+        protein: float,
+        carbs: float,
+        fat: float,
+        slot_error: float,
+        filled_target: float,
+        goal: float,
+        macro_target: Dict[str, float]
+    ) -> float:
+        """Lower is better: calorie miss, per-slot calorie miss and macro split distance"""
+        calorie_error = abs(calories - filled_target) / goal
+        macro_error = 0.0
+        if calories > 0:
+            macro_error = (
+                abs(protein * 4 / calories - macro_target['protein'])
+                + abs(carbs * 4 / calories - macro_target['carbs'])
+                + abs(fat * 9 / calories - macro_target['fat'])
+            )
+        return calorie_error + 0.5 * slot_error / goal + macro_error
+
+    def _macro_target(self, health_goal: Optional[str]) -> Dict[str, float]:
+        goal = (health_goal or '').lower().replace(' ', '_')
+        if 'weight_loss' in goal:
+            return self.MACRO_TARGETS['weight_loss']
+        if 'muscle' in goal or 'bulk' in goal:
+            return self.MACRO_TARGETS['muscle']
+        return self.MACRO_TARGETS['default']
+
+    def _build_thali(
+        self,
+        layout: Dict,
+        meal_type: str,
+        calorie_goal: int,
+        health_goal: Optional[str],
+        items: List[Dict]
+    ) -> Dict:
+        """Shape a composed thali like the rest of the recommender's responses"""
+        if layout['tip_key']:
+            health_tip = self.recommender._get_health_tip(layout['tip_key'], health_goal)
+        else:
+            health_tip = "Eat mindfully and stay hydrated"
+
+        return {
+            'meal_type': layout['label'] or meal_type,
+            'calorie_goal': calorie_goal,
+            'recommended_items': items,
+            'total_calories': round(sum(i['calories'] for i in items)),
+            'total_protein': round(sum(i.get('protein', 0) for i in items)),
+            'total_carbs': round(sum(i.get('carbs', 0) for i in items)),
+            'total_fat': round(sum(i.get('fat', 0) for i in items)),
+            'balance_score': self.recommender._calculate_balance_score(items),
+            'thali_note': layout['note'].format(count=len(items)),
+            'health_tip': health_tip
+        }
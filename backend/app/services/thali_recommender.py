@@ -2,10 +2,14 @@
 AI-based Indian Thali Recommendation System
 Suggests balanced meals based on calorie goals and meal types
 """
+import bisect
 import random
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set
 from datetime import datetime
 
+from app.services.dish_annotator import DishAnnotator, annotate_dishes
+from app.services.thali_composer import ThaliComposer
+
 class ThaliRecommender:
     """
     Intelligent meal recommendation engine for Indian Thali system.
@@ -56,8 +60,10 @@ class ThaliRecommender:
     
     def __init__(self, dishes_data: List[Dict]):
         """Initialize with available dishes from database"""
-        self.dishes = dishes_data
+        self.dishes = annotate_dishes(dishes_data)
         self.categorized_dishes = self._categorize_dishes()
+        self.calorie_index = self._build_calorie_index()
+        self.composer = ThaliComposer(self)
     
     def _categorize_dishes(self) -> Dict[str, List[Dict]]:
         """Categorize dishes for intelligent selection"""
@@ -65,22 +71,41 @@ class ThaliRecommender:
         categorized['all'] = self.dishes
         
         for dish in self.dishes:
-            name = dish['name']
-            
-            # Categorize based on name patterns
-            for category, keywords in self.FOOD_CATEGORIES.items():
-                if any(keyword.lower() in name.lower() for keyword in keywords):
+            # Categories are tagged once at catalog load
+            for category in dish['tags']['categories']:
+                if category in categorized:
                     categorized[category].append(dish)
         
         return categorized
     
+    def _build_calorie_index(self) -> Dict[str, tuple]:
+        """
+        Build calorie-sorted arrays per category for bisect lookups.
+        
+        Each entry is (sorted calories, matching dish positions in self.dishes).
+        """
+        positions = {id(dish): i for i, dish in enumerate(self.dishes)}
+        index = {}
+        for category, dishes in self.categorized_dishes.items():
+            ordered = sorted(
+                (dish.get('calories', 0), positions[id(dish)])
+                for dish in dishes
+            )
+            index[category] = (
+                [calories for calories, _ in ordered],
+                [position for _, position in ordered]
+            )
+        return index
+    
     def recommend_thali(
         self, 
         meal_type: str, 
         calorie_goal: int,
         dietary_preference: Optional[str] = None,
         health_goal: Optional[str] = None,
-        allergies: Optional[List[str]] = None
+        allergies: Optional[List[str]] = None,
+        num_alternatives: int = 0,
+        rng: Optional[random.Random] = None
     ) -> Dict:
         """
         Generate AI-based Thali recommendations
@@ -91,376 +116,167 @@ class ThaliRecommender:
             dietary_preference: 'Vegetarian', 'Vegan', 'Non-Vegetarian', etc.
             health_goal: 'Weight Loss', 'Muscle Building', etc.
             allergies: List of ingredients to avoid
+            num_alternatives: Extra ranked thalis to include under 'alternatives'
+            rng: Seeded generator that picks between equally ranked thalis;
+                 without one the result is fully deterministic
         
         Returns:
             Dictionary with recommended items and metadata
         """
-        meal_type_normalized = meal_type.lower().replace(' ', '_').replace('-', '_')
-        
-        # Apply dietary filters
-        available_dishes = self._filter_dishes(dietary_preference, allergies)
-        
-        if not available_dishes:
-            return self._get_fallback_recommendation(calorie_goal, meal_type)
-        
-        # Generate recommendations based on meal type
-        if meal_type_normalized == 'breakfast':
-            return self._recommend_breakfast(calorie_goal, available_dishes, health_goal)
-        elif meal_type_normalized == 'lunch':
-            return self._recommend_lunch(calorie_goal, available_dishes, health_goal)
-        elif meal_type_normalized in ['evening_snack', 'snack']:
-            return self._recommend_snack(calorie_goal, available_dishes, health_goal)
-        elif meal_type_normalized == 'dinner':
-            return self._recommend_dinner(calorie_goal, available_dishes, health_goal)
-        else:
-            return self._recommend_generic(calorie_goal, available_dishes, meal_type)
-    
-    def _filter_dishes(self, dietary_preference: Optional[str], allergies: Optional[List[str]]) -> List[Dict]:
-        """Filter dishes based on dietary preferences and allergies"""
-        filtered = self.dishes.copy()
-        
-        # Filter by dietary preference
-        if dietary_preference:
-            if dietary_preference.lower() == 'vegetarian':
-                filtered = [d for d in filtered if not any(
-                    meat in d['name'].lower() 
-                    for meat in ['chicken', 'fish', 'mutton', 'egg', 'meat']
-                )]
-            elif dietary_preference.lower() == 'vegan':
-                filtered = [d for d in filtered if not any(
-                    non_vegan in d['name'].lower() 
-                    for non_vegan in ['chicken', 'fish', 'paneer', 'egg', 'ghee', 'butter', 'curd']
-                )]
-        
-        # Filter by allergies
-        if allergies:
-            for allergen in allergies:
-                filtered = [d for d in filtered if allergen.lower() not in d['name'].lower()]
-        
-        return filtered
-    
-    def _recommend_breakfast(self, calorie_goal: int, dishes: List[Dict], health_goal: Optional[str]) -> Dict:
-        """Generate breakfast thali recommendation"""
-        recommendations = []
-        remaining_calories = calorie_goal
-        rules = self.THALI_RULES['breakfast']
-        
-        # 1. Main carb (45% - Dosa/Idli/Paratha/Poha)
-        main_cal = calorie_goal * rules['main_carb']
-        main_dish = self._select_best_match(
-            dishes, main_cal, 
-            preferred_categories=['breakfast_items', 'grains']
-        )
-        if main_dish:
-            recommendations.append({
-                **main_dish,
-                'category': 'Main Dish',
-                'note': 'Primary energy source for the morning'
-            })
-            remaining_calories -= main_dish['calories']
-        
-        # 2. Protein (25% - Dal/Egg/Paneer)
-        protein_cal = calorie_goal * rules['protein']
-        protein_dish = self._select_best_match(
-            [d for d in dishes if d.get('protein', 0) > 10], 
-            protein_cal,
-            exclude=[main_dish['name']] if main_dish else []
-        )
-        if protein_dish:
-            recommendations.append({
-                **protein_dish,
-                'category': 'Protein',
-                'note': 'Keeps you full and energized'
-            })
-            remaining_calories -= protein_dish['calories']
-        
-        # 3. Healthy fat/side
-        if remaining_calories > 50:
-            side_dish = self._select_best_match(
-                dishes, remaining_calories * 0.5,
-                exclude=[r['name'] for r in recommendations]
-            )
-            if side_dish:
-                recommendations.append({
-                    **side_dish,
-                    'category': 'Side',
-                    'note': 'Adds flavor and nutrition'
-                })
-                remaining_calories -= side_dish['calories']
-        
-        total_cals = sum(r['calories'] for r in recommendations)
-        
-        return {
-            'meal_type': 'Breakfast',
-            'calorie_goal': calorie_goal,
-            'recommended_items': recommendations,
-            'total_calories': round(total_cals),
-            'total_protein': round(sum(r.get('protein', 0) for r in recommendations)),
-            'total_carbs': round(sum(r.get('carbs', 0) for r in recommendations)),
-            'total_fat': round(sum(r.get('fat', 0) for r in recommendations)),
-            'balance_score': self._calculate_balance_score(recommendations),
-            'thali_note': f"Traditional Indian breakfast thali - {len(recommendations)} items",
-            'health_tip': self._get_health_tip('breakfast', health_goal)
-        }
-    
-    def _recommend_lunch(self, calorie_goal: int, dishes: List[Dict], health_goal: Optional[str]) -> Dict:
-        """Generate lunch thali recommendation"""
-        recommendations = []
-        rules = self.THALI_RULES['lunch']
-        
-        # 1. Grain - Rice or Roti (30%)
-        grain_cal = calorie_goal * rules['grain']
-        grain = self._select_best_match(dishes, grain_cal, preferred_categories=['grains'])
-        if grain:
-            recommendations.append({
-                **grain,
-                'category': 'Grain (Staple)',
-                'note': 'Foundation of the thali'
-            })
-        
-        # 2. Dal/Protein (25%)
-        dal_cal = calorie_goal * rules['dal_protein']
-        dal = self._select_best_match(
-            [d for d in dishes if 'dal' in d['name'].lower() or 'rajma' in d['name'].lower()],
-            dal_cal,
-            exclude=[grain['name']] if grain else []
-        )
-        if dal:
-            recommendations.append({
-                **dal,
-                'category': 'Dal (Lentils)',
-                'note': 'Plant-based protein powerhouse'
-            })
-        
-        # 3. Vegetable curry (20%)
-        veg_cal = calorie_goal * rules['vegetable']
-        veg = self._select_best_match(
-            dishes, veg_cal,
-            preferred_categories=['vegetables', 'curries'],
-            exclude=[r['name'] for r in recommendations]
-        )
-        if veg:
-            recommendations.append({
-                **veg,
-                'category': 'Sabzi (Vegetable)',
-                'note': 'Rich in vitamins and fiber'
-            })
-        
-        # 4. Side protein (15%)
-        side_cal = calorie_goal * rules['side_protein']
-        side = self._select_best_match(
-            [d for d in dishes if d.get('protein', 0) > 8],
-            side_cal,
-            exclude=[r['name'] for r in recommendations]
-        )
-        if side:
-            recommendations.append({
-                **side,
-                'category': 'Protein Side',
-                'note': 'Additional protein for satiety'
-            })
-        
-        total_cals = sum(r['calories'] for r in recommendations)
-        
-        return {
-            'meal_type': 'Lunch',
-            'calorie_goal': calorie_goal,
-            'recommended_items': recommendations,
-            'total_calories': round(total_cals),
-            'total_protein': round(sum(r.get('protein', 0) for r in recommendations)),
-            'total_carbs': round(sum(r.get('carbs', 0) for r in recommendations)),
-            'total_fat': round(sum(r.get('fat', 0) for r in recommendations)),
-            'balance_score': self._calculate_balance_score(recommendations),
-            'thali_note': f"Complete Indian thali - {len(recommendations)} items for balanced nutrition",
-            'health_tip': self._get_health_tip('lunch', health_goal)
-        }
-    
-    def _recommend_snack(self, calorie_goal: int, dishes: List[Dict], health_goal: Optional[str]) -> Dict:
-        """Generate evening snack recommendation"""
-        recommendations = []
-        
-        # Light snack recommendation
-        snack = self._select_best_match(
-            dishes, calorie_goal * 0.8,
-            preferred_categories=['snacks', 'breakfast_items']
+        thalis = self.compose_thalis(
+            meal_type,
+            calorie_goal,
+            dietary_preference=dietary_preference,
+            health_goal=health_goal,
+            allergies=allergies,
+            top_n=num_alternatives + 1,
+            rng=rng
         )
-        if snack:
-            recommendations.append({
-                **snack,
-                'category': 'Snack',
-                'note': 'Light bite to curb evening hunger'
-            })
         
-        total_cals = sum(r['calories'] for r in recommendations)
+        if not thalis:
+            return self._get_fallback_recommendation(calorie_goal, meal_type)
         
-        return {
-            'meal_type': 'Evening Snack',
-            'calorie_goal': calorie_goal,
-            'recommended_items': recommendations,
-            'total_calories': round(total_cals),
-            'total_protein': round(sum(r.get('protein', 0) for r in recommendations)),
-            'total_carbs': round(sum(r.get('carbs', 0) for r in recommendations)),
-            'total_fat': round(sum(r.get('fat', 0) for r in recommendations)),
-            'balance_score': self._calculate_balance_score(recommendations),
-            'thali_note': f"Evening snack - keep it light",
-            'health_tip': self._get_health_tip('snack', health_goal)
-        }
+        return {**thalis[0], 'alternatives': thalis[1:]}
     
-    def _recommend_dinner(self, calorie_goal: int, dishes: List[Dict], health_goal: Optional[str]) -> Dict:
-        """Generate dinner thali recommendation"""
-        recommendations = []
-        rules = self.THALI_RULES['dinner']
-        
-        # Lighter grain portion for dinner (25%)
-        grain_cal = calorie_goal * rules['grain']
-        grain = self._select_best_match(dishes, grain_cal, preferred_categories=['grains'])
-        if grain:
-            recommendations.append({
-                **grain,
-                'category': 'Grain',
-                'note': 'Light grain for easy digestion'
-            })
-        
-        # Protein curry (30%)
-        protein_cal = calorie_goal * rules['protein_curry']
-        protein = self._select_best_match(
-            [d for d in dishes if d.get('protein', 0) > 10],
-            protein_cal,
-            preferred_categories=['proteins', 'curries'],
-            exclude=[grain['name']] if grain else []
-        )
-        if protein:
-            recommendations.append({
-                **protein,
-                'category': 'Protein Curry',
-                'note': 'Protein for overnight muscle repair'
-            })
+    def compose_thalis(
+        self,
+        meal_type: str,
+        calorie_goal: int,
+        dietary_preference: Optional[str] = None,
+        health_goal: Optional[str] = None,
+        allergies: Optional[List[str]] = None,
+        top_n: int = 3,
+        time_budget_ms: Optional[float] = None,
+        exclude: Optional[Set[str]] = None,
+        rng: Optional[random.Random] = None
+    ) -> List[Dict]:
+        """
+        Compose the top-N thalis for a meal, ranked by balance score
         
-        # Vegetables (25%)
-        veg_cal = calorie_goal * rules['vegetable']
-        veg = self._select_best_match(
-            dishes, veg_cal,
-            preferred_categories=['vegetables'],
-            exclude=[r['name'] for r in recommendations]
+        Slot combinations are searched against the THALI_RULES calorie split and
+        the health goal's macro targets (see ThaliComposer).
+        """
+        # Apply dietary filters lazily while walking the calorie index; when
+        # nothing passes, every slot comes up empty and no thali is returned
+        allowed = self._build_filter(dietary_preference, allergies)
+        
+        return self.composer.compose(
+            meal_type,
+            calorie_goal,
+            allowed,
+            health_goal=health_goal,
+            top_n=top_n,
+            time_budget_ms=time_budget_ms,
+            exclude=exclude,
+            rng=rng
         )
-        if veg:
-            recommendations.append({
-                **veg,
-                'category': 'Vegetable',
-                'note': 'Fiber-rich for digestion'
-            })
-        
-        total_cals = sum(r['calories'] for r in recommendations)
-        
-        return {
-            'meal_type': 'Dinner',
-            'calorie_goal': calorie_goal,
-            'recommended_items': recommendations,
-            'total_calories': round(total_cals),
-            'total_protein': round(sum(r.get('protein', 0) for r in recommendations)),
-            'total_carbs': round(sum(r.get('carbs', 0) for r in recommendations)),
-            'total_fat': round(sum(r.get('fat', 0) for r in recommendations)),
-            'balance_score': self._calculate_balance_score(recommendations),
-            'thali_note': f"Light dinner thali - {len(recommendations)} items for good sleep",
-            'health_tip': self._get_health_tip('dinner', health_goal)
-        }
     
-    def _recommend_generic(self, calorie_goal: int, dishes: List[Dict], meal_type: str) -> Dict:
-        """Generic recommendation for any meal type"""
-        recommendations = []
-        
-        # Select 2-3 items that fit the calorie goal
-        items = self._select_multiple_items(dishes, calorie_goal, count=3)
-        for item in items:
-            recommendations.append({
-                **item,
-                'category': 'Suggested Item',
-                'note': 'Balanced choice for your goal'
-            })
-        
-        total_cals = sum(r['calories'] for r in recommendations)
-        
-        return {
-            'meal_type': meal_type,
-            'calorie_goal': calorie_goal,
-            'recommended_items': recommendations,
-            'total_calories': round(total_cals),
-            'total_protein': round(sum(r.get('protein', 0) for r in recommendations)),
-            'total_carbs': round(sum(r.get('carbs', 0) for r in recommendations)),
-            'total_fat': round(sum(r.get('fat', 0) for r in recommendations)),
-            'balance_score': self._calculate_balance_score(recommendations),
-            'thali_note': f"Suggested meal combination",
-            'health_tip': "Eat mindfully and stay hydrated"
-        }
+    def _build_filter(
+        self,
+        dietary_preference: Optional[str],
+        allergies: Optional[List[str]]
+    ) -> Callable[[Dict], bool]:
+        """Build a dish predicate for dietary preferences and allergies"""
+        diets = DishAnnotator.allowed_diets(dietary_preference)
+        allergen_classes, terms = DishAnnotator.parse_allergies(allergies)
+        
+        if diets is None and not allergen_classes and not terms:
+            return lambda dish: True
+        
+        return lambda dish: DishAnnotator.is_allowed(dish, diets, allergen_classes, terms)
     
-    def _select_best_match(
+    def _find_candidates(
         self, 
-        dishes: List[Dict], 
-        target_calories: int,
+        allowed: Callable[[Dict], bool], 
+        target_calories: float,
+        limit: int,
         preferred_categories: Optional[List[str]] = None,
-        exclude: Optional[List[str]] = None
-    ) -> Optional[Dict]:
-        """Select dish that best matches target calories"""
-        if not dishes:
-            return None
-        
-        exclude = exclude or []
-        available = [d for d in dishes if d['name'] not in exclude]
-        
-        if not available:
-            return None
-        
-        # Prioritize preferred categories
-        if preferred_categories:
-            preferred = []
-            for category in preferred_categories:
-                if category in self.categorized_dishes:
-                    preferred.extend(self.categorized_dishes[category])
-            
-            if preferred:
-                preferred = [d for d in preferred if d['name'] not in exclude and d in available]
-                if preferred:
-                    available = preferred
+        exclude: Optional[Set[str]] = None,
+        min_protein: Optional[float] = None,
+        keywords: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """
+        Find the dishes closest to a slot's calorie target
         
-        # Find closest match to target calories (within 20% tolerance)
-        tolerance = target_calories * 0.20
-        candidates = [
-            d for d in available 
-            if abs(d['calories'] - target_calories) <= tolerance
-        ]
+        Walks the calorie-sorted index outward from the target with bisect, so
+        only the dishes nearest the target are ever inspected.
         
-        if not candidates:
-            # If no close match, get closest one
-            candidates = sorted(available, key=lambda d: abs(d['calories'] - target_calories))[:3]
+        Args:
+            allowed: Dietary/allergy predicate for this request
+            target_calories: Calorie target for the slot
+            limit: Maximum number of dishes to return
+            preferred_categories: FOOD_CATEGORIES to prefer when they have candidates
+            exclude: Dish names already on the plate
+            min_protein: Only consider dishes with more protein than this (grams)
+            keywords: Only consider dishes tagged with one of these keywords
         
-        # Return random from best candidates for variety
-        return random.choice(candidates) if candidates else None
+        Returns:
+            Up to `limit` dishes, closest to the target first
+        """
+        exclude = exclude or set()
+        keywords = frozenset(keywords) if keywords else None
+        
+        def accept(dish: Dict) -> bool:
+            if dish['name'] in exclude:
+                return False
+            if min_protein is not None and not dish.get('protein', 0) > min_protein:
+                return False
+            if keywords is not None and keywords.isdisjoint(dish['tags']['keywords']):
+                return False
+            return allowed(dish)
+        
+        # Prioritize preferred categories, falling back to every dish if none qualify
+        preferred = [c for c in (preferred_categories or []) if c in self.calorie_index]
+        if preferred:
+            candidates = self._nearest_dishes(preferred, target_calories, accept, limit)
+            if candidates:
+                return candidates
+        
+        return self._nearest_dishes(['all'], target_calories, accept, limit)
     
-    def _select_multiple_items(self, dishes: List[Dict], target_calories: int, count: int = 3) -> List[Dict]:
-        """Select multiple items that together approximate target calories"""
-        if not dishes or count <= 0:
-            return []
-        
-        selected = []
-        remaining = target_calories
-        available = dishes.copy()
-        
-        for _ in range(count):
-            if not available:
-                break
+    def _nearest_dishes(
+        self,
+        pools: List[str],
+        target_calories: float,
+        accept: Callable[[Dict], bool],
+        limit: int
+    ) -> List[Dict]:
+        """Return up to `limit` accepted dishes from the pools closest to the target calories"""
+        found = {}
+        for pool in pools:
+            calories, positions = self.calorie_index[pool]
+            hi = bisect.bisect_left(calories, target_calories)
+            lo = hi - 1
+            taken = 0
+            cutoff = None
             
-            target_per_item = remaining / (count - len(selected))
-            item = self._select_best_match(
-                available, target_per_item,
-                exclude=[s['name'] for s in selected]
-            )
-            
-            if item:
-                selected.append(item)
-                remaining -= item['calories']
-                available = [d for d in available if d['name'] != item['name']]
-        
-        return selected
+            while lo >= 0 or hi < len(calories):
+                # Step towards whichever neighbour is closer to the target
+                if hi >= len(calories) or (lo >= 0 and target_calories - calories[lo] <= calories[hi] - target_calories):
+                    i = lo
+                    lo -= 1
+                else:
+                    i = hi
+                    hi += 1
+                
+                distance = abs(calories[i] - target_calories)
+                # Once full, only dishes tied with the last one taken can still
+                # make the cut (catalog order decides between them below)
+                if cutoff is not None and distance > cutoff:
+                    break
+                position = positions[i]
+                if position in found:
+                    continue
+                dish = self.dishes[position]
+                if accept(dish):
+                    found[position] = distance
+                    taken += 1
+                    if taken == limit:
+                        cutoff = distance
+        
+        # Merge pools: keep the overall closest, in a stable (distance, catalog order) order
+        nearest = sorted(found.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [self.dishes[position] for position, _ in nearest]
     
     def _calculate_balance_score(self, items: List[Dict]) -> int:
         """Calculate nutritional balance score (0-100)"""
@@ -0,0 +1,252 @@
+"""
+Cached Translation for NutriSathi
+Serves UI string translations from an in-memory LRU and the translations table,
+sending only unseen texts to Google Cloud Translate through one shared client
+"""
+import asyncio
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db import models
+from app.services.cache import LRUCache
+
+# Optional Google Translate import - only needed for texts not in the cache
+try:
+    from google.cloud import translate_v2 as translate
+except Exception:
+    translate = None
+
+
+class TranslationUnavailable(Exception):
+    """google-cloud-translate is not installed, so uncached texts cannot be translated"""
+
+
+def text_hash(text: str) -> str:
+    """Stable digest of a source text, the cache key together with the target language"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class GoogleTranslateBackend:
+    """
+    One Google Cloud Translate client shared by all requests.
+
+    The client (and its credentials and HTTP session) is created on first
+    use instead of per request.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def translate(self, texts: List[str], target: str) -> List[str]:
+        """
+        Translate texts in one upstream call.
+
+        Returns:
+            Translations in the order of `texts`
+
+        Raises:
+            TranslationUnavailable: The client library is not installed
+        """
+        translated = self._get_client().translate(texts, target_language=target)
+        # A single text comes back as a dict, a list as a list of dicts in order
+        if isinstance(translated, dict):
+            translated = [translated]
+        return [item.get("translatedText") if isinstance(item, dict) else str(item) for item in translated]
+
+    def _get_client(self):
+        if translate is None:
+            raise TranslationUnavailable("google-cloud-translate is not installed")
+        with self._lock:
+            if self._client is None:
+                self._client = translate.Client()
+            return self._client
+
+
+class TranslationService:
+    """
+    Two-level cache in front of an upstream translator.
+
+    Translations are keyed by (target language, source text hash), so a UI
+    string is translated once per language no matter which key or user
+    asks for it. Cached translations never expire; texts the UI stops using
+    simply stop being read.
+
+    Misses are sent upstream in chunks bounded by text count and characters
+    (Google rejects oversized requests), a few chunks at a time.
+    """
+
+    # Bound parameters per IN (...) query
+    MAX_QUERY_BATCH = 500
+    # Google Translate v2 takes at most 128 texts per call and recommends
+    # keeping a request under 5K characters
+    MAX_CHUNK_TEXTS = 128
+    MAX_CHUNK_CHARS = 5000
+    # Upstream calls in flight at once for one translate() call
+    CHUNK_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        backend,
+        session_factory: Callable,
+        cache_size: int = 8192,
+        max_chunk_texts: Optional[int] = None,
+        max_chunk_chars: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            backend: Upstream translator with translate(texts, target) -> translations
+                (blocking; run in a worker thread)
+            session_factory: Creates independent database sessions (a sessionmaker)
+            cache_size: Translations kept in memory
+            max_chunk_texts: Texts per upstream call (default MAX_CHUNK_TEXTS)
+            max_chunk_chars: Characters per upstream call (default MAX_CHUNK_CHARS);
+                a longer single text is sent on its own
+            concurrency: Upstream calls in flight at once (default CHUNK_CONCURRENCY)
+        """
+        self.backend = backend
+        self.session_factory = session_factory
+        self.cache = LRUCache(maxsize=cache_size)
+        self.max_chunk_texts = max_chunk_texts or self.MAX_CHUNK_TEXTS
+        self.max_chunk_chars = max_chunk_chars or self.MAX_CHUNK_CHARS
+        self.concurrency = concurrency or self.CHUNK_CONCURRENCY
+
+    async def translate(self, texts: Dict[str, str], target: str) -> Dict[str, str]:
+        """
+        Translate keyed texts, using cached translations where available.
+
+        Args:
+            texts: UI key -> source text
+            target: Target language code
+
+        Returns:
+            UI key -> translated text, in the order of `texts`
+
+        Raises:
+            TranslationUnavailable: Some texts are uncached and there is no upstream client
+            Exception: Whatever the upstream translator raised
+        """
+        hashes = {text: text_hash(text) for text in texts.values()}
+        translated = await self._read_many(target, hashes)
+
+        missing = [text for text in hashes if text not in translated]
+        if missing:
+            print(f"🌐 Translating {len(missing)} of {len(hashes)} texts to {target}")
+            translated.update(await self._translate_upstream(missing, target, hashes))
+
+        return {key: translated[text] for key, text in texts.items()}
+
+    async def _translate_upstream(self, texts: List[str], target: str, hashes: Dict[str, str]) -> Dict[str, str]:
+        """
+        Translate texts in concurrent size-bounded chunks (source text -> translation).
+
+        Each chunk is cached as soon as it returns, so when one chunk fails
+        the others are not translated again on the next request.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_chunk(chunk: List[str]) -> Dict[str, str]:
+            async with semaphore:
+                results = await asyncio.to_thread(self.backend.translate, chunk, target)
+            if len(results) != len(chunk):
+                raise ValueError(f"Translator returned {len(results)} translations for {len(chunk)} texts")
+            await self._store(target, [(text, hashes[text], result) for text, result in zip(chunk, results)])
+            return dict(zip(chunk, results))
+
+        outcomes = await asyncio.gather(
+            *(translate_chunk(chunk) for chunk in self._chunks(texts)),
+            return_exceptions=True
+        )
+        translated: Dict[str, str] = {}
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+            translated.update(outcome)
+        return translated
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        """Split texts, in order, into chunks within the text-count and character limits"""
+        chunks: List[List[str]] = []
+        chunk: List[str] = []
+        chars = 0
+        for text in texts:
+            if chunk and (len(chunk) >= self.max_chunk_texts or chars + len(text) > self.max_chunk_chars):
+                chunks.append(chunk)
+                chunk, chars = [], 0
+            chunk.append(text)
+            chars += len(text)
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _read_many(self, target: str, hashes: Dict[str, str]) -> Dict[str, str]:
+        """Cached translations (source text -> translation) from memory, then the table in bulk"""
+        translated: Dict[str, str] = {}
+        missing: Dict[str, str] = {}
+        for text, digest in hashes.items():
+            cached = self.cache.get((target, digest))
+            if cached is not None:
+                translated[text] = cached
+            else:
+                missing[digest] = text
+        if missing:
+            # Blocking database I/O runs in a worker thread, off the event loop
+            loaded = await asyncio.to_thread(self._load, target, list(missing))
+            translated.update((missing[digest], translated_text) for digest, translated_text in loaded.items())
+        return translated
+
+    def _load(self, target: str, digests: List[str]) -> Dict[str, str]:
+        """Read translations (hash -> translation) from the table in bulk and cache them"""
+        loaded: Dict[str, str] = {}
+        db = self.session_factory()
+        try:
+            for start in range(0, len(digests), self.MAX_QUERY_BATCH):
+                rows = db.query(models.Translation.text_hash, models.Translation.translated_text).filter(
+                    models.Translation.target == target,
+                    models.Translation.text_hash.in_(digests[start:start + self.MAX_QUERY_BATCH])
+                ).all()
+                for digest, translated_text in rows:
+                    self.cache.set((target, digest), translated_text)
+                    loaded[digest] = translated_text
+        finally:
+            db.close()
+        return loaded
+
+    async def _store(self, target: str, rows: Iterable[Tuple[str, str, str]]) -> None:
+        """Save fresh (source text, hash, translation) rows to memory and the table"""
+        rows = list(rows)
+        for _, digest, translated_text in rows:
+            self.cache.set((target, digest), translated_text)
+        await asyncio.to_thread(self._save, target, rows)
+
+    def _save(self, target: str, rows: List[Tuple[str, str, str]]) -> None:
+        """Insert translation rows, skipping ones another request stored first"""
+        db = self.session_factory()
+        try:
+            db.add_all(self._model(target, *row) for row in rows)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another request stored some of them first; keep the rest one by one
+                db.rollback()
+                for row in rows:
+                    db.add(self._model(target, *row))
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _model(target: str, source_text: str, digest: str, translated_text: str) -> models.Translation:
+        return models.Translation(
+            target=target,
+            text_hash=digest,
+            source_text=source_text,
+            translated_text=translated_text
+        )
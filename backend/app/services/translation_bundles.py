@@ -0,0 +1,94 @@
+"""
+Translation Bundles for NutriSathi
+Prebuilt per-language UI translation files, written by the bundle build job and served as-is
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+TRANSLATIONS_DIR = Path(__file__).resolve().parents[3] / "data" / "translations"
+# UI strings (key -> English text) that every bundle translates
+SOURCE_PATH = TRANSLATIONS_DIR / "en.json"
+DEFAULT_BUNDLE_DIR = TRANSLATIONS_DIR / "bundles"
+
+# Language codes accepted as bundle names (also keeps paths inside the bundle directory)
+LANGUAGE_CODE = re.compile(r'^[a-z]{2,3}(-[A-Za-z0-9]{2,8})?$')
+
+
+def load_source(path: Optional[Path] = None) -> Dict[str, str]:
+    """The UI strings bundles are built from"""
+    with open(path or SOURCE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_bundle(directory: Path, lang: str, translations: Dict[str, str]) -> str:
+    """
+    Write one language's bundle, replacing the previous one atomically.
+
+    The version is a digest of the translations, so rebuilding unchanged
+    strings keeps the version (and clients' ETags) the same.
+
+    Returns:
+        The bundle version
+    """
+    version = hashlib.sha256(
+        json.dumps(translations, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+    body = json.dumps(
+        {"lang": lang, "version": version, "translations": translations},
+        ensure_ascii=False,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{lang}.json"
+    building_path = path.with_name(path.name + '.tmp')
+    building_path.write_bytes(body)
+    os.replace(building_path, path)
+    return version
+
+
+class TranslationBundleStore:
+    """
+    Serves bundle files from memory.
+
+    Each bundle is read once and re-read only when its file changes (a new
+    build), so requests never touch the disk beyond a stat.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or DEFAULT_BUNDLE_DIR)
+        self._lock = threading.Lock()
+        # lang -> (file identity, bundle)
+        self._bundles: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+    def get(self, lang: str) -> Optional[Dict]:
+        """
+        A language's bundle: {'body': JSON bytes, 'version': str, 'etag': str},
+        or None when no bundle was built for it.
+        """
+        if not LANGUAGE_CODE.match(lang):
+            return None
+        path = self.directory / f"{lang}.json"
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._bundles.get(lang)
+            if cached is not None and cached[0] == identity:
+                return cached[1]
+
+        body = path.read_bytes()
+        version = json.loads(body)["version"]
+        bundle = {'body': body, 'version': version, 'etag': f'"{version}"'}
+        with self._lock:
+            self._bundles[lang] = (identity, bundle)
+        return bundle
@@ -0,0 +1,90 @@
+"""
+Benchmark MoodRecommender diversity selection on large candidate pools.
+
+Compares the MMR selector against the previous list-scanning selector, then
+times recommend_by_mood end to end on a large synthetic catalog.
+
+Run from backend/:  python benchmark_mood_recommender.py
+"""
+import random
+import time
+
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+
+
+def legacy_select(scored_dishes, num_recommendations):
+    """The old selector: first-word variety pass, then a `dish not in selected` fill loop"""
+    selected = []
+    used_categories = set()
+    for score, dish in scored_dishes:
+        if len(selected) >= num_recommendations:
+            break
+        name_words = dish['name'].lower().split()
+        category = name_words[0] if name_words else ''
+        if category not in used_categories or len(selected) < num_recommendations // 2:
+            selected.append(dish)
+            used_categories.add(category)
+    while len(selected) < num_recommendations and len(selected) < len(scored_dishes):
+        for score, dish in scored_dishes:
+            if dish not in selected:
+                selected.append(dish)
+                break
+    return selected
+
+
+def synthetic_catalog(size, seed=7):
+    """Catalog dishes renamed and re-scaled into a catalog of the given size"""
+    rng = random.Random(seed)
+    base = load_dishes_from_csv()
+    dishes = []
+    for i in range(size):
+        dish = rng.choice(base)
+        scale = rng.uniform(0.5, 2.0)
+        dishes.append({
+            'name': f"{dish['name']} {i}",
+            'serving_size': dish['serving_size'],
+            'unit': 'g',
+            'calories': round(dish['calories'] * scale, 1),
+            'protein': round(dish['protein'] * scale, 1),
+            'carbs': round(dish['carbs'] * scale, 1),
+            'fat': round(dish['fat'] * scale, 1)
+        })
+    return dishes
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    recommender = MoodRecommender(synthetic_catalog(1000))
+    k = 8
+
+    print("Diversity selection, k=8 (ms per call)")
+    print(f"{'pool':>8} {'legacy':>10} {'mmr':>10}")
+    for pool_size in (1_000, 10_000, 100_000):
+        # One dominant name category makes the old fill loop rescan the list
+        pool = [
+            (1.0 - i / pool_size, {'name': f"Dal {i}", 'calories': 200 + i % 300, 'protein': 10, 'carbs': 30, 'fat': 5})
+            for i in range(pool_size)
+        ]
+        legacy_ms = timed(lambda: legacy_select(pool, k), 3)
+        mmr_ms = timed(lambda: recommender._select_diverse_dishes(pool, k), 3)
+        print(f"{pool_size:>8} {legacy_ms:>10.2f} {mmr_ms:>10.2f}")
+
+    print()
+    print("recommend_by_mood end to end (ms per call)")
+    for size in (10_000, 100_000):
+        start = time.perf_counter()
+        recommender = MoodRecommender(synthetic_catalog(size))
+        build_s = time.perf_counter() - start
+        ms = timed(lambda: recommender.recommend_by_mood('tired', (200, 800), 'Vegetarian', ['peanut'], 6), 20)
+        print(f"{size:>8} dishes: {ms:.2f} ms (catalog build {build_s:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
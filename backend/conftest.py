@@ -0,0 +1,100 @@
+"""
+Shared pytest fixtures for the backend tests.
+"""
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Importing app.main creates its tables on DATABASE_URL; keep test runs off the dev database
+if "DATABASE_URL" not in os.environ:
+    _test_db_dir = tempfile.mkdtemp(prefix="nutrisathi-tests-")
+    atexit.register(shutil.rmtree, _test_db_dir, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_db_dir, 'app.db')}"
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db import models  # noqa: F401  (registers the tables)
+
+
+class StubServer:
+    """
+    Threaded HTTP/1.1 server answering from a script.
+
+    `responses` maps a path to a list of (status, body, delay_s) answers used
+    in order (the last one repeats). Requests, client connections and peak
+    concurrency are recorded.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append(self.path)
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    script = stub.responses.get(self.path, [(404, {}, 0)])
+                    status, body, delay = script[0] if len(script) == 1 else script.pop(0)
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    payload = json.dumps(body).encode('utf-8')
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """sessionmaker over a fresh SQLite file with all tables"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
@@ -0,0 +1,331 @@
+"""
+Tests for cached, coalesced barcode lookups against a local stub upstream
+(the `stub` fixture in conftest.py), including cache expiry on a hand-driven clock.
+
+Run from backend/:  python -m pytest test_barcode_lookup.py
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import models
+from app.services import barcode_lookup
+from app.services.barcode_lookup import BarcodeLookupService
+from app.services.http_client import UpstreamError, UpstreamHTTPClient
+from app.services.openfoodfacts import OpenFoodFactsClient
+
+
+PRODUCT = {
+    "status": 1,
+    "product": {
+        "product_name": "Chatpata Chips",
+        "brands": "Haldiram's",
+        "nutriments": {"energy-kcal_100g": 536, "proteins_100g": 7, "carbohydrates_100g": 53, "fat_100g": 33}
+    }
+}
+
+
+def lookup_concurrently(stub, session_factory, barcode, count, retries=0):
+    """Fire `count` concurrent lookups for one barcode; returns results/exceptions and the service"""
+    http = UpstreamHTTPClient(retries=retries, backoff=0.01)
+    off = OpenFoodFactsClient(http, f"{stub.url}/product/{{barcode}}.json")
+    service = BarcodeLookupService(off.fetch_product, session_factory)
+
+    async def main():
+        await http.start()
+        try:
+            return await asyncio.gather(*(service.lookup(barcode) for _ in range(count)), return_exceptions=True)
+        finally:
+            await http.aclose()
+
+    return asyncio.run(main()), service
+
+
+def test_concurrent_identical_lookups_make_one_upstream_call(stub, session_factory):
+    # Slow enough that every lookup arrives while the first fetch is in flight
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0.3)]
+
+    results, service = lookup_concurrently(stub, session_factory, "8904", 1000)
+
+    assert stub.requests == ["/product/8904.json"]
+    assert all(result == results[0] for result in results)
+    assert results[0]["name"] == "Chatpata Chips"
+    assert results[0]["calories"] == 536
+    assert not service._flights.in_flight("8904")
+
+
+def test_concurrent_lookups_share_an_upstream_failure(stub, session_factory):
+    stub.responses["/product/8904.json"] = [(500, {}, 0.2)]
+
+    results, _ = lookup_concurrently(stub, session_factory, "8904", 1000)
+
+    assert stub.requests == ["/product/8904.json"]
+    assert all(isinstance(result, UpstreamError) for result in results)
+
+
+def test_concurrent_lookups_share_a_not_found_answer(stub, session_factory):
+    stub.responses["/product/0000.json"] = [(200, {"status": 0}, 0.2)]
+
+    results, _ = lookup_concurrently(stub, session_factory, "0000", 1000)
+
+    assert stub.requests == ["/product/0000.json"]
+    assert results == [None] * 1000
+
+
+def test_lookups_after_the_flight_are_served_from_cache(stub, session_factory):
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0)]
+
+    lookup_concurrently(stub, session_factory, "8904", 10)
+    # A new service (fresh memory, e.g. after a restart) still reads the table
+    results, _ = lookup_concurrently(stub, session_factory, "8904", 10)
+
+    assert stub.requests == ["/product/8904.json"]
+    assert results[0]["name"] == "Chatpata Chips"
+
+
+def test_lookup_many_reads_cache_in_bulk_and_bounds_upstream_fetches(stub, session_factory):
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0)]
+    lookup_concurrently(stub, session_factory, "8904", 1)
+    stub.requests.clear()
+    for i in range(20):
+        stub.responses[f"/product/10{i:02d}.json"] = [(200, PRODUCT, 0.05)]
+    stub.responses["/product/0000.json"] = [(200, {"status": 0}, 0)]
+    stub.responses["/product/5000.json"] = [(500, {}, 0)]
+
+    barcodes = ["8904", "8904", "0000", "5000"] + [f"10{i:02d}" for i in range(20)]
+    http = UpstreamHTTPClient(retries=0)
+    off = OpenFoodFactsClient(http, f"{stub.url}/product/{{barcode}}.json")
+    service = BarcodeLookupService(off.fetch_product, session_factory)
+
+    async def main():
+        await http.start()
+        try:
+            return await service.lookup_many(barcodes, concurrency=4)
+        finally:
+            await http.aclose()
+
+    results = asyncio.run(main())
+
+    # The cached barcode is read from the table; each miss is fetched once
+    assert "/product/8904.json" not in stub.requests
+    assert len(stub.requests) == 22
+    assert stub.peak_in_flight <= 4
+    assert results["8904"]["name"] == "Chatpata Chips"
+    assert results["0000"] is None
+    assert isinstance(results["5000"], UpstreamError)
+    assert all(results[f"10{i:02d}"]["barcode"] == f"10{i:02d}" for i in range(20))
+
+
+def test_database_work_runs_off_the_event_loop(session_factory):
+    session_threads = []
+
+    def recording_session_factory():
+        session_threads.append(threading.get_ident())
+        return session_factory()
+
+    async def fetch(barcode):
+        return {"name": f"Product {barcode}"}
+
+    service = BarcodeLookupService(fetch, recording_session_factory)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await service.lookup("8904")
+        await service.lookup_many(["8904", "8905"])
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+
+    # Read and store for 8904, then one bulk read and a store for 8905
+    assert len(session_threads) == 4
+    assert loop_thread not in session_threads
+
+
+def test_local_store_reads_run_off_the_event_loop(session_factory):
+    class RecordingStore:
+        """LocalProductStore stand-in holding one product"""
+
+        def __init__(self):
+            self.threads = []
+
+        def get(self, barcode):
+            return self.get_many([barcode]).get(barcode)
+
+        def get_many(self, barcodes):
+            self.threads.append(threading.get_ident())
+            return {barcode: {"name": "Glucose Biscuit"} for barcode in barcodes if barcode == "8901"}
+
+    async def fetch(barcode):
+        return {"name": f"Product {barcode}"}
+
+    store = RecordingStore()
+    service = BarcodeLookupService(fetch, session_factory, local_store=store)
+
+    async def main():
+        return threading.get_ident(), await service.lookup("8901"), await service.lookup_many(["8901", "8904"])
+
+    loop_thread, single, many = asyncio.run(main())
+
+    assert single == {"name": "Glucose Biscuit"}
+    assert many == {"8901": {"name": "Glucose Biscuit"}, "8904": {"name": "Product 8904"}}
+    assert len(store.threads) == 2
+    assert loop_thread not in store.threads
+
+
+class Clock:
+    """Stands in for get_ist_now in barcode_lookup; advanced by hand"""
+
+    def __init__(self):
+        self.now = datetime(2026, 10, 18, 12, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(barcode_lookup, "get_ist_now", clock)
+    return clock
+
+
+def run_with_service(stub, session_factory, scenario):
+    """Run `scenario(service)` on one event loop against the stub upstream"""
+    http = UpstreamHTTPClient(retries=0)
+    off = OpenFoodFactsClient(http, f"{stub.url}/product/{{barcode}}.json")
+    service = BarcodeLookupService(off.fetch_product, session_factory)
+
+    async def main():
+        await http.start()
+        try:
+            return await scenario(service)
+        finally:
+            await http.aclose()
+
+    return asyncio.run(main())
+
+
+async def settle(service):
+    """Wait for background refreshes to finish"""
+    while service._tasks:
+        await asyncio.gather(*service._tasks)
+
+
+def renamed(name):
+    return {**PRODUCT, "product": {**PRODUCT["product"], "product_name": name}}
+
+
+def stored_expiry(session_factory, barcode):
+    db = session_factory()
+    try:
+        return db.query(models.BarcodeProduct).filter(models.BarcodeProduct.barcode == barcode).one().expires_at
+    finally:
+        db.close()
+
+
+def test_found_products_are_served_for_the_positive_ttl_then_refreshed(stub, session_factory, clock):
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0), (200, renamed("Chatpata Chips v2"), 0)]
+    start = clock.now
+
+    async def scenario(service):
+        first = await service.lookup("8904")
+        clock.advance(days=30, seconds=-1)
+        fresh = await service.lookup("8904")
+        requests_while_fresh = len(stub.requests)
+
+        clock.advance(seconds=1)
+        stale = await service.lookup("8904")
+        await settle(service)
+        refreshed = await service.lookup("8904")
+        return first, fresh, requests_while_fresh, stale, refreshed
+
+    first, fresh, requests_while_fresh, stale, refreshed = run_with_service(stub, session_factory, scenario)
+
+    assert first == fresh
+    assert requests_while_fresh == 1
+    # Expired: the old entry is answered at once and refreshed in the background
+    assert stale["name"] == "Chatpata Chips"
+    assert refreshed["name"] == "Chatpata Chips v2"
+    assert len(stub.requests) == 2
+    assert stored_expiry(session_factory, "8904") == start + timedelta(days=30) + BarcodeLookupService.POSITIVE_TTL
+
+
+def test_unknown_barcodes_are_rechecked_after_the_negative_ttl(stub, session_factory, clock):
+    stub.responses["/product/0000.json"] = [(200, {"status": 0}, 0), (200, PRODUCT, 0)]
+    start = clock.now
+
+    async def scenario(service):
+        unknown = await service.lookup("0000")
+        assert stored_expiry(session_factory, "0000") == start + BarcodeLookupService.NEGATIVE_TTL
+        clock.advance(hours=6, seconds=-1)
+        still_unknown = await service.lookup("0000")
+        requests_while_fresh = len(stub.requests)
+
+        clock.advance(seconds=1)
+        stale = await service.lookup("0000")
+        await settle(service)
+        return unknown, still_unknown, requests_while_fresh, stale, await service.lookup("0000")
+
+    unknown, still_unknown, requests_while_fresh, stale, added = run_with_service(stub, session_factory, scenario)
+
+    assert unknown is still_unknown is stale is None
+    assert requests_while_fresh == 1
+    # The product was added upstream since; the recheck picks it up
+    assert added["name"] == "Chatpata Chips"
+    assert len(stub.requests) == 2
+
+
+def test_stale_entries_do_not_wait_for_the_refresh(stub, session_factory, clock):
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0), (200, renamed("Chatpata Chips v2"), 0.5)]
+
+    async def scenario(service):
+        await service.lookup("8904")
+        clock.advance(days=31)
+        started = time.perf_counter()
+        stale = await asyncio.gather(*(service.lookup("8904") for _ in range(20)))
+        elapsed = time.perf_counter() - started
+        await settle(service)
+        return stale, elapsed
+
+    stale, elapsed = run_with_service(stub, session_factory, scenario)
+
+    assert all(result["name"] == "Chatpata Chips" for result in stale)
+    assert elapsed < 0.4
+    # Twenty stale hits start one refresh between them
+    assert len(stub.requests) == 2
+
+
+def test_failed_refresh_keeps_the_entry_and_backs_off(stub, session_factory, clock):
+    stub.responses["/product/8904.json"] = [(200, PRODUCT, 0), (500, {}, 0), (200, renamed("Chatpata Chips v2"), 0)]
+
+    async def scenario(service):
+        await service.lookup("8904")
+        clock.advance(days=31)
+        during_outage = await service.lookup("8904")
+        await settle(service)
+
+        # Within REFRESH_RETRY the cached entry is served without calling upstream
+        clock.advance(minutes=4)
+        backing_off = await service.lookup("8904")
+        await settle(service)
+        requests_while_backing_off = len(stub.requests)
+
+        clock.advance(minutes=1)
+        await service.lookup("8904")
+        await settle(service)
+        return during_outage, backing_off, requests_while_backing_off, await service.lookup("8904")
+
+    during_outage, backing_off, requests_while_backing_off, recovered = run_with_service(
+        stub, session_factory, scenario
+    )
+
+    assert during_outage["name"] == backing_off["name"] == "Chatpata Chips"
+    assert requests_while_backing_off == 2
+    assert recovered["name"] == "Chatpata Chips v2"
+    assert len(stub.requests) == 3
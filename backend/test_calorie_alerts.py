@@ -0,0 +1,121 @@
+"""
+Tests for high-calorie meal alerts, their catalog swap suggestions and the
+similar-dishes endpoint.
+
+Run from backend/:  python -m pytest test_calorie_alerts.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import models
+from app.services.calorie_alert_service import CalorieAlertService
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.dish_similarity import DishSimilarityIndex
+
+EMAIL = "user@example.com"
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DishSimilarityIndex(load_dishes_from_csv())
+
+
+def alert_service(index, **user):
+    return CalorieAlertService([], {EMAIL: {"daily_calorie_target": 2000, **user}}, similarity_index=index)
+
+
+def test_unrelated_dishes_are_not_offered_as_swaps(index):
+    # Lunch is followed by a 200 kcal snack: no chicken dish fits, and a lean
+    # but unrelated dish (Raita, Idli) must not be offered in its place
+    alert = alert_service(index).check_meal_calories(
+        EMAIL, 1500, "lunch", "Butter Chicken", {"protein": 60, "carbs": 40, "fat": 100}
+    )
+
+    assert alert["suggestion"]["swaps"] == []
+    assert alert["suggestion"]["recommendations"] == alert_service(index)._get_lighter_recommendations("snack", 200)
+
+
+def test_similar_dishes_within_the_next_target_are_offered(index):
+    alert = alert_service(index).check_meal_calories(EMAIL, 1500, "dinner", "Paneer Butter Masala")
+
+    swaps = alert["suggestion"]["swaps"]
+    assert swaps
+    assert all(swap["calories"] <= alert["suggestion"]["next_meal_target"] for swap in swaps)
+    assert all(swap["similarity"] >= DishSimilarityIndex.MIN_SIMILARITY for swap in swaps)
+    assert alert["suggestion"]["recommendations"][0].startswith(f"Swap for {swaps[0]['name']}")
+
+
+def test_dishes_sharing_no_name_token_are_dropped(index):
+    # "Upma" shares no token with any other dish: its macro-only neighbours are not matches
+    assert index.similar("Upma", limit=5, min_similarity=0) == []
+    assert [dish["name"] for dish in index.similar("Dal Tadka", limit=5)] == ["Dal Makhani"]
+
+
+def test_low_scoring_matches_are_dropped(index):
+    unfiltered = index.similar("Paneer Butter Masala", limit=10, min_similarity=0)
+    floored = index.similar("Paneer Butter Masala", limit=10, min_similarity=0.5)
+
+    assert any(dish["similarity"] < 0.5 for dish in unfiltered)
+    assert floored == [dish for dish in unfiltered if dish["similarity"] >= 0.5]
+
+
+def test_swaps_leave_out_the_users_allergens(index):
+    def swaps(**user):
+        alert = alert_service(index, **user).check_meal_calories(EMAIL, 1500, "dinner", "Paneer Butter Masala")
+        return [swap["name"] for swap in alert["suggestion"]["swaps"]]
+
+    assert "Butter Chicken" in swaps()
+    # Allergen classes match tags; other terms fall back to the dish name
+    assert swaps(allergies=["Dairy"]) == ["Chana Masala", "Masala Dosa"]
+    assert swaps(allergies=["dairy", "dosa"]) == ["Chana Masala"]
+    assert swaps(dietary_preference="vegan", allergies=["chana"]) == ["Masala Dosa"]
+
+
+def test_alert_service_is_built_with_the_users_allergies(session_factory):
+    from app import main
+
+    db = session_factory()
+    user = models.User(name="Meera", email=EMAIL, password_hash="-", allergies="dairy, peanuts")
+    db.add(user)
+    db.commit()
+
+    service = main.build_calorie_alert_service(db, user)
+
+    assert service.users_db[EMAIL]["allergies"] == ["dairy", "peanuts"]
+    swaps = service._get_lighter_swaps(EMAIL, "Paneer Butter Masala", None, 500)
+    assert swaps and all("paneer" not in swap["name"].lower() for swap in swaps)
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app import main
+
+    return TestClient(main.app)
+
+
+def test_similar_endpoint_returns_the_closest_dishes(client, index):
+    response = client.get("/dishes/chicken curry/similar", params={"limit": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dish"] == "Chicken Curry"
+    assert body["similar"] == index.similar("Chicken Curry", limit=3)
+    assert [dish["name"] for dish in body["similar"]][:2] == ["Fish Curry", "Egg Curry"]
+
+
+def test_similar_endpoint_applies_the_request_filters(client):
+    def names(**params):
+        response = client.get("/dishes/Chicken Curry/similar", params=params)
+        assert response.status_code == 200
+        return [dish["name"] for dish in response.json()["similar"]]
+
+    assert names(max_calories=300, allergies="Fish, egg") == ["Tandoori Chicken", "Grilled Chicken Breast"]
+    assert names(allergies="fish,egg,dairy,biryani") == [
+        "Tandoori Chicken", "Chicken Sandwich", "Grilled Chicken Breast"
+    ]
+    assert names(dietary_preference="vegetarian") == []
+
+
+def test_similar_endpoint_404s_for_unknown_dishes(client):
+    assert client.get("/dishes/Moon Cheese/similar").status_code == 404
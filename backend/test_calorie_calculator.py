@@ -0,0 +1,70 @@
+"""
+Tests for the calorie calculator: the vectorized batch path must give the
+same results as calculate_daily_calories, profile by profile.
+
+Run from backend/:  python -m pytest test_calorie_calculator.py
+"""
+import random
+
+from app.services.calorie_calculator import CalorieCalculator
+
+GENDERS = ["male", "female", "Male", "F", "other"]
+ACTIVITY_LEVELS = list(CalorieCalculator.ACTIVITY_MULTIPLIERS) + ["unknown", None]
+HEALTH_GOALS = list(CalorieCalculator.HEALTH_GOAL_ADJUSTMENTS) + ["Weight_Loss", "unknown", None]
+
+
+def random_profile(rng):
+    return {
+        "weight": round(rng.uniform(35, 150), rng.choice([0, 1, 2])),
+        "height": round(rng.uniform(140, 205), rng.choice([0, 1])),
+        "age": rng.randint(14, 90),
+        "gender": rng.choice(GENDERS),
+        "activity_level": rng.choice(ACTIVITY_LEVELS),
+        "health_goal": rng.choice(HEALTH_GOALS)
+    }
+
+
+def single(calculator, profile):
+    # Defaults as the single endpoint applies them
+    result = calculator.calculate_daily_calories(
+        profile["weight"], profile["height"], profile["age"], profile["gender"],
+        profile["activity_level"] or "moderately_active",
+        profile["health_goal"] or "maintain_weight"
+    )
+    del result["insights"]
+    return result
+
+
+def test_batch_matches_single_calculation_for_random_profiles():
+    rng = random.Random(38)
+    calculator = CalorieCalculator()
+    profiles = [random_profile(rng) for _ in range(2000)]
+
+    results = calculator.calculate_daily_calories_batch(profiles)
+
+    assert [result["index"] for result in results] == list(range(len(profiles)))
+    for profile, result in zip(profiles, results):
+        expected = single(calculator, profile)
+        assert {key: value for key, value in result.items() if key != "index"} == {
+            **expected,
+            "metadata": {**expected["metadata"], "calculated_at": result["metadata"]["calculated_at"]}
+        }, profile
+
+
+def test_invalid_profiles_get_errors_in_place():
+    rng = random.Random(7)
+    calculator = CalorieCalculator()
+    profiles = [random_profile(rng) for _ in range(8)]
+    profiles[1]["weight"] = None
+    profiles[3]["age"] = "forty"
+    profiles[4]["height"] = -170
+    profiles[6]["gender"] = ""
+
+    results = calculator.calculate_daily_calories_batch(profiles)
+
+    assert results[1] == {"index": 1, "error": "Missing required parameters for BMR calculation"}
+    assert results[3] == {"index": 3, "error": "Invalid age: 'forty'"}
+    assert results[4] == {"index": 4, "error": "Invalid height: -170"}
+    assert results[6] == {"index": 6, "error": "Missing required parameters for BMR calculation"}
+    for i in (0, 2, 5, 7):
+        assert results[i]["daily_calories"] == single(calculator, profiles[i])["daily_calories"]
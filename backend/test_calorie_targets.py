@@ -0,0 +1,122 @@
+"""
+Tests for stored calorie targets: refreshed when calculator inputs change,
+read back instead of recalculated, and backfilled on first read.
+
+Run from backend/:  python -m pytest test_calorie_targets.py
+"""
+import json
+
+import pytest
+
+from app.db import models
+from app.services.calorie_calculator import CalorieCalculator
+from app.services.calorie_targets import CalorieTargetService
+
+PROFILE = {"weight": 70, "height": 172, "age": 30, "gender": "male"}
+
+
+class CountingCalculator(CalorieCalculator):
+    """CalorieCalculator recording how often it is asked for targets"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def calculate_daily_calories(self, **kwargs):
+        self.calls += 1
+        return super().calculate_daily_calories(**kwargs)
+
+
+@pytest.fixture
+def calculator():
+    return CountingCalculator()
+
+
+def make_user(**fields):
+    return models.User(name="Ravi", email="ravi@example.com", password_hash="-", **fields)
+
+
+def test_refresh_stores_the_calculator_output_with_defaults(calculator):
+    user = make_user(**PROFILE)
+
+    targets = CalorieTargetService.refresh(user, calculator)
+
+    expected = CalorieCalculator().calculate_daily_calories(
+        activity_level="moderately_active", health_goal="maintain_weight", **PROFILE
+    )
+    del targets["metadata"]["calculated_at"], expected["metadata"]["calculated_at"]
+    assert targets == expected
+    assert json.loads(user.calorie_targets)["daily_calories"] == user.daily_calorie_target == targets["daily_calories"]
+
+
+@pytest.mark.parametrize("fields", [
+    {**PROFILE, "age": None},
+    {**PROFILE, "weight": 0},
+    {**PROFILE, "gender": ""},
+], ids=["missing age", "zero weight", "blank gender"])
+def test_incomplete_profiles_clear_stored_targets(calculator, fields):
+    user = make_user(**PROFILE)
+    CalorieTargetService.refresh(user, calculator)
+    for field, value in fields.items():
+        setattr(user, field, value)
+
+    assert CalorieTargetService.refresh(user, calculator) is None
+    assert user.calorie_targets is None
+    assert user.daily_calorie_target is None
+
+
+def test_inputs_match_between_rows_and_profile_dicts():
+    user = make_user(**PROFILE)
+
+    assert CalorieTargetService.inputs(user) == CalorieTargetService.inputs(dict(PROFILE))
+    assert CalorieTargetService.inputs(user) != CalorieTargetService.inputs({**PROFILE, "health_goal": "lose_weight"})
+    assert CalorieTargetService.is_complete(PROFILE)
+    assert not CalorieTargetService.is_complete({**PROFILE, "height": None})
+
+
+def test_get_reads_stored_targets_without_recalculating(session_factory, calculator):
+    db = session_factory()
+    user = make_user(**PROFILE)
+    CalorieTargetService.refresh(user, calculator)
+    db.add(user)
+    db.commit()
+
+    first = CalorieTargetService.get(db, user, calculator)
+    second = CalorieTargetService.get(db, user, calculator)
+
+    assert calculator.calls == 1
+    assert first == second == CalorieTargetService.stored(user)
+    db.close()
+
+
+def test_get_backfills_users_created_before_targets_were_stored(session_factory, calculator):
+    db = session_factory()
+    db.add(make_user(**PROFILE))
+    db.commit()
+    db.close()
+
+    db = session_factory()
+    user = db.query(models.User).one()
+    assert CalorieTargetService.stored(user) is None
+
+    targets = CalorieTargetService.get(db, user, calculator)
+    db.close()
+
+    # Saved, so the next session reads it back
+    db = session_factory()
+    user = db.query(models.User).one()
+    assert user.daily_calorie_target == targets["daily_calories"]
+    assert CalorieTargetService.get(db, user, calculator) == targets
+    assert calculator.calls == 1
+    db.close()
+
+
+def test_get_leaves_incomplete_profiles_without_targets(session_factory, calculator):
+    db = session_factory()
+    user = make_user(weight=70)
+    db.add(user)
+    db.commit()
+
+    assert CalorieTargetService.get(db, user, calculator) is None
+    assert calculator.calls == 0
+    db.close()
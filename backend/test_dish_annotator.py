@@ -0,0 +1,71 @@
+"""
+Tests for dish catalog annotation: diet, allergen and category tags, and
+what the catalog endpoint exposes.
+
+Run from backend/:  python -m pytest test_dish_annotator.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.dish_annotator import DishAnnotator
+
+
+@pytest.fixture(scope="module")
+def annotator():
+    return DishAnnotator()
+
+
+def tags(annotator, name, row=None):
+    return annotator.annotate({"name": name}, row)["tags"]
+
+
+def test_diet_follows_the_dish_name(annotator):
+    assert tags(annotator, "Chicken Biryani")["diet"] == DishAnnotator.DIET_NON_VEGETARIAN
+    assert tags(annotator, "Egg Curry")["diet"] == DishAnnotator.DIET_NON_VEGETARIAN
+    assert tags(annotator, "Palak Paneer")["diet"] == DishAnnotator.DIET_VEGETARIAN
+    assert tags(annotator, "Chana Masala")["diet"] == DishAnnotator.DIET_VEGAN
+
+
+def test_allergens_and_categories_are_tagged(annotator):
+    naan = tags(annotator, "Butter Naan")
+    assert {"dairy", "gluten"} <= naan["allergens"]
+    assert "grains" in naan["categories"]
+    assert {"butter", "naan"} <= naan["keywords"]
+    assert tags(annotator, "Prawn Curry")["allergens"] >= {"shellfish"}
+
+
+def test_csv_columns_override_the_heuristics(annotator):
+    row = {"diet": "Non-Veg", "allergens": "Peanuts|sesame", "categories": "dessert", "tags": "comfort"}
+    dish_tags = tags(annotator, "House Special", row)
+
+    assert dish_tags["diet"] == DishAnnotator.DIET_NON_VEGETARIAN
+    assert dish_tags["allergens"] >= {"peanut", "sesame"}
+    assert "dessert" in dish_tags["categories"]
+    assert "comfort" in dish_tags["properties"]
+
+
+def test_filter_dishes_by_diet_and_allergies(annotator):
+    dishes = annotator.annotate_all([
+        {"name": "Chicken Curry"}, {"name": "Palak Paneer"}, {"name": "Chana Masala"},
+        {"name": "Roti"}, {"name": "Mushroom Masala"}
+    ])
+
+    def names(**filters):
+        return [dish["name"] for dish in DishAnnotator.filter_dishes(dishes, **filters)]
+
+    assert names(dietary_preference="vegetarian") == ["Palak Paneer", "Chana Masala", "Roti", "Mushroom Masala"]
+    assert names(dietary_preference="vegan") == ["Chana Masala", "Roti", "Mushroom Masala"]
+    # Known allergens match tags; other terms fall back to the name
+    assert names(allergies=["Wheat", "mushroom"]) == ["Chicken Curry", "Palak Paneer", "Chana Masala"]
+
+
+def test_catalog_endpoint_does_not_expose_tags():
+    from app import main
+
+    response = TestClient(main.app).get("/dishes")
+
+    assert response.status_code == 200
+    dishes = response.json()
+    assert len(dishes) == len(main.dishes_db)
+    assert all(set(dish) <= set(main.DISH_FIELDS) for dish in dishes)
+    assert dishes[0] == {field: main.dishes_db[0][field] for field in main.DISH_FIELDS if field in main.dishes_db[0]}
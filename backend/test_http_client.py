@@ -0,0 +1,146 @@
+"""
+Tests for the shared upstream HTTP client and the OpenFoodFacts client,
+run against a local stub server (the `stub` fixture in conftest.py).
+
+Run from backend/:  python -m pytest test_http_client.py
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.http_client import UpstreamError, UpstreamHTTPClient, UpstreamTimeout
+from app.services.openfoodfacts import OpenFoodFactsClient
+
+
+PRODUCT = {
+    "status": 1,
+    "product": {
+        "product_name": "Masala Oats",
+        "brands": "Saffola",
+        "serving_size": "40g",
+        "nutriments": {"energy-kcal_100g": 372, "proteins_100g": 11, "carbohydrates_100g": 63, "fat_100g": 8}
+    }
+}
+
+
+def run(coro_fn, client):
+    """Run a coroutine function with a started client, closing it afterwards"""
+    async def main():
+        await client.start()
+        try:
+            return await coro_fn()
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_reuses_one_keepalive_connection(stub):
+    stub.responses["/ping"] = [(200, {"ok": True}, 0)]
+    client = UpstreamHTTPClient()
+
+    async def calls():
+        return [(await client.get(f"{stub.url}/ping")).status_code for _ in range(20)]
+
+    assert run(calls, client) == [200] * 20
+    assert len(stub.requests) == 20
+    assert len(stub.connections) == 1
+
+
+def test_retries_with_backoff_until_success(stub):
+    stub.responses["/flaky"] = [(503, {}, 0), (502, {}, 0), (200, {"ok": True}, 0)]
+    client = UpstreamHTTPClient(retries=2, backoff=0.01)
+
+    response = run(lambda: client.get(f"{stub.url}/flaky"), client)
+
+    assert response.status_code == 200
+    assert len(stub.requests) == 3
+
+
+def test_returns_last_error_status_when_retries_run_out(stub):
+    stub.responses["/down"] = [(503, {}, 0)]
+    client = UpstreamHTTPClient(retries=2, backoff=0.01)
+
+    response = run(lambda: client.get(f"{stub.url}/down"), client)
+
+    assert response.status_code == 503
+    assert len(stub.requests) == 3
+
+
+def test_does_not_retry_client_errors(stub):
+    client = UpstreamHTTPClient(retries=2, backoff=0.01)
+
+    response = run(lambda: client.get(f"{stub.url}/missing"), client)
+
+    assert response.status_code == 404
+    assert len(stub.requests) == 1
+
+
+def test_timeouts_are_retried_then_raised(stub):
+    stub.responses["/slow"] = [(200, {}, 0.5)]
+    client = UpstreamHTTPClient(timeout=0.1, retries=1, backoff=0.01)
+
+    with pytest.raises(UpstreamTimeout):
+        run(lambda: client.get(f"{stub.url}/slow"), client)
+    assert len(stub.requests) == 2
+
+
+def test_connection_errors_raise_upstream_error():
+    client = UpstreamHTTPClient(retries=1, backoff=0.01)
+    # Nothing listens on port 9 (discard) locally
+    with pytest.raises(UpstreamError):
+        run(lambda: client.get("http://127.0.0.1:9/"), client)
+
+
+def test_slow_upstream_does_not_block_other_requests(stub):
+    stub.responses["/slow"] = [(200, {}, 0.3)]
+    client = UpstreamHTTPClient()
+
+    async def calls():
+        start = time.perf_counter()
+        await asyncio.gather(*(client.get(f"{stub.url}/slow") for _ in range(5)))
+        return time.perf_counter() - start
+
+    # Five 0.3 s requests overlap instead of taking 1.5 s back to back
+    assert run(calls, client) < 1.0
+
+
+def test_per_host_limit_caps_concurrency(stub):
+    stub.responses["/slow"] = [(200, {}, 0.05)]
+    client = UpstreamHTTPClient(per_host_limit=2)
+
+    async def calls():
+        await asyncio.gather(*(client.get(f"{stub.url}/slow") for _ in range(10)))
+
+    run(calls, client)
+    assert len(stub.requests) == 10
+    assert stub.peak_in_flight <= 2
+
+
+def test_openfoodfacts_client_parses_products_and_unknown_barcodes(stub):
+    stub.responses["/product/8901.json"] = [(200, PRODUCT, 0)]
+    stub.responses["/product/0000.json"] = [(200, {"status": 0}, 0)]
+    client = UpstreamHTTPClient()
+    off = OpenFoodFactsClient(client, f"{stub.url}/product/{{barcode}}.json")
+
+    async def calls():
+        return await off.fetch_product("8901"), await off.fetch_product("0000"), await off.fetch_product("1111")
+
+    found, unknown, missing = run(calls, client)
+
+    assert found == {
+        "name": "Masala Oats", "brand": "Saffola", "serving_size": "40g",
+        "calories": 372, "protein": 11, "carbs": 63, "fat": 8, "barcode": "8901"
+    }
+    assert unknown is None
+    assert missing is None
+
+
+def test_openfoodfacts_client_raises_on_upstream_errors(stub):
+    stub.responses["/product/8901.json"] = [(500, {}, 0)]
+    client = UpstreamHTTPClient(retries=1, backoff=0.01)
+    off = OpenFoodFactsClient(client, f"{stub.url}/product/{{barcode}}.json")
+
+    with pytest.raises(UpstreamError):
+        run(lambda: off.fetch_product("8901"), client)
+    assert len(stub.requests) == 2
@@ -0,0 +1,107 @@
+"""
+Tests for the offline OpenFoodFacts import: JSONL and CSV dumps into a
+temporary product store, read back through LocalProductStore.
+
+Run from backend/:  python -m pytest test_import_openfoodfacts.py
+"""
+import gzip
+import json
+
+from app.jobs.import_openfoodfacts import import_dump, product_row
+from app.services.product_store import LocalProductStore
+
+CHIPS = {
+    "code": "8904",
+    "product_name": "Chatpata Chips",
+    "brands": "Haldiram's",
+    "serving_size": "30g",
+    "nutriments": {"energy-kcal_100g": 536, "proteins_100g": 7, "carbohydrates_100g": 53, "fat_100g": 33, "salt_100g": 1.2}
+}
+BISCUIT = {
+    "code": "8901",
+    "product_name_en": "Glucose Biscuit",
+    "nutriments": {"energy-kcal": "450", "proteins": "6.5", "carbohydrates": 77, "fat": 13}
+}
+
+
+def write_jsonl(path, lines):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def test_product_row_keeps_the_mapped_fields():
+    assert product_row(CHIPS) == ("8904", "Chatpata Chips", "Haldiram's", "30g", 536, 7, 53, 33)
+    assert product_row(BISCUIT) == ("8901", "Glucose Biscuit", "", "100g", 450.0, 6.5, 77, 13)
+    # Without a barcode or any mapped nutriment there is nothing worth storing
+    assert product_row({**CHIPS, "code": "  "}) is None
+    assert product_row({**CHIPS, "nutriments": {"salt_100g": 1}}) is None
+    assert product_row({**CHIPS, "nutriments": {"fat_100g": "n/a", "proteins_100g": "nan"}}) is None
+    assert product_row({**CHIPS, "nutriments": "broken"}) is None
+
+
+def test_jsonl_import_skips_malformed_lines(tmp_path):
+    dump = write_jsonl(tmp_path / "products.jsonl.gz", [
+        json.dumps(CHIPS),
+        "{not json",
+        "",
+        json.dumps({"code": "1111", "product_name": "No Nutrition"}),
+        json.dumps(["not", "a", "product"]),
+        json.dumps(BISCUIT),
+    ])
+    output = tmp_path / "store.sqlite"
+
+    stats = import_dump(dump, output, batch_size=1)
+
+    # The unparseable and blank lines are dropped before they count as records
+    assert (stats["read"], stats["stored"], stats["skipped"]) == (4, 2, 2)
+    assert not (tmp_path / "store.sqlite.importing").exists()
+    store = LocalProductStore(output)
+    assert store.get("8904") == {
+        "name": "Chatpata Chips", "brand": "Haldiram's", "serving_size": "30g",
+        "calories": 536, "protein": 7, "carbs": 53, "fat": 33, "barcode": "8904"
+    }
+    assert store.get("8901")["name"] == "Glucose Biscuit"
+    assert store.get("1111") is None
+
+
+def test_csv_import_reads_tab_separated_exports(tmp_path):
+    header = ["code", "product_name", "brands", "serving_size", "energy-kcal_100g", "proteins_100g",
+              "carbohydrates_100g", "fat_100g", "ingredients_text"]
+    rows = [
+        ["8904", "Chatpata Chips", "Haldiram's", "30g", "536", "7", "53", "33", 'Potato, "masala", oil'],
+        ["", "No Barcode", "", "", "100", "1", "1", "1", ""],
+        ["8902", "Plain Water", "", "", "", "", "", "", ""],
+        ["8903", "Roasted Chana", "", "", "364", "22", "58", "5"],
+    ]
+    dump = tmp_path / "products.csv"
+    dump.write_text("\n".join("\t".join(row) for row in [header] + rows) + "\n", encoding="utf-8")
+    output = tmp_path / "store.sqlite"
+
+    stats = import_dump(dump, output)
+
+    assert (stats["read"], stats["stored"], stats["skipped"]) == (4, 2, 2)
+    products = LocalProductStore(output).get_many(["8904", "8902", "8903"])
+    assert sorted(products) == ["8903", "8904"]
+    assert products["8904"]["calories"] == 536 and products["8904"]["brand"] == "Haldiram's"
+    assert products["8903"] == {
+        "name": "Roasted Chana", "brand": "", "serving_size": "100g",
+        "calories": 364, "protein": 22, "carbs": 58, "fat": 5, "barcode": "8903"
+    }
+
+
+def test_reimport_is_picked_up_by_an_open_store(tmp_path):
+    output = tmp_path / "store.sqlite"
+    store = LocalProductStore(output)
+    assert store.get("8904") is None
+
+    import_dump(write_jsonl(tmp_path / "first.jsonl", [json.dumps(CHIPS)]), output)
+    assert store.get("8904")["calories"] == 536
+
+    # A new dump is swapped in under the running store
+    updated = {**CHIPS, "nutriments": {**CHIPS["nutriments"], "energy-kcal_100g": 520}}
+    import_dump(write_jsonl(tmp_path / "second.jsonl", [json.dumps(updated), json.dumps(BISCUIT)]), output)
+
+    assert store.get("8904")["calories"] == 520
+    assert store.get("8901")["name"] == "Glucose Biscuit"
@@ -0,0 +1,78 @@
+"""
+Tests for the Aho-Corasick keyword matcher: results must equal the
+`keyword in name.lower()` substring checks it replaced.
+
+Run from backend/:  python -m pytest test_keyword_matcher.py
+"""
+import random
+
+import pytest
+
+from app.services.dish_annotator import DishAnnotator
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.mood_recommender import MoodRecommender
+
+
+def substring_matches(keywords, text):
+    return frozenset(keyword.lower() for keyword in keywords if keyword and keyword.lower() in text.lower())
+
+
+@pytest.fixture(scope="module")
+def dishes():
+    return load_dishes_from_csv()
+
+
+def test_overlapping_keywords_match_like_substring_checks():
+    # Shared prefixes, suffixes and keywords inside keywords exercise the failure links
+    keywords = ["he", "she", "his", "hers", "a", "aa", "aaa", "ab", "bab", "Mixed Veg", "veg", ""]
+    rng = random.Random(27)
+    matcher = KeywordMatcher(keywords)
+
+    texts = ["", "ushers", "aaaa", "ababab", "MIXED VEGetables", "shehishers"]
+    texts += ["".join(rng.choice("abehirsv ") for _ in range(rng.randint(0, 30))) for _ in range(2000)]
+    for text in texts:
+        assert matcher.find_all(text) == substring_matches(keywords, text), text
+
+
+def test_catalog_names_match_like_substring_checks(dishes):
+    annotator = DishAnnotator()
+    extra = ["Chicken Tikka Masala", "Paneer Butter Masala with Jeera Rice", "Egg-less Cake", "Fish & Chips"]
+
+    for name in [dish["name"] for dish in dishes] + extra:
+        assert annotator.matcher.find_all(name) == substring_matches(annotator.vocabulary, name), name
+
+
+def old_keyword_delta(mood, keywords):
+    """The per-table keyword scoring loops MoodRecommender used before the matcher"""
+    profile = MoodRecommender.MOOD_NUTRIENT_PROFILE[mood]
+    delta = 0.0
+    for keyword_category in profile.get("properties", []):
+        for keyword in MoodRecommender.FOOD_KEYWORDS.get(keyword_category, []):
+            if keyword in keywords:
+                delta += 0.1
+    for avoid_keyword in profile.get("avoid", []):
+        if avoid_keyword.replace("_", " ") in keywords:
+            delta -= 0.3
+    food_cats = MoodRecommender.MOOD_FOOD_CATEGORIES.get(mood, {})
+    for pref_cat in food_cats.get("preferred", []):
+        if pref_cat.lower() in keywords:
+            delta += 0.2
+    for avoid_cat in food_cats.get("avoid", []):
+        if avoid_cat.lower() in keywords:
+            delta -= 0.4
+    return delta
+
+
+def test_mood_scores_equal_the_table_by_table_rules(dishes):
+    recommender = MoodRecommender(dishes)
+    vocabulary = DishAnnotator().vocabulary
+
+    for dish in recommender.dishes:
+        keywords = substring_matches(vocabulary, dish["name"])
+        # Macro part alone: the same dish with no keyword hits
+        bare = {**dish, "tags": {**dish["tags"], "keywords": frozenset()}}
+        for mood, profile in MoodRecommender.MOOD_NUTRIENT_PROFILE.items():
+            base = recommender._score_dish_for_mood(bare, mood, profile)
+            expected = max(0, min(1, round(base + old_keyword_delta(mood, keywords), 6)))
+            assert recommender._score_dish_for_mood(dish, mood, profile) == pytest.approx(expected), (dish["name"], mood)
@@ -0,0 +1,97 @@
+"""
+Tests for day and weekly meal plans: variety rules across meals and days.
+
+Run from backend/:  python -m pytest test_meal_planner.py
+"""
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from app.services.calorie_calculator import CalorieCalculator
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.meal_planner import MealPlanner
+from app.services.thali_composer import ThaliComposer
+from app.services.thali_recommender import ThaliRecommender
+
+PROFILE = {"weight": 70, "height": 172, "age": 30, "gender": "male"}
+START = date(2026, 10, 19)
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return MealPlanner(ThaliRecommender(load_dishes_from_csv()), CalorieCalculator())
+
+
+def dish_days(plan):
+    """Dish name -> day index of every use"""
+    days = {}
+    for day_index, day in enumerate(plan["plan"]):
+        for meal in day["meals"].values():
+            for item in meal["recommended_items"]:
+                days.setdefault(item["name"], []).append(day_index)
+    return days
+
+
+def assert_complete_meals(plan):
+    """Every required slot filled and no meal well below its calorie goal"""
+    for day in plan["plan"]:
+        for meal_type, meal in day["meals"].items():
+            required = {
+                slot["category"] for slot in ThaliComposer.MEAL_LAYOUTS[meal_type]["slots"] if not slot.get("optional")
+            }
+            assert required <= {item["category"] for item in meal["recommended_items"]}, (day["date"], meal_type)
+            assert meal["total_calories"] >= meal["calorie_goal"] * (1 - ThaliComposer.CALORIE_TOLERANCE), \
+                (day["date"], meal_type)
+
+
+def test_weekly_plan_obeys_the_variety_rules():
+    # Every dish twice under another name: enough variety for a week under the cross-day rules
+    dishes = load_dishes_from_csv()
+    dishes += [{**dish, "name": f"{dish['name']} (home style)"} for dish in dishes]
+    planner = MealPlanner(ThaliRecommender(dishes), CalorieCalculator())
+
+    plan = planner.generate_plan(**PROFILE, days=7, start_date=START)
+
+    assert_complete_meals(plan)
+    for name, days in dish_days(plan).items():
+        assert len(days) <= MealPlanner.MAX_USES_PER_PLAN, name
+        assert all(later - earlier >= MealPlanner.REPEAT_GAP_DAYS for earlier, later in zip(days, days[1:])), name
+
+
+@pytest.mark.parametrize("diet", [None, "vegetarian", "vegan"])
+def test_rules_relax_to_same_day_uniqueness_on_small_menus(planner, diet):
+    # Too few dishes for a week under the cross-day rules: dishes repeat across
+    # days rather than leaving slots empty, and never within a day
+    plan = planner.generate_plan(**PROFILE, dietary_preference=diet, days=7, start_date=START)
+
+    assert_complete_meals(plan)
+    for day in plan["plan"]:
+        names = [item["name"] for meal in day["meals"].values() for item in meal["recommended_items"]]
+        assert len(names) == len(set(names)), day["date"]
+
+
+def test_plan_shape_and_totals(planner):
+    plan = planner.generate_plan(**PROFILE, health_goal="weight_loss", days=7, start_date=START)
+    targets = CalorieCalculator().calculate_daily_calories(**PROFILE, health_goal="weight_loss")
+
+    assert plan["daily_calories"] == targets["daily_calories"]
+    assert plan["meal_calories"] == targets["meal_calories"]
+    assert [day["date"] for day in plan["plan"]] == [f"2026-10-{19 + i}" for i in range(7)]
+    for day in plan["plan"]:
+        assert list(day["meals"]) == MealPlanner.MEAL_ORDER
+        assert day["total_calories"] == sum(meal["total_calories"] for meal in day["meals"].values())
+        assert day["total_protein"] == sum(meal["total_protein"] for meal in day["meals"].values())
+    uses = Counter(name for name, days in dish_days(plan).items() for _ in days)
+    assert plan["variety"] == {"unique_dishes": len(uses), "total_items": sum(uses.values())}
+
+
+def test_stored_targets_are_used_as_given(planner):
+    targets = CalorieCalculator().calculate_daily_calories(**PROFILE)
+    targets["meal_calories"] = {"breakfast": 300, "lunch": 500, "evening_snack": 150, "dinner": 450}
+
+    plan = planner.generate_plan(**PROFILE, days=1, start_date=START, targets=targets)
+
+    assert plan["meal_calories"] == targets["meal_calories"]
+    assert {meal_type: meal["calorie_goal"] for meal_type, meal in plan["plan"][0]["meals"].items()} == \
+        targets["meal_calories"]
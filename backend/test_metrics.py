@@ -0,0 +1,158 @@
+"""
+Tests for request metrics: route-template labels, histogram buckets, status
+counters and pool gauges, read back from the Prometheus exposition output.
+
+Run from backend/:  python -m pytest test_metrics.py
+"""
+import re
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.services.metrics import Histogram, MetricsMiddleware, MetricsRegistry, pool_collector
+
+SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(exposition):
+    """Exposition text -> {(metric name, frozenset of label pairs): value}"""
+    samples = {}
+    for line in exposition.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        labels = frozenset(LABEL.findall(match.group("labels") or ""))
+        samples[(match.group("name"), labels)] = float(match.group("value"))
+    return samples
+
+
+def sample(samples, name, **labels):
+    return samples.get((name, frozenset(labels.items())))
+
+
+def metered_app():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/foods/barcode/{barcode}")
+    async def barcode(barcode: str):
+        if barcode == "0000":
+            raise HTTPException(status_code=404, detail="Product not found")
+        return {"barcode": barcode, "in_flight": registry.in_flight}
+
+    return TestClient(app), registry
+
+
+def test_requests_are_labelled_by_route_template_and_status():
+    client, registry = metered_app()
+    for barcode in ("8904", "8901", "8904", "0000"):
+        client.get(f"/foods/barcode/{barcode}")
+    client.get("/no/such/route")
+
+    samples = parse(registry.render())
+    route = "/foods/barcode/{barcode}"
+
+    assert sample(samples, "http_requests_total", method="GET", route=route, status="200") == 3
+    assert sample(samples, "http_requests_total", method="GET", route=route, status="404") == 1
+    assert sample(samples, "http_requests_total", method="GET", route="unmatched", status="404") == 1
+    assert sample(samples, "http_request_duration_seconds_count", method="GET", route=route) == 4
+    # Raw paths never become labels
+    assert not any("8904" in value for _, labels in samples for _, value in labels)
+    assert sample(samples, "http_requests_in_flight") == 0
+
+
+def test_in_flight_counts_the_request_being_served():
+    client, _ = metered_app()
+
+    assert client.get("/foods/barcode/8904").json()["in_flight"] == 1
+
+
+def test_response_sizes_are_recorded_per_route():
+    client, registry = metered_app()
+    sizes = [len(client.get(f"/foods/barcode/{barcode}").content) for barcode in ("1", "12345678901234")]
+
+    samples = parse(registry.render())
+    labels = {"method": "GET", "route": "/foods/barcode/{barcode}"}
+
+    assert sample(samples, "http_response_size_bytes_sum", **labels) == sum(sizes)
+    assert sample(samples, "http_response_size_bytes_bucket", le="100", **labels) == 2
+
+
+def test_histogram_buckets_are_cumulative_with_inclusive_bounds():
+    registry = MetricsRegistry()
+    # Upper bounds are inclusive (le): 0.005 lands in the first bucket
+    for seconds in (0.001, 0.005, 0.0051, 0.3, 0.3, 20.0):
+        registry.observe("GET", "/x", 200, seconds, 10)
+
+    samples = parse(registry.render())
+
+    def bucket(le):
+        return sample(samples, "http_request_duration_seconds_bucket", method="GET", route="/x", le=le)
+
+    assert [bucket(le) for le in ("0.005", "0.01", "0.25", "0.5", "10.0", "+Inf")] == [2, 3, 3, 5, 5, 6]
+    assert sample(samples, "http_request_duration_seconds_count", method="GET", route="/x") == 6
+    assert sample(samples, "http_request_duration_seconds_sum", method="GET", route="/x") == pytest.approx(20.6111)
+
+
+def test_histogram_snapshot_counts_per_bucket():
+    histogram = Histogram((1, 5, 10))
+    for value in (0, 1, 2, 5, 11, 100):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == ([2, 2, 0, 2], 119, 6)
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe("GET", 'a"b\\c', 200, 0.01, 1)
+
+    assert 'route="a\\"b\\\\c"' in registry.render()
+
+
+def test_pool_gauges_track_checked_out_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3)
+    collect = pool_collector(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        busy = parse("\n".join(collect()))
+    idle = parse("\n".join(collect()))
+
+    assert sample(busy, "db_pool_size") == 3
+    assert sample(busy, "db_pool_checked_out") == 1
+    assert sample(idle, "db_pool_checked_out") == 0
+    assert sample(idle, "db_pool_checked_in") == 1
+    engine.dispose()
+
+
+def test_pools_without_gauges_are_skipped():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    assert pool_collector(engine)() == []
+    engine.dispose()
+
+
+def test_metrics_endpoint_reports_app_routes_by_template():
+    from app import main
+
+    client = TestClient(main.app)
+    assert client.get("/dishes/Chicken Curry/similar").status_code == 200
+    before = parse(client.get("/metrics").text)
+    client.get("/dishes/Palak Paneer/similar")
+    client.get("/dishes/Moon Cheese/similar")
+
+    response = client.get("/metrics")
+    samples = parse(response.text)
+    route = "/dishes/{name}/similar"
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert sample(samples, "http_requests_total", method="GET", route=route, status="200") == \
+        sample(before, "http_requests_total", method="GET", route=route, status="200") + 1
+    assert sample(samples, "http_requests_total", method="GET", route=route, status="404") >= 1
+    assert sample(samples, "db_pool_checked_out") is not None
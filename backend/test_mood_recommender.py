@@ -0,0 +1,134 @@
+"""
+Tests for mood recommendations: precomputed per-mood scores and rankings,
+request filters and diversity selection.
+
+Run from backend/:  python -m pytest test_mood_recommender.py
+"""
+import copy
+
+import pytest
+
+from app.services.dish_annotator import DishAnnotator
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+
+MOODS = list(MoodRecommender.MOOD_NUTRIENT_PROFILE)
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    return MoodRecommender(load_dishes_from_csv())
+
+
+def test_precomputed_scores_match_scoring_each_dish(recommender):
+    for mood, profile in MoodRecommender.MOOD_NUTRIENT_PROFILE.items():
+        scores = recommender.mood_scores[mood]
+        assert scores == [recommender._score_dish_for_mood(dish, mood, profile) for dish in recommender.dishes]
+
+        # Best first; equal scores keep catalog order
+        ranking = recommender.mood_rankings[mood]
+        assert sorted(ranking) == list(range(len(recommender.dishes)))
+        assert all(
+            (scores[a], -a) > (scores[b], -b) for a, b in zip(ranking, ranking[1:])
+        )
+        assert recommender.mood_candidate_counts[mood] == sum(score >= 0.4 for score in scores)
+
+        buckets = recommender.categorized_dishes[mood]
+        assert len(buckets["preferred"]) == sum(score >= 0.7 for score in scores)
+        assert len(buckets["avoid"]) == sum(score < 0.4 for score in scores)
+
+
+def test_catalog_dishes_are_not_modified():
+    dishes = load_dishes_from_csv()
+    before = copy.deepcopy(dishes)
+
+    recommender = MoodRecommender(dishes)
+    for mood in MOODS:
+        recommender.recommend_by_mood(mood)
+
+    assert dishes == before
+
+
+@pytest.mark.parametrize("mood", MOODS)
+def test_recommendations_respect_the_request_filters(recommender, mood):
+    result = recommender.recommend_by_mood(
+        mood, calorie_range=(150, 400), dietary_preference="vegetarian", allergies=["dairy"], num_recommendations=4
+    )
+
+    dishes = {dish["name"]: dish for dish in recommender.dishes}
+    names = [dish["name"] for dish in result["recommended_dishes"]]
+    assert 0 < len(names) <= 4
+    assert len(set(names)) == len(names)
+    for name in names:
+        assert 150 <= dishes[name]["calories"] <= 400
+        assert dishes[name]["tags"]["diet"] in DishAnnotator.allowed_diets("vegetarian")
+        assert "dairy" not in dishes[name]["tags"]["allergens"]
+    assert result["total_calories"] == round(sum(dish["calories"] for dish in result["recommended_dishes"]), 1)
+
+
+def test_only_low_scoring_dishes_left_still_get_recommended():
+    recommender = MoodRecommender([
+        {"name": "Deep Fried Cream Pakora", "calories": 450, "protein": 5, "carbs": 20, "fat": 40},
+        {"name": "Ginger Vegetable Soup", "calories": 120, "protein": 5, "carbs": 15, "fat": 4}
+    ])
+    assert recommender.mood_scores["sick"][0] < 0.4
+
+    # Only the avoided dish is in range: the full ranking is used rather than nothing
+    result = recommender.recommend_by_mood("sick", calorie_range=(300, 500))
+
+    assert [dish["name"] for dish in result["recommended_dishes"]] == ["Deep Fried Cream Pakora"]
+
+
+def test_unknown_mood_is_rejected(recommender):
+    with pytest.raises(ValueError):
+        recommender.recommend_by_mood("hangry")
+
+
+def dish(name, protein, carbs, fat):
+    return {"name": name, "calories": protein * 4 + carbs * 4 + fat * 9, "protein": protein, "carbs": carbs, "fat": fat}
+
+
+def test_selection_trades_relevance_for_diversity(recommender, monkeypatch):
+    # Two near-identical top dishes and a slightly lower, different one
+    scored = [
+        (0.90, dish("Paneer Tikka", 20, 5, 15)),
+        (0.89, dish("Paneer Bhurji", 19, 6, 15)),
+        (0.80, dish("Jeera Rice", 4, 45, 3)),
+    ]
+
+    picked = [d["name"] for d in recommender._select_diverse_dishes(iter(scored), 2)]
+
+    assert picked == ["Paneer Tikka", "Jeera Rice"]
+    # Without the penalty the selection is the plain ranking
+    monkeypatch.setattr(MoodRecommender, "DIVERSITY_PENALTY", 0)
+    picked = [d["name"] for d in recommender._select_diverse_dishes(iter(scored), 2)]
+    assert picked == ["Paneer Tikka", "Paneer Bhurji"]
+
+
+def test_pool_caps_each_name_category_and_stops_early(recommender):
+    consumed = []
+
+    def ranked():
+        for i in range(1000):
+            consumed.append(i)
+            # Every other dish shares the "dal" category
+            name = f"Dal {i}" if i % 2 == 0 else f"Dish{i} Curry"
+            yield 1 - i / 1000, dish(name, 10 + i % 7, 30 + i % 11, 5 + i % 5)
+
+    picked = recommender._select_diverse_dishes(ranked(), 3)
+
+    assert len(picked) == 3
+    # The pool takes 3 "dal" dishes and fills the rest with the others, then
+    # stops reading the ranking
+    others = 3 * MoodRecommender.DIVERSITY_POOL_FACTOR - 3
+    assert len(consumed) == 2 * others
+    assert sum(d["name"].startswith("Dal ") for d in picked) <= 3
+    assert recommender._select_diverse_dishes(ranked(), 0) == []
+
+
+def test_mood_results_are_varied_on_the_catalog(recommender):
+    for mood in MOODS:
+        names = [d["name"] for d in recommender.recommend_by_mood(mood, num_recommendations=4)["recommended_dishes"]]
+        categories = [name.lower().split()[0] for name in names]
+        assert len(names) == 4
+        assert len(set(categories)) > 1, (mood, names)
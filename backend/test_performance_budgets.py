@@ -0,0 +1,176 @@
+"""
+Query-count and latency budgets for the main API routes, run in-process
+(FastAPI TestClient) against a temporary SQLite file seeded with synthetic
+users and meals. No server needed.
+
+A route that starts issuing more SQL statements than its budget (an N+1
+loop, a missed eager load, a history scan) or gets much slower fails here
+before deploy. Raise a budget deliberately, in the same change that makes
+the route do more work.
+
+Run from backend/:  python -m pytest test_performance_budgets.py
+"""
+import secrets
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.db import models
+from app.db.base import Base
+from app.db.models import get_ist_now
+from app.db.session import get_db
+from app.services.calorie_targets import CalorieTargetService
+
+PASSWORD = "budget-pass-123"
+USERS = 50
+MEALS_PER_USER = 40
+# The measured user has a long history, so per-meal queries would show up
+HISTORY_MEALS = 400
+MEAL_NAMES = ("Dal Tadka", "Jeera Rice", "Paneer Butter Masala", "Masala Dosa", "Poha", "Chole", "Roti", "Idli")
+MEAL_TYPES = ("breakfast", "lunch", "evening_snack", "dinner")
+
+PROFILE = {"weight": 70, "height": 172, "age": 30, "gender": "male"}
+
+# (method, path, JSON body, authenticated, max SQL statements, max seconds)
+# Statement budgets are the current counts (authentication alone costs 3:
+# session, user, user dict). Latency budgets leave headroom for slow CI boxes;
+# login is dominated by bcrypt.
+BUDGETS = [
+    ("POST", "/auth/login", {"email": "user0@example.com", "password": PASSWORD}, False, 3, 2.0),
+    ("POST", "/meals", {"name": "Dal Tadka", "serving_size": 1, "calories": 350, "protein": 12,
+                        "carbs": 40, "fat": 10, "meal_type": "lunch"}, True, 9, 0.25),
+    ("GET", "/meals", None, True, 4, 0.25),
+    ("GET", "/gamification/stats", None, True, 4, 0.25),
+    ("POST", "/ai/calculate-calories", PROFILE, False, 0, 0.1),
+    ("POST", "/ai/calculate-calories", PROFILE, True, 4, 0.1),
+    ("POST", "/ai/calculate-calories/batch", {"profiles": [PROFILE] * 1000}, False, 0, 0.25),
+    ("POST", "/ai/recommend-thali", {"meal_type": "lunch", "calorie_goal": 600}, True, 5, 0.25),
+    ("POST", "/ai/recommend-mood", {"mood": "happy"}, True, 5, 0.25),
+    ("POST", "/ai/meal-plan", {"days": 7}, True, 4, 0.5),
+    ("GET", "/ai/thali-info", None, False, 0, 0.1),
+    ("GET", "/ai/calorie-info", None, False, 0, 0.1),
+]
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """TestClient on the app with get_db pointed at a seeded temporary database"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path_factory.mktemp('budgets') / 'budgets.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    token = seed(session_factory)
+
+    statements = []
+    event.listen(engine, "after_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = get_test_db
+    try:
+        yield Api(TestClient(main.app), token, statements)
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+class Api:
+    def __init__(self, client, token, statements):
+        self.client = client
+        self.token = token
+        self.statements = statements
+
+    def measure(self, method, path, body=None, authenticated=False):
+        """Call a route with caches cleared; returns (response, statements, seconds)"""
+        main.recommendation_cache.clear()
+        main.meal_plan_cache.clear()
+        headers = {"Authorization": f"Bearer {self.token}"} if authenticated else {}
+        self.statements.clear()
+        start = time.perf_counter()
+        response = self.client.request(method, path, json=body, headers=headers)
+        elapsed = time.perf_counter() - start
+        return response, list(self.statements), elapsed
+
+
+def seed(session_factory):
+    """Users with meal histories and calorie targets; returns a session token for user0"""
+    now = get_ist_now()
+    password_hash = main.hash_password(PASSWORD)
+    db = session_factory()
+    try:
+        users = []
+        for i in range(USERS):
+            user = models.User(
+                name=f"User {i}",
+                email=f"user{i}@example.com",
+                password_hash=password_hash,
+                gender="male" if i % 2 else "female",
+                age=22 + i % 40,
+                height=155 + i % 30,
+                weight=50 + i % 45,
+                activity_level="moderately_active",
+                dietary_preference="vegetarian" if i % 3 == 0 else None,
+                health_goal="maintain_weight"
+            )
+            CalorieTargetService.refresh(user, main.calorie_calculator)
+            users.append(user)
+        db.add_all(users)
+        db.flush()
+
+        meals = []
+        for user in users:
+            count = HISTORY_MEALS if user is users[0] else MEALS_PER_USER
+            for j in range(count):
+                name = MEAL_NAMES[j % len(MEAL_NAMES)]
+                meals.append(models.Meal(
+                    user_id=user.id,
+                    name=name,
+                    serving_size=1,
+                    unit="serving",
+                    calories=150 + (j * 37) % 450,
+                    protein=5 + j % 20,
+                    carbs=20 + j % 50,
+                    fat=3 + j % 15,
+                    meal_type=MEAL_TYPES[j % len(MEAL_TYPES)],
+                    timestamp=now - timedelta(hours=6 * j)
+                ))
+        db.add_all(meals)
+
+        token = secrets.token_urlsafe(32)
+        db.add(models.Session(user_id=users[0].id, token=token, expires_at=now + timedelta(days=7)))
+        db.commit()
+        return token
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "method, path, body, authenticated, max_statements, max_seconds",
+    BUDGETS,
+    ids=[f"{method} {path}{' (auth)' if auth else ''}" for method, path, _, auth, _, _ in BUDGETS]
+)
+def test_route_stays_within_budget(api, method, path, body, authenticated, max_statements, max_seconds):
+    # Warm-up call: one-time work (first-write vector build, lazy imports) is not what the budget covers
+    api.measure(method, path, body, authenticated)
+
+    response, statements, elapsed = api.measure(method, path, body, authenticated)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) <= max_statements, (
+        f"{method} {path} ran {len(statements)} SQL statements (budget {max_statements}):\n"
+        + "\n".join(statements)
+    )
+    assert elapsed <= max_seconds, f"{method} {path} took {elapsed:.3f}s (budget {max_seconds}s)"
+
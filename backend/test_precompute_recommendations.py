@@ -0,0 +1,92 @@
+"""
+Tests for the nightly recommendation precompute job against a temporary database.
+
+Run from backend/:  python -m pytest test_precompute_recommendations.py
+"""
+import random
+from datetime import date
+
+from app.db import models
+from app.jobs.precompute_recommendations import run_precompute
+from app.services.cache import stable_seed
+from app.services.mood_recommender import MoodRecommender
+from app.services.recommendation_pool import worker_state
+from app.services.recommendation_store import RecommendationStore
+
+DAY = date(2026, 10, 18)
+
+
+def add_users(session_factory):
+    db = session_factory()
+    try:
+        complete = models.User(
+            name="Complete", email="complete@example.com", password_hash="-", gender="female", age=31,
+            height=162, weight=58, activity_level="lightly_active", dietary_preference="vegetarian",
+            health_goal="weight_loss", allergies="peanut, dairy"
+        )
+        partial = models.User(name="Partial", email="partial@example.com", password_hash="-", age=40)
+        db.add_all([complete, partial])
+        db.flush()
+        # A row from an earlier day, which the run purges
+        db.add(models.PrecomputedRecommendation(
+            user_id=complete.id, plan_date="2026-10-17", kind="mood",
+            request_key="stale", catalog_version="old", payload="{}"
+        ))
+        db.commit()
+        return complete.id, partial.id
+    finally:
+        db.close()
+
+
+def test_one_chunk_is_computed_and_stored_under_the_endpoint_keys(session_factory):
+    complete_id, partial_id = add_users(session_factory)
+
+    stats = run_precompute(day=DAY, workers=1, chunk_size=10, session_factory=session_factory)
+
+    moods = list(MoodRecommender.MOOD_NUTRIENT_PROFILE)
+    thalis = RecommendationStore.THALI_MEAL_TYPES
+    # Thalis need a complete profile; everyone gets the mood suggestions
+    assert stats["users"] == 2
+    assert stats["rows"] == len(thalis) + 2 * len(moods)
+    assert stats["purged"] == 1
+
+    state = worker_state()
+    version = state["version"]
+    day = DAY.isoformat()
+    allergies = ["peanut", "dairy"]
+    db = session_factory()
+    try:
+        rows = db.query(models.PrecomputedRecommendation).all()
+        assert {row.plan_date for row in rows} == {day}
+        assert {row.catalog_version for row in rows} == {version}
+        assert sum(row.user_id == partial_id for row in rows) == len(moods)
+
+        # The lunch thali is found under the key /ai/recommend-thali builds, and is
+        # exactly what live computation seeded from that key returns
+        targets = state["calculator"].calculate_daily_calories(58, 162, 31, "female", "lightly_active", "weight_loss")
+        key = RecommendationStore.thali_key(
+            complete_id, day, "lunch", targets["meal_calories"]["lunch"], "vegetarian", "weight_loss",
+            allergies, RecommendationStore.DEFAULT_NUM_ALTERNATIVES
+        )
+        stored = RecommendationStore.get(db, key, version)
+        live = state["thali"].recommend_thali(
+            meal_type="lunch", calorie_goal=targets["meal_calories"]["lunch"], dietary_preference="vegetarian",
+            health_goal="weight_loss", allergies=allergies,
+            num_alternatives=RecommendationStore.DEFAULT_NUM_ALTERNATIVES,
+            rng=random.Random(stable_seed(version, *key))
+        )
+        assert stored is not None
+        assert stored["recommended_items"]
+        assert [item["name"] for item in stored["recommended_items"]] == [item["name"] for item in live["recommended_items"]]
+
+        for user_id, preference, user_allergies in ((complete_id, "vegetarian", allergies), (partial_id, None, None)):
+            for mood in moods:
+                key = RecommendationStore.mood_key(
+                    user_id, day, mood, RecommendationStore.DEFAULT_CALORIE_RANGE, preference, user_allergies,
+                    RecommendationStore.DEFAULT_NUM_RECOMMENDATIONS
+                )
+                assert RecommendationStore.get(db, key, version)["mood"] == mood
+        # Rows from another catalog are not served
+        assert RecommendationStore.get(db, key, "other-version") is None
+    finally:
+        db.close()
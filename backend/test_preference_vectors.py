@@ -0,0 +1,115 @@
+"""
+Tests for per-user preference vectors: incremental updates on meal writes
+and their effect on mood recommendation ranking.
+
+Run from backend/:  python -m pytest test_preference_vectors.py
+"""
+import json
+
+import pytest
+
+from app.db import models
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+from app.services.preference_vectors import PreferenceVectorService
+
+DISHES = load_dishes_from_csv()
+CUISINES = PreferenceVectorService.cuisine_index(DISHES)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    user = models.User(name="Asha", email="asha@example.com", password_hash="-")
+    session.add(user)
+    session.commit()
+    yield session, user.id
+    session.close()
+
+
+def log_meal(session, user_id, name, protein, carbs, fat):
+    """Add a meal the way POST /meals does: vector update, then commit"""
+    meal = models.Meal(user_id=user_id, name=name, serving_size=1, protein=protein, carbs=carbs, fat=fat)
+    session.add(meal)
+    vector = PreferenceVectorService.record_meal(session, user_id, meal, CUISINES)
+    session.commit()
+    return meal, vector
+
+
+def vector_state(vector):
+    return (
+        vector.meal_count, json.loads(vector.token_counts), json.loads(vector.cuisine_counts),
+        round(vector.protein_total, 6), round(vector.carbs_total, 6), round(vector.fat_total, 6)
+    )
+
+
+def test_incremental_updates_match_a_rebuild_from_history(db):
+    session, user_id = db
+    log_meal(session, user_id, "Paneer Tikka", 22, 8, 24)
+    log_meal(session, user_id, "Palak Paneer", 16, 12, 18)
+    meal, _ = log_meal(session, user_id, "Chicken Curry", 28, 10, 18)
+    _, vector = log_meal(session, user_id, "Masala Dosa", 7, 45, 8)
+
+    # Deleting a meal subtracts it again
+    PreferenceVectorService.record_meal(session, user_id, meal, CUISINES, sign=-1)
+    session.delete(meal)
+    session.commit()
+    incremental = vector_state(vector)
+    version = vector.version
+
+    rebuilt = PreferenceVectorService.rebuild(session, user_id, CUISINES)
+
+    assert vector_state(rebuilt) == incremental
+    assert incremental[1] == {"paneer": 2, "tikka": 1, "palak": 1, "masala": 1, "dosa": 1}
+    assert rebuilt.version == version + 1
+
+
+def test_first_write_builds_the_vector_from_existing_history(db):
+    session, user_id = db
+    # History logged before personalization existed (no vector row)
+    session.add(models.Meal(user_id=user_id, name="Dal Tadka", serving_size=1, protein=12, carbs=26, fat=8))
+    session.commit()
+
+    _, vector = log_meal(session, user_id, "Dal Makhani", 14, 28, 16)
+
+    assert vector.meal_count == 2
+    assert json.loads(vector.token_counts) == {"dal": 2, "tadka": 1, "makhani": 1}
+
+
+def test_profile_and_affinity(db):
+    session, user_id = db
+    assert PreferenceVectorService.profile(None) is None
+
+    _, vector = log_meal(session, user_id, "Paneer Tikka", 22, 8, 24)
+    profile = PreferenceVectorService.profile(vector)
+
+    assert profile["version"] == vector.version
+    assert profile["tokens"] == {"paneer": 1.0, "tikka": 1.0}
+    for dish in DISHES:
+        affinity = PreferenceVectorService.affinity(profile, dish, MoodRecommender._macro_vector(dish))
+        assert 0 <= affinity <= 1 + 1e-9
+    paneer = next(d for d in DISHES if d["name"] == "Paneer Tikka")
+    rice = next(d for d in DISHES if d["name"] == "Rice (White Cooked)")
+    assert PreferenceVectorService.affinity(profile, paneer, MoodRecommender._macro_vector(paneer)) > \
+        PreferenceVectorService.affinity(profile, rice, MoodRecommender._macro_vector(rice))
+
+
+def test_logged_meals_move_similar_dishes_up_the_ranking(db):
+    session, user_id = db
+    recommender = MoodRecommender(DISHES)
+
+    def ranked(preferences):
+        result = recommender.recommend_by_mood("stressed", num_recommendations=4, preferences=preferences)
+        return [dish["name"] for dish in result["recommended_dishes"]]
+
+    baseline = ranked(None)
+    for _ in range(5):
+        _, vector = log_meal(session, user_id, "Chicken Biryani", 25, 60, 15)
+    personalized = ranked(PreferenceVectorService.profile(vector))
+
+    def chicken_positions(names):
+        return [i for i, name in enumerate(names) if "chicken" in name.lower()]
+
+    assert personalized != baseline
+    assert personalized[0] == "Biryani (Chicken)"
+    assert sum(chicken_positions(personalized)) < sum(chicken_positions(baseline))
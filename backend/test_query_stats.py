@@ -0,0 +1,90 @@
+"""
+Tests for per-request SQL statement tracking: N+1 and slow-query warnings,
+the debug headers and statements that fail.
+
+Run from backend/:  python -m pytest test_query_stats.py
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db import session
+from app.db.session import N_PLUS_ONE_THRESHOLD, engine, track_queries
+from app.services.metrics import QueryStatsMiddleware
+
+
+def client(debug_headers=False):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, debug_headers=debug_headers)
+
+    @app.get("/items/{count}")
+    async def items(count: int):
+        with engine.connect() as connection:
+            # One lookup per item: the N+1 shape
+            for item_id in range(count):
+                connection.execute(text("SELECT :item_id AS id"), {"item_id": item_id}).fetchall()
+        return {"count": count}
+
+    return TestClient(app)
+
+
+def test_repeated_statement_is_reported_as_n_plus_one(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.services.metrics"):
+        response = client().get(f"/items/{N_PLUS_ONE_THRESHOLD}")
+
+    assert response.status_code == 200
+    warnings = [record for record in caplog.records if record.name == "app.services.metrics"]
+    assert len(warnings) == 1
+    assert warnings[0].levelno == logging.WARNING
+    assert warnings[0].getMessage() == (
+        f"Possible N+1 on GET /items/{{count}}: {N_PLUS_ONE_THRESHOLD}x SELECT ? AS id"
+    )
+
+
+def test_statements_below_the_threshold_are_not_reported(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.services.metrics"):
+        client().get(f"/items/{N_PLUS_ONE_THRESHOLD - 1}")
+
+    assert not [record for record in caplog.records if record.name == "app.services.metrics"]
+
+
+def test_debug_headers_count_the_request_statements():
+    response = client(debug_headers=True).get("/items/3")
+
+    assert response.headers["x-db-query-count"] == "3"
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+    assert "x-db-query-count" not in client().get("/items/3").headers
+
+
+def test_slow_queries_are_logged_with_their_route(caplog, monkeypatch):
+    monkeypatch.setattr(session, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.session"):
+        client().get("/items/1")
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.db.session"]
+    assert len(messages) == 1
+    assert messages[0].startswith("Slow query (")
+    assert messages[0].endswith(" ms) on /items/{count}: SELECT ? AS id")
+
+
+def test_failed_statements_are_timed_and_leave_no_state_behind(caplog, monkeypatch):
+    monkeypatch.setattr(session, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.session"):
+        with engine.connect() as connection, track_queries() as stats:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+            connection.execute(text("SELECT 1")).fetchall()
+            leftover = dict(connection.info)
+
+    assert stats.count == 4
+    assert stats.statements == {"SELECT * FROM no_such_table": 3, "SELECT 1": 1}
+    assert "query_started" not in leftover
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.db.session"]
+    assert [message.rsplit(": ", 1)[1] for message in messages] == ["SELECT * FROM no_such_table"] * 3 + ["SELECT 1"]
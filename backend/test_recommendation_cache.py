@@ -0,0 +1,135 @@
+"""
+Tests for seeded, cached recommendations: stable seeds, the versioned LRU
+cache and the recommendation endpoints serving repeats from it.
+
+Run from backend/:  python -m pytest test_recommendation_cache.py
+"""
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.cache import LRUCache, stable_seed
+from app.services.dish_annotator import catalog_version
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+
+KEY = ("thali", 7, "2026-10-18", "lunch", 700, "vegetarian", None, ("peanut",), 2)
+
+
+def test_stable_seed_is_the_same_in_another_process():
+    code = f"from app.services.cache import stable_seed; print(stable_seed('v1', *{KEY!r}))"
+    env = {**os.environ, "PYTHONHASHSEED": "12345"}
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert int(output.stdout) == stable_seed("v1", *KEY)
+    assert stable_seed("v2", *KEY) != stable_seed("v1", *KEY)
+
+
+def test_lru_cache_evicts_least_recently_used_and_drops_old_versions():
+    cache = LRUCache(maxsize=2)
+    cache.ensure_version("v1")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    cache.ensure_version("v1")
+    assert len(cache) == 2
+    cache.ensure_version("v2")
+    assert len(cache) == 0
+
+
+def test_catalog_version_tracks_what_recommenders_see():
+    dishes = load_dishes_from_csv()
+    changed = load_dishes_from_csv()
+    changed[0]["calories"] += 10
+
+    assert catalog_version(load_dishes_from_csv()) == catalog_version(dishes)
+    assert catalog_version(changed) != catalog_version(dishes)
+
+
+def test_seeded_mood_recommendations_repeat():
+    recommender = MoodRecommender(load_dishes_from_csv())
+
+    def recommend(rng=None):
+        return recommender.recommend_by_mood("tired", dietary_preference="vegetarian", rng=rng)
+
+    assert recommend(random.Random(31)) == recommend(random.Random(31))
+    # Unseeded requests are deterministic too
+    assert recommend() == recommend()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """The app with the recommendation pool replaced by a call counter"""
+    from app import main
+
+    calls = []
+
+    async def recommend_thali(**kwargs):
+        calls.append(kwargs)
+        return main.thali_recommender.recommend_thali(
+            **{k: v for k, v in kwargs.items() if k != "seed"}, rng=random.Random(kwargs["seed"])
+        )
+
+    async def recommend_by_mood(**kwargs):
+        calls.append(kwargs)
+        return main.mood_recommender.recommend_by_mood(
+            **{k: v for k, v in kwargs.items() if k != "seed"}, rng=random.Random(kwargs["seed"])
+        )
+
+    monkeypatch.setattr(main.recommendation_pool, "recommend_thali", recommend_thali)
+    monkeypatch.setattr(main.recommendation_pool, "recommend_by_mood", recommend_by_mood)
+    main.recommendation_cache.clear()
+    yield main, TestClient(main.app), calls
+    main.recommendation_cache.clear()
+
+
+def test_repeat_requests_are_served_from_the_cache(api):
+    main, client, calls = api
+    body = {"meal_type": "lunch", "calorie_goal": 700, "dietary_preference": "vegetarian"}
+
+    first = client.post("/ai/recommend-thali", json=body)
+    second = client.post("/ai/recommend-thali", json=body)
+    client.post("/ai/recommend-thali", json={**body, "calorie_goal": 650})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert [call["calorie_goal"] for call in calls] == [700, 650]
+    assert calls[0]["seed"] != calls[1]["seed"]
+
+
+def test_catalog_change_invalidates_cached_responses(api, monkeypatch):
+    main, client, calls = api
+    body = {"meal_type": "dinner", "calorie_goal": 600}
+
+    client.post("/ai/recommend-thali", json=body)
+    monkeypatch.setattr(main, "dishes_version", "reloaded")
+    client.post("/ai/recommend-thali", json=body)
+
+    assert len(calls) == 2
+    assert calls[0]["seed"] != calls[1]["seed"]
+
+
+def test_cached_mood_responses_are_stamped_when_served(api, monkeypatch):
+    main, client, calls = api
+    now = [datetime(2026, 10, 18, 9, 0)]
+    monkeypatch.setattr(main, "get_ist_now", lambda: now[0])
+    body = {"mood": "tired", "dietary_preference": "vegetarian"}
+
+    first = client.post("/ai/recommend-mood", json=body).json()
+    now[0] += timedelta(hours=3)
+    second = client.post("/ai/recommend-mood", json=body).json()
+
+    assert len(calls) == 1
+    assert first["timestamp"] == "2026-10-18T09:00:00"
+    assert second["timestamp"] == "2026-10-18T12:00:00"
+    assert {**first, "timestamp": None} == {**second, "timestamp": None}
+    # The cached payload itself carries no timestamp to go stale
+    assert all("timestamp" not in payload for payload in main.recommendation_cache._data.values())
@@ -0,0 +1,62 @@
+"""
+Tests for the recommendation process pool: timeouts and backlog bounds.
+
+Run from backend/:  python -m pytest test_recommendation_pool.py
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.mood_recommender import MoodRecommender
+from app.services.recommendation_pool import RecommendationPool, _check_deadline
+from app.services.thali_recommender import ThaliRecommender
+
+
+def slow_job(kwargs, seed, deadline=None):
+    """Worker job standing in for a slow recommendation (module level so it pickles)"""
+    _check_deadline(deadline)
+    time.sleep(kwargs["seconds"])
+    return {"slept": kwargs["seconds"]}
+
+
+@pytest.fixture(scope="module")
+def recommenders():
+    dishes = load_dishes_from_csv()
+    return ThaliRecommender(dishes), MoodRecommender(dishes)
+
+
+def test_timed_out_jobs_keep_their_slots_so_the_backlog_stays_bounded(recommenders):
+    pool = RecommendationPool(*recommenders, workers=1, timeout=0.2, max_concurrency=2)
+
+    async def main():
+        pool.start()
+        try:
+            # Far more slow jobs than slots; every caller gives up after 0.2 s
+            results = await asyncio.gather(
+                *(pool._submit(slow_job, {"seconds": 0.5}, None) for _ in range(20)),
+                return_exceptions=True
+            )
+            backlog = pool.jobs_in_flight
+
+            # Once the admitted jobs finish, their slots are free again
+            await asyncio.sleep(1.2)
+            drained = pool.jobs_in_flight
+            result = await pool._submit(slow_job, {"seconds": 0.01}, None)
+            return results, backlog, drained, result
+        finally:
+            pool.shutdown()
+
+    results, backlog, drained, result = asyncio.run(main())
+
+    assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+    # Only the jobs that got a slot ever reached the executor
+    assert backlog <= 2
+    assert drained == 0
+    assert result == {"slept": 0.01}
+
+
+def test_expired_jobs_are_skipped_by_the_worker():
+    with pytest.raises(TimeoutError):
+        slow_job({"seconds": 10}, None, deadline=time.time() - 1)
@@ -0,0 +1,95 @@
+"""
+Tests for the thali composer: calorie goal, slot rules and request filters
+on the bundled dish catalog.
+
+Run from backend/:  python -m pytest test_thali_composer.py
+"""
+import random
+
+import pytest
+
+from app.services.dish_annotator import DishAnnotator
+from app.services.dish_catalog import load_dishes_from_csv
+from app.services.thali_composer import ThaliComposer
+from app.services.thali_recommender import ThaliRecommender
+
+REQUESTS = [
+    ("breakfast", 400), ("breakfast", 600), ("lunch", 700), ("lunch", 900),
+    ("evening_snack", 200), ("dinner", 450), ("dinner", 600)
+]
+DIETS = [None, "vegetarian", "vegan"]
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    return ThaliRecommender(load_dishes_from_csv())
+
+
+def slot_for(meal_type, item):
+    return next(slot for slot in ThaliComposer.MEAL_LAYOUTS[meal_type]["slots"] if slot["category"] == item["category"])
+
+
+@pytest.mark.parametrize("meal_type, calorie_goal", REQUESTS)
+@pytest.mark.parametrize("diet", DIETS)
+def test_thalis_hit_the_calorie_goal_and_follow_the_slot_rules(recommender, meal_type, calorie_goal, diet):
+    thali = recommender.recommend_thali(meal_type, calorie_goal, dietary_preference=diet, num_alternatives=2)
+    layout = ThaliComposer.MEAL_LAYOUTS[meal_type]
+    categories = [slot["category"] for slot in layout["slots"]]
+    allowed_diets = DishAnnotator.allowed_diets(diet)
+
+    assert abs(thali["total_calories"] - calorie_goal) <= calorie_goal * ThaliComposer.CALORIE_TOLERANCE
+    for candidate in [thali] + thali["alternatives"]:
+        items = candidate["recommended_items"]
+        names = [item["name"] for item in items]
+        assert len(names) == len(set(names))
+        # One dish per slot, in layout order, every required slot filled
+        assert [item["category"] for item in items] == [c for c in categories if c in {i["category"] for i in items}]
+        assert {slot["category"] for slot in layout["slots"] if not slot.get("optional")} <= {
+            item["category"] for item in items
+        }
+        for item in items:
+            slot = slot_for(meal_type, item)
+            assert item["protein"] >= slot.get("min_protein", 0)
+            if "keywords" in slot:
+                assert any(keyword in item["name"].lower() for keyword in slot["keywords"])
+            if allowed_diets is not None:
+                assert item["tags"]["diet"] in allowed_diets
+        assert candidate["total_calories"] == round(sum(item["calories"] for item in items))
+
+
+def test_lead_thali_is_ranked_first(recommender):
+    thalis = recommender.compose_thalis("lunch", 700, top_n=3)
+    within = [abs(t["total_calories"] - 700) <= 700 * ThaliComposer.CALORIE_TOLERANCE for t in thalis]
+
+    # Thalis within the tolerance come first, by balance score
+    assert within == sorted(within, reverse=True)
+    scores = [t["balance_score"] for t, ok in zip(thalis, within) if ok]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_allergies_and_excluded_dishes_are_left_out(recommender):
+    first = recommender.recommend_thali("lunch", 700)
+    excluded = {item["name"] for item in first["recommended_items"]}
+
+    thali = recommender.recommend_thali("lunch", 700, allergies=["dairy", "wheat"])
+    assert all(not {"dairy", "gluten"} & item["tags"]["allergens"] for item in thali["recommended_items"])
+
+    thalis = recommender.compose_thalis("lunch", 700, exclude=excluded, top_n=3)
+    assert thalis
+    assert all(not excluded & {item["name"] for item in t["recommended_items"]} for t in thalis)
+
+
+def test_exhausted_time_budget_still_returns_a_thali(recommender):
+    thalis = recommender.compose_thalis("dinner", 600, time_budget_ms=0, top_n=1)
+
+    assert len(thalis) == 1
+    assert {"Grain", "Protein Curry", "Vegetable"} <= {item["category"] for item in thalis[0]["recommended_items"]}
+
+
+def test_seeded_requests_are_repeatable(recommender):
+    def lead(seed):
+        thali = recommender.recommend_thali("dinner", 600, rng=random.Random(seed))
+        return [item["name"] for item in thali["recommended_items"]]
+
+    assert lead(42) == lead(42)
+    assert recommender.recommend_thali("dinner", 600) == recommender.recommend_thali("dinner", 600)
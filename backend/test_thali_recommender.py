@@ -0,0 +1,104 @@
+"""
+Tests for the thali recommender's calorie index: nearest-calorie candidate
+search at the edges of the calorie range and with duplicate calorie values.
+
+Run from backend/:  python -m pytest test_thali_recommender.py
+"""
+import random
+
+import pytest
+
+from app.services.thali_recommender import ThaliRecommender
+
+
+def catalog(calories):
+    """Synthetic dishes (Dish 0, Dish 1, ...) with the given calories"""
+    return [
+        {"name": f"Dish {i}", "calories": kcal, "protein": i, "carbs": 10, "fat": 5}
+        for i, kcal in enumerate(calories)
+    ]
+
+
+def brute_force(recommender, target, accept, limit):
+    """Accepted dishes ordered by calorie distance, then catalog order"""
+    ranked = sorted(
+        (abs(dish["calories"] - target), i) for i, dish in enumerate(recommender.dishes) if accept(dish)
+    )
+    return [recommender.dishes[i]["name"] for _, i in ranked[:limit]]
+
+
+def nearest(recommender, target, limit, accept=lambda dish: True):
+    return [dish["name"] for dish in recommender._nearest_dishes(["all"], target, accept, limit)]
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    # Dish 1-3 share 200 kcal; catalog order differs from calorie order
+    return ThaliRecommender(catalog([300, 200, 200, 200, 100, 500]))
+
+
+def test_target_below_the_minimum_walks_up_from_the_lightest(recommender):
+    assert nearest(recommender, 0, 3) == ["Dish 4", "Dish 1", "Dish 2"]
+    assert nearest(recommender, -50, 1) == ["Dish 4"]
+
+
+def test_target_above_the_maximum_walks_down_from_the_heaviest(recommender):
+    assert nearest(recommender, 10_000, 3) == ["Dish 5", "Dish 0", "Dish 1"]
+
+
+def test_duplicate_calories_are_all_reachable_in_catalog_order(recommender):
+    assert nearest(recommender, 200, 3) == ["Dish 1", "Dish 2", "Dish 3"]
+    # Equal distances on both sides (100 and 300) also keep catalog order
+    assert nearest(recommender, 200, 5) == ["Dish 1", "Dish 2", "Dish 3", "Dish 0", "Dish 4"]
+    assert nearest(recommender, 200, 2, accept=lambda dish: dish["name"] != "Dish 1") == ["Dish 2", "Dish 3"]
+
+
+def test_limit_beyond_the_pool_returns_every_accepted_dish(recommender):
+    names = nearest(recommender, 250, 50, accept=lambda dish: dish["protein"] % 2 == 0)
+
+    assert names == ["Dish 0", "Dish 2", "Dish 4"]
+    assert nearest(recommender, 250, 5, accept=lambda dish: False) == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_nearest_dishes_match_a_full_sort(seed):
+    rng = random.Random(seed)
+    # Few distinct values, so duplicates are common
+    recommender = ThaliRecommender(catalog([rng.choice([0, 50, 120, 120, 250, 400, 400]) for _ in range(40)]))
+    rejected = {f"Dish {i}" for i in rng.sample(range(40), 10)}
+
+    def accept(dish):
+        return dish["name"] not in rejected
+
+    for target in (-10, 0, 50, 85, 120, 121, 399, 400, 1000):
+        for limit in (1, 3, 8, 40):
+            assert nearest(recommender, target, limit, accept) == brute_force(recommender, target, accept, limit), \
+                (target, limit)
+
+
+def test_find_candidates_filters_and_falls_back_to_the_whole_catalog():
+    recommender = ThaliRecommender([
+        {"name": "Plain Rice", "calories": 200, "protein": 4, "carbs": 45, "fat": 0.5},
+        {"name": "Jeera Rice", "calories": 250, "protein": 5, "carbs": 50, "fat": 4},
+        {"name": "Dal Tadka", "calories": 220, "protein": 12, "carbs": 30, "fat": 6},
+        {"name": "Paneer Tikka", "calories": 320, "protein": 18, "carbs": 8, "fat": 24}
+    ])
+    allowed = recommender._build_filter(None, None)
+
+    def names(**kwargs):
+        return [dish["name"] for dish in recommender._find_candidates(allowed, 230, 10, **kwargs)]
+
+    assert names(preferred_categories=["grains"], exclude={"Plain Rice"}) == ["Jeera Rice"]
+    # Preferred category exhausted by the filters: the whole catalog is searched
+    assert names(preferred_categories=["grains"], min_protein=10) == ["Dal Tadka", "Paneer Tikka"]
+    assert names(keywords=["dal"]) == ["Dal Tadka"]
+    # min_protein is exclusive
+    assert names(min_protein=18) == []
+
+
+def test_no_allowed_dish_gives_no_thali_and_the_fallback_recommendation():
+    recommender = ThaliRecommender(catalog([150, 250, 350]))
+
+    assert recommender.compose_thalis("lunch", 700, allergies=["dish"]) == []
+    thali = recommender.recommend_thali("lunch", 700, allergies=["dish"])
+    assert thali == recommender._get_fallback_recommendation(700, "lunch")
@@ -0,0 +1,138 @@
+"""
+Tests for cached, chunked translation against a local fake translation backend.
+
+Run from backend/:  python -m pytest test_translation.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.translation import TranslationService
+
+
+class FakeTranslator:
+    """
+    Translation backend stand-in: "text" -> "<target>:text".
+
+    Records each call's texts and the peak number of calls in flight; texts
+    listed in `fail_on` make their call raise.
+    """
+
+    def __init__(self, delay=0.0, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def translate(self, texts, target):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on.intersection(texts):
+                raise RuntimeError("upstream rejected the request")
+            return [f"{target}:{text}" for text in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def ui_strings(count):
+    # Varying lengths so the character limit, not only the count, splits chunks
+    return {f"key_{i:03d}": f"UI string {i} " + "x" * (i % 40) for i in range(count)}
+
+
+def test_large_key_sets_are_chunked_within_limits_and_reassembled_in_order(session_factory):
+    backend = FakeTranslator()
+    service = TranslationService(backend, session_factory, max_chunk_texts=25, max_chunk_chars=600)
+    texts = ui_strings(300)
+
+    result = asyncio.run(service.translate(texts, "hi"))
+
+    assert list(result) == list(texts)
+    assert result == {key: f"hi:{text}" for key, text in texts.items()}
+    assert len(backend.calls) > 1
+    assert all(len(call) <= 25 and sum(map(len, call)) <= 600 for call in backend.calls)
+    assert sorted(text for call in backend.calls for text in call) == sorted(texts.values())
+
+
+def test_chunks_are_translated_concurrently_up_to_the_limit(session_factory):
+    backend = FakeTranslator(delay=0.1)
+    service = TranslationService(backend, session_factory, max_chunk_texts=10, concurrency=3)
+
+    start = time.perf_counter()
+    asyncio.run(service.translate(ui_strings(120), "ta"))
+    elapsed = time.perf_counter() - start
+
+    # 12 chunks of 0.1 s, three at a time, instead of 1.2 s back to back
+    assert len(backend.calls) == 12
+    assert backend.peak_in_flight == 3
+    assert elapsed < 0.9
+
+
+def test_oversized_text_is_sent_on_its_own(session_factory):
+    backend = FakeTranslator()
+    service = TranslationService(backend, session_factory, max_chunk_chars=100)
+    long_text = "y" * 250
+
+    result = asyncio.run(service.translate({"a": "Home", "long": long_text, "b": "About"}, "bn"))
+
+    assert result == {"a": "bn:Home", "long": f"bn:{long_text}", "b": "bn:About"}
+    assert backend.calls == [["Home"], [long_text], ["About"]]
+
+
+def test_only_uncached_texts_go_upstream(session_factory):
+    backend = FakeTranslator()
+    service = TranslationService(backend, session_factory)
+    asyncio.run(service.translate({"home": "Home", "about": "About"}, "hi"))
+
+    # A fresh service (e.g. another worker) reads the table; duplicates are sent once
+    service = TranslationService(backend, session_factory)
+    result = asyncio.run(service.translate({"home": "Home", "new": "New", "again": "New"}, "hi"))
+
+    assert result == {"home": "hi:Home", "new": "hi:New", "again": "hi:New"}
+    assert backend.calls == [["Home", "About"], ["New"]]
+
+
+def test_failed_chunk_raises_and_completed_chunks_stay_cached(session_factory):
+    backend = FakeTranslator(fail_on={"UI string 15 " + "x" * 15})
+    service = TranslationService(backend, session_factory, max_chunk_texts=10)
+    texts = ui_strings(30)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.translate(texts, "mr"))
+
+    # Retrying resends only the chunk that failed
+    backend.fail_on.clear()
+    backend.calls.clear()
+    result = asyncio.run(service.translate(texts, "mr"))
+
+    assert result == {key: f"mr:{text}" for key, text in texts.items()}
+    assert backend.calls == [list(texts.values())[10:20]]
+
+
+def test_database_work_runs_off_the_event_loop(session_factory):
+    session_threads = []
+
+    def recording_session_factory():
+        session_threads.append(threading.get_ident())
+        return session_factory()
+
+    service = TranslationService(FakeTranslator(), recording_session_factory, max_chunk_texts=2)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await service.translate({"a": "Home", "b": "About", "c": "Help"}, "hi")
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+
+    # One bulk read, then one write per chunk
+    assert len(session_threads) == 3
+    assert loop_thread not in session_threads
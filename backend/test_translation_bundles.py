@@ -0,0 +1,140 @@
+"""
+Tests for prebuilt translation bundles: the build job, the in-memory bundle
+store and ETag revalidation on GET /translations/{lang}.
+
+Run from backend/:  python -m pytest test_translation_bundles.py
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.jobs.build_translation_bundles import build_bundles
+from app.services.translation import TranslationService
+from app.services.translation_bundles import TranslationBundleStore, load_source, write_bundle
+
+SOURCE = {"nav_home": "Home", "nav_about": "About", "footer": "© NutriSathi"}
+
+
+class FakeTranslator:
+    """Translation backend stand-in: "text" -> "<target>:text"; languages in `fail_for` raise"""
+
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.calls = []
+
+    def translate(self, texts, target):
+        self.calls.append((target, list(texts)))
+        if target in self.fail_for:
+            raise RuntimeError("upstream rejected the request")
+        return [f"{target}:{text}" for text in texts]
+
+
+def read_bundle(directory, lang):
+    return json.loads((directory / f"{lang}.json").read_text(encoding="utf-8"))
+
+
+def test_bundle_version_follows_the_translations(tmp_path):
+    first = write_bundle(tmp_path, "hi", {"a": "ए"})
+    again = write_bundle(tmp_path, "hi", {"a": "ए"})
+    changed = write_bundle(tmp_path, "hi", {"a": "ए", "b": "बी"})
+
+    assert first == again != changed
+    assert read_bundle(tmp_path, "hi") == {"lang": "hi", "version": changed, "translations": {"a": "ए", "b": "बी"}}
+    assert [path.name for path in tmp_path.iterdir()] == ["hi.json"]
+
+
+def test_build_translates_each_language_and_only_new_strings_go_upstream(tmp_path, session_factory):
+    backend = FakeTranslator()
+    service = TranslationService(backend, session_factory)
+
+    stats = build_bundles(["hi", "ta"], service, SOURCE, tmp_path)
+
+    assert set(stats["versions"]) == {"en", "hi", "ta"} and stats["failed"] == {}
+    assert read_bundle(tmp_path, "en")["translations"] == SOURCE
+    assert read_bundle(tmp_path, "ta")["translations"] == {key: f"ta:{text}" for key, text in SOURCE.items()}
+
+    # A release adds one string: the rebuild sends only that one
+    backend.calls.clear()
+    rebuilt = build_bundles(["hi", "ta"], TranslationService(backend, session_factory), {**SOURCE, "new": "New"}, tmp_path)
+
+    assert backend.calls == [("hi", ["New"]), ("ta", ["New"])]
+    assert rebuilt["versions"]["hi"] != stats["versions"]["hi"]
+
+
+def test_failed_language_keeps_its_previous_bundle(tmp_path, session_factory):
+    build_bundles(["hi", "bn"], TranslationService(FakeTranslator(), session_factory), SOURCE, tmp_path)
+    previous = read_bundle(tmp_path, "bn")
+
+    backend = FakeTranslator(fail_for={"bn"})
+    stats = build_bundles(["hi", "bn"], TranslationService(backend, session_factory), {**SOURCE, "new": "New"}, tmp_path)
+
+    assert list(stats["failed"]) == ["bn"]
+    assert read_bundle(tmp_path, "bn") == previous
+    assert read_bundle(tmp_path, "hi")["translations"]["new"] == "hi:New"
+
+
+def test_shipped_source_strings_load():
+    source = load_source()
+
+    assert source and all(isinstance(text, str) and text for text in source.values())
+
+
+def test_store_serves_from_memory_until_the_bundle_is_rebuilt(tmp_path):
+    store = TranslationBundleStore(tmp_path)
+    version = write_bundle(tmp_path, "hi", {"a": "ए"})
+
+    bundle = store.get("hi")
+    assert bundle["version"] == version
+    assert bundle["etag"] == f'"{version}"'
+    assert json.loads(bundle["body"])["translations"] == {"a": "ए"}
+    assert store.get("hi") is bundle
+
+    rebuilt = write_bundle(tmp_path, "hi", {"a": "ए", "b": "बी"})
+    assert store.get("hi")["version"] == rebuilt
+
+
+@pytest.mark.parametrize("lang", ["fr", "../hi", "hi.json", "HI", ""])
+def test_store_returns_none_for_missing_or_invalid_languages(tmp_path, lang):
+    write_bundle(tmp_path, "hi", {"a": "ए"})
+
+    assert TranslationBundleStore(tmp_path).get(lang) is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "translation_bundles", TranslationBundleStore(tmp_path))
+    return TestClient(main.app), tmp_path
+
+
+def test_bundle_endpoint_revalidates_with_the_etag(client):
+    client, directory = client
+    version = write_bundle(directory, "hi", {"nav_home": "होम"})
+
+    response = client.get("/translations/hi")
+    assert response.status_code == 200
+    assert response.json() == {"lang": "hi", "version": version, "translations": {"nav_home": "होम"}}
+    etag = response.headers["etag"]
+    assert etag == f'"{version}"'
+    assert response.headers["cache-control"] == "no-cache"
+
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        revalidated = client.get("/translations/hi", headers={"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    # A new build changes the ETag, so the old one gets the full bundle again
+    write_bundle(directory, "hi", {"nav_home": "होम", "nav_about": "परिचय"})
+    changed = client.get("/translations/hi", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["translations"]["nav_about"] == "परिचय"
+
+
+def test_bundle_endpoint_404s_without_a_bundle(client):
+    client, _ = client
+
+    assert client.get("/translations/ta").status_code == 404
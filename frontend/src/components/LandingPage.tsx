@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import './LandingPage.css';
+import uiStrings from '../../../data/translations/en.json';
 
 interface LandingPageProps {
   onNavigateLogin: () => void;
@@ -25,28 +26,8 @@ const LandingPage: React.FC<LandingPageProps> = ({
   // Multilanguage: default texts and translation state
   const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
-  const defaultTexts: Record<string, string> = {
-    nav_home: 'Home',
-    nav_about: 'About',
-    nav_bmi: 'BMI Calc',
-    nav_ai: 'AI Planner ✨',
-    nav_signin: 'Sign In',
-    nav_cta: "Let's Start",
-    hero_title_line1: 'Eat Better.',
-    hero_title_line2: 'Live Healthier.',
-    hero_description: 'Your AI-powered nutrition companion. Get personalized meal plans, track calories, and achieve your health goals with smart recommendations tailored to your body.',
-    hero_try_ai: 'Try AI Planner ✨',
-    hero_calc_bmi: 'Calculate BMI',
-    about_title: 'About NutriSathi',
-    about_text: 'Your AI-powered nutrition companion helping you achieve your health goals with personalized meal plans and smart recommendations.',
-    bmi_title: 'BMI Calculator',
-    bmi_text: 'Calculate your Body Mass Index and get personalized health insights.',
-    bmi_get_started: 'Get Started →',
-    ai_title: 'AI Meal Planner ✨',
-    ai_text: 'Get AI-powered meal recommendations tailored to your dietary preferences and health goals.',
-    ai_start: 'Start Planning →',
-    footer: '© 2025 NutriSathi. All rights reserved.'
-  };
+  // UI strings live in data/translations/en.json, the source the backend builds bundles from
+  const defaultTexts: Record<string, string> = uiStrings;
 
   const [lang, setLang] = useState<string>('en');
   const [translations, setTranslations] = useState<Record<string, string>>({});
@@ -277,30 +258,45 @@ const LandingPage: React.FC<LandingPageProps> = ({
       return;
     }
 
+    const fallback: Record<string, string> = (fallbackTranslations as any)[target] || {};
+    let bundled: Record<string, string> = {};
     try {
+      // Prebuilt bundle first (revalidated with its ETag by the browser cache)
+      const bundleRes = await fetch(`${API_URL}/translations/${target}`);
+      if (bundleRes.ok) {
+        const bundle = await bundleRes.json();
+        bundled = bundle.translations || {};
+      }
+
+      // Only strings the bundle does not have yet (added since it was built) go to /translate
+      const missing = Object.fromEntries(
+        Object.entries(defaultTexts).filter(([key]) => !(key in bundled))
+      );
+      if (Object.keys(missing).length === 0) {
+        setTranslations(bundled);
+        return;
+      }
+      if (Object.keys(bundled).length > 0) {
+        setTranslations(bundled);
+      }
+
       const res = await fetch(`${API_URL}/translate`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ target, texts: defaultTexts })
+        body: JSON.stringify({ target, texts: missing })
       });
       if (!res.ok) {
         console.warn('Translation request failed', await res.text());
         // fallback to built-in translations if available
-        if ((fallbackTranslations as any)[target]) {
-          setTranslations((fallbackTranslations as any)[target]);
-        }
+        setTranslations({ ...fallback, ...bundled });
         return;
       }
       const data = await res.json();
-      if (data && data.translations) {
-        setTranslations(data.translations);
-      }
+      setTranslations({ ...fallback, ...bundled, ...((data && data.translations) || {}) });
     } catch (err) {
       console.warn('Translation error', err);
       // fallback to built-in translations if available
-      if ((fallbackTranslations as any)[target]) {
-        setTranslations((fallbackTranslations as any)[target]);
-      }
+      setTranslations({ ...fallback, ...bundled });
     }
   };
 